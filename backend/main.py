@@ -1,13 +1,52 @@
+import time
+IMPORT_STARTED = time.perf_counter()  # for the import-to-ready time in /ready
+
 import json
-from fastapi import FastAPI, HTTPException
+from contextlib import asynccontextmanager
+from typing import Optional
+from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import StreamingResponse
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
 from pydantic import BaseModel
-from langchain_core.messages import HumanMessage, AIMessage
 
-from src.agent import compiled_graph
+# Only light modules here. The agent (LangChain, LangGraph, the Gemini SDK) and
+# the browsers are loaded by the warm-up, after the server is already listening.
+from src.admission import Overloaded, admission_stats, chat_limiter
+from src.config import Config
+from src.metrics import collect_timings, render_metrics
+from src.streaming import ClientDisconnected, ItineraryStream, final_message, message_text, until_disconnected
+from src.tools.browser_pool import browser_pool
+from src.tools.sessions import session_registry
+from src.tools.single_flight import single_flight_stats
+from src.tools.workers import run_job, scrape_workers
+from src.warmup import warmup
+
+# The compiled agent graph, once the warm-up has built it (see _graph)
+compiled_graph = None
+
+async def _graph():
+    global compiled_graph
+    if compiled_graph is None:
+        compiled_graph = (await warmup.agent()).get_graph()
+    return compiled_graph
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Preload the agent and the browsers in the background; /ready says when they are up
+    warmup.start(IMPORT_STARTED)
+    session_registry.start()
+    yield
+    from src.tools.prefetch import prefetcher
+    await warmup.stop()
+    await prefetcher.stop()
+    if Config.PRICE_WATCH_ENABLED:
+        from src.tools.price_watch import price_watcher
+        await price_watcher.stop()
+    await scrape_workers.stop()
+    await session_registry.stop()
+    await browser_pool.stop()
 
-app = FastAPI(title="Flight Architect API")
+app = FastAPI(title="Flight Architect API", lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -20,22 +59,161 @@ app.add_middleware(
 class ChatRequest(BaseModel):
     message: str
     thread_id: str = "default_session"
+    # Also send the reply while it is generated: `token` events for text,
+    # `partial` events for each finished field of the itinerary JSON
+    stream_tokens: bool = False
+    # Also send a `timing` event for every browser stage, graph step, LLM and tool call
+    timings: bool = False
+
+class WatchRequest(BaseModel):
+    # The arguments of search_outbound_flights
+    origin: str
+    destination: str
+    depart_date: str
+    return_date: str
 
 @app.get("/health")
 def health_check():
     return {"status": "online", "agent": "ready"}
 
+@app.get("/ready")
+def readiness():
+    # Unlike /health: 503 until the warm-up has loaded the agent and the browsers
+    stats = warmup.stats()
+    return JSONResponse(stats, status_code=200 if warmup.ready else 503)
+
+@app.get("/cache/stats")
+def search_cache_stats():
+    from src.tools.search_cache import cache_stats
+    return {**cache_stats(), "single_flight": single_flight_stats()}
+
+@app.get("/prefetch/stats")
+def prefetch_stats():
+    from src.tools.prefetch import prefetcher
+    return prefetcher.stats()
+
+@app.get("/workers/stats")
+def workers_stats():
+    return scrape_workers.stats()
+
+@app.get("/admission/stats")
+def admission():
+    return admission_stats()
+
+@app.get("/checkpoints/stats")
+async def checkpoint_stats():
+    return await (await warmup.agent()).checkpointer.stats()
+
+@app.get("/metrics", response_class=PlainTextResponse)
+def metrics():
+    # Prometheus text exposition format
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4")
+
+# Price watches: the background re-scrapes behind the watch_flight_prices tool
+@app.post("/watches")
+async def create_watch(request: WatchRequest):
+    from src.tools.price_watch import TooManyWatches, price_watcher
+    try:
+        return await price_watcher.watch(request.origin, request.destination, request.depart_date, request.return_date)
+    except TooManyWatches as e:
+        raise HTTPException(status_code=429, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@app.get("/watches")
+async def list_watches():
+    from src.tools.price_watch import price_watcher
+    return {"watches": price_watcher.watches(), **price_watcher.stats()}
+
+@app.get("/watches/{watch_id}")
+async def get_watch(watch_id: str, changes: Optional[int] = None):
+    # Latest flights from memory, no scrape; `changes` = how many recent changes to include
+    from src.tools.price_watch import price_watcher
+    snapshot = await price_watcher.snapshot(watch_id, changes)
+    if snapshot is None:
+        raise HTTPException(status_code=404, detail="No such watch")
+    return snapshot
+
+@app.delete("/watches/{watch_id}")
+async def delete_watch(watch_id: str):
+    from src.tools.price_watch import price_watcher
+    if not await price_watcher.unwatch(watch_id):
+        raise HTTPException(status_code=404, detail="No such watch")
+    return {"deleted": watch_id}
+
+async def _abandon_turn(thread_id: str, config: dict) -> None:
+    """After a disconnect: leave a checkpoint the next turn can build on and free the browsers."""
+    from src.agent import record_cancelled_turn
+    from src.tools.prefetch import prefetcher
+    closed = await record_cancelled_turn(await _graph(), config)
+    await prefetcher.discard(thread_id)
+    await run_job("close_thread", thread_id, route=thread_id)
+    print(f"🔌 Cancelled the turn of thread {thread_id} ({closed} unfinished tool calls) and closed its pages.")
+
 @app.post("/chat")
-async def chat_endpoint(request: ChatRequest):
+async def chat_endpoint(request: ChatRequest, http_request: Request):
+    from langchain_core.messages import HumanMessage, AIMessage, AIMessageChunk
+
+    # Shed load up front, with a real status, when the waiting line is full
+    if chat_limiter.full:
+        chat_limiter.rejected += 1
+        raise HTTPException(
+            status_code=503,
+            detail="Too many requests are waiting. Please retry shortly.",
+            headers={"Retry-After": str(Config.ADMISSION_RETRY_AFTER)},
+        )
     
     # We define an async generator function inside the endpoint
     async def event_generator():
+        ticket = None
         try:
+            # Wait for a slot, telling the client its place in line
+            ticket = chat_limiter.enqueue(request.thread_id)
+            while not ticket.admitted:
+                yield f"data: {json.dumps({'type': 'queued', 'position': ticket.position, 'resource': 'chat'})}\n\n"
+                await ticket.changed()
+
             user_msg = HumanMessage(content=request.message)
             initial_state = {"messages": [user_msg]}
             config = {"configurable": {"thread_id": request.thread_id}}
             
-            async for event in compiled_graph.astream(initial_state, config, stream_mode="values"):
+            stream_mode = ["values", "custom", "messages"] if request.stream_tokens else ["values", "custom"]
+            replies = {}  # message id -> ItineraryStream
+            timings = collect_timings() if request.timings else None
+
+            # Runs until the client disconnects; then the graph and its scrapes are cancelled
+            events = until_disconnected(
+                (await _graph()).astream(initial_state, config, stream_mode=stream_mode),
+                http_request.is_disconnected,
+                on_abandoned=lambda: _abandon_turn(request.thread_id, config),
+            )
+            async for mode, event in events:
+                # Timings recorded since the previous event
+                while timings:
+                    yield f"data: {json.dumps(timings.pop(0))}\n\n"
+
+                # 0. Progress from inside a long tool (plan_round_trip): shown like a tool step
+                if mode == "custom":
+                    if "stage" in event:
+                        payload = json.dumps({"type": "tool", "content": event["stage"]})
+                        yield f"data: {payload}\n\n"
+                    elif "queued" in event:
+                        # Waiting for a browser page or an LLM slot
+                        payload = json.dumps({"type": "queued", "position": event["queued"], "resource": event["resource"]})
+                        yield f"data: {payload}\n\n"
+                    continue
+
+                # 0b. LLM tokens of the agent's reply, as they arrive
+                if mode == "messages":
+                    chunk, metadata = event
+                    if metadata.get("langgraph_node") != "agent" or not isinstance(chunk, AIMessageChunk):
+                        continue
+                    token = message_text(chunk.content)
+                    if token:
+                        for update in replies.setdefault(chunk.id, ItineraryStream()).feed(token):
+                            yield f"data: {json.dumps(update)}\n\n"
+                    continue
+
                 if "messages" in event:
                     last_msg = event["messages"][-1]
                     
@@ -47,36 +225,27 @@ async def chat_endpoint(request: ChatRequest):
                         payload = json.dumps({"type": "tool", "content": tool_name})
                         yield f"data: {payload}\n\n"
                     
-                    # 2. Catch the Final Agent Response
+                    # 2. Catch the Final Agent Response (always sent, validated, even after streaming it)
                     elif isinstance(last_msg, AIMessage) and not last_msg.tool_calls:
-                        content = last_msg.content
-                        final_text = ""
-                        
-                        if isinstance(content, list):
-                            for block in content:
-                                if isinstance(block, dict) and "text" in block:
-                                    final_text += block["text"]
-                        else:
-                            final_text = str(content)
-                        
+                        final_text = message_text(last_msg.content)
                         if final_text:
-                            try:
-                                # Clean up the string to make it valid JSON
-                                cleaned_json_string = final_text.strip()
-                                if cleaned_json_string.startswith("```json"):
-                                    cleaned_json_string = cleaned_json_string[7:-3].strip()
-                                
-                                json_output = json.loads(cleaned_json_string)
-                                payload = json.dumps({"type": "message", "content": json_output})
-                                yield f"data: {payload}\n\n"
-                            except (json.JSONDecodeError, TypeError):
-                                # If it's not a valid JSON, send as plain text
-                                payload = json.dumps({"type": "message", "content": final_text})
-                                yield f"data: {payload}\n\n"
+                            payload = json.dumps(final_message(final_text))
+                            yield f"data: {payload}\n\n"
                             
+            while timings:
+                yield f"data: {json.dumps(timings.pop(0))}\n\n"
+
+        except ClientDisconnected:
+            pass  # nobody left to tell
+        except Overloaded as e:
+            error_payload = json.dumps({"type": "error", "content": "The server is busy. Please retry shortly.", "retry_after": e.retry_after})
+            yield f"data: {error_payload}\n\n"
         except Exception as e:
             error_payload = json.dumps({"type": "error", "content": str(e)})
             yield f"data: {error_payload}\n\n"
+        finally:
+            if ticket:
+                ticket.release()
 
     # Return the generator as a StreamingResponse
     return StreamingResponse(event_generator(), media_type="text/event-stream")
\ No newline at end of file
@@ -0,0 +1,172 @@
+import asyncio
+import time
+from collections import OrderedDict, deque
+from contextlib import asynccontextmanager
+from typing import Callable, Deque, Hashable, List, Optional
+
+from src.config import Config
+
+# ------------------------------------------------------------------
+# 1. ONE PLACE IN LINE
+# ------------------------------------------------------------------
+class Overloaded(Exception):
+    """The queue is full; the caller should retry after `retry_after` seconds."""
+    def __init__(self, limiter: str, retry_after: int):
+        super().__init__(f"{limiter} queue is full")
+        self.retry_after = retry_after
+
+
+class Ticket:
+    """A request for one slot. Wait on `changed()` until `admitted`; always `release()`."""
+    def __init__(self, limiter: "FairLimiter", key: Hashable):
+        self.limiter = limiter
+        self.key = key
+        self.admitted = False
+        self.released = False
+        self.enqueued_at = time.monotonic()
+        self._changed = asyncio.Event()
+
+    @property
+    def position(self) -> int:
+        """1-based place in the service order; 0 once admitted."""
+        return 0 if self.admitted else self.limiter._position(self)
+
+    async def changed(self) -> None:
+        """Returns when this ticket is admitted or moves up the line."""
+        await self._changed.wait()
+        self._changed.clear()
+
+    def release(self) -> None:
+        if self.released:
+            return
+        self.released = True
+        self.limiter._release(self)
+
+# ------------------------------------------------------------------
+# 2. THE LIMITER
+# ------------------------------------------------------------------
+class FairLimiter:
+    """
+    A semaphore with `capacity` slots whose waiters are served round-robin per
+    key (thread_id), FIFO within a key: one chatty conversation can't starve
+    the others. With `max_queue` set, tickets past that many waiters are refused.
+    """
+    def __init__(self, name: str, capacity: int, max_queue: Optional[int] = None):
+        self.name = name
+        self.capacity = capacity
+        self.max_queue = max_queue
+        self.active = 0
+        # key -> its waiting tickets; the first key is served next
+        self._queues: "OrderedDict[Hashable, Deque[Ticket]]" = OrderedDict()
+        self.admitted = 0
+        self.rejected = 0
+        self.waited_seconds = 0.0
+
+    @property
+    def waiting(self) -> int:
+        return sum(len(queue) for queue in self._queues.values())
+
+    @property
+    def full(self) -> bool:
+        return self.max_queue is not None and self.active >= self.capacity and self.waiting >= self.max_queue
+
+    def enqueue(self, key: Hashable) -> Ticket:
+        if self.full:
+            self.rejected += 1
+            raise Overloaded(self.name, Config.ADMISSION_RETRY_AFTER)
+        ticket = Ticket(self, key)
+        self._queues.setdefault(key, deque()).append(ticket)
+        self._admit_waiting()
+        return ticket
+
+    @asynccontextmanager
+    async def slot(self, key: Hashable, on_wait: Optional[Callable[[int], None]] = None):
+        """Holds one slot for the block. `on_wait(position)` is called while queued."""
+        ticket = self.enqueue(key)
+        try:
+            while not ticket.admitted:
+                if on_wait:
+                    on_wait(ticket.position)
+                await ticket.changed()
+            yield ticket
+        finally:
+            ticket.release()
+
+    # --- Bookkeeping ---
+    def _order(self) -> List[Ticket]:
+        """Waiting tickets in the order they will be served (round-robin over keys)."""
+        queues = [list(queue) for queue in self._queues.values()]
+        order = []
+        for depth in range(max((len(q) for q in queues), default=0)):
+            order.extend(q[depth] for q in queues if depth < len(q))
+        return order
+
+    def _position(self, ticket: Ticket) -> int:
+        return self._order().index(ticket) + 1
+
+    def _admit_waiting(self) -> None:
+        moved = False
+        while self.active < self.capacity and self._queues:
+            key, queue = next(iter(self._queues.items()))
+            ticket = queue.popleft()
+            if queue:
+                self._queues.move_to_end(key)  # next key's turn
+            else:
+                del self._queues[key]
+            ticket.admitted = True
+            self.active += 1
+            self.admitted += 1
+            self.waited_seconds += time.monotonic() - ticket.enqueued_at
+            ticket._changed.set()
+            moved = True
+        if moved:
+            self._notify_waiting()
+
+    def _notify_waiting(self) -> None:
+        # Everyone still waiting moved up the line
+        for queue in self._queues.values():
+            for waiting in queue:
+                waiting._changed.set()
+
+    def _release(self, ticket: Ticket) -> None:
+        if ticket.admitted:
+            self.active -= 1
+        else:
+            queue = self._queues.get(ticket.key)
+            if queue and ticket in queue:
+                queue.remove(ticket)
+                if not queue:
+                    del self._queues[ticket.key]
+                self._notify_waiting()
+        self._admit_waiting()
+
+    def stats(self) -> dict:
+        return {
+            "capacity": self.capacity,
+            "active": self.active,
+            "waiting": self.waiting,
+            "max_queue": self.max_queue,
+            "admitted": self.admitted,
+            "rejected": self.rejected,
+            "avg_wait_seconds": round(self.waited_seconds / self.admitted, 3) if self.admitted else 0.0,
+        }
+
+# ------------------------------------------------------------------
+# 3. THE PROCESS-WIDE LIMITERS
+# ------------------------------------------------------------------
+chat_limiter = FairLimiter("chat", Config.CHAT_MAX_CONCURRENT, Config.CHAT_MAX_QUEUE)
+browser_limiter = FairLimiter("browser", Config.BROWSER_MAX_PAGES)
+llm_limiter = FairLimiter("llm", Config.LLM_MAX_CONCURRENT)
+
+def report_queued(resource: str) -> Callable[[int], None]:
+    """`on_wait` callback: tells the /chat stream (if any) where we are in line."""
+    def on_wait(position: int) -> None:
+        from langgraph.config import get_stream_writer  # not at import: /health must come up fast
+        try:
+            get_stream_writer()({"queued": position, "resource": resource})
+        except (RuntimeError, KeyError):
+            pass  # not running inside a streamed graph
+    return on_wait
+
+def admission_stats() -> dict:
+    return {limiter.name: limiter.stats() for limiter in (chat_limiter, browser_limiter, llm_limiter)}
@@ -1,30 +1,68 @@
 import operator 
 import asyncio
-from typing import Annotated, List, Literal, Union
+import threading
+import uuid
+from typing import Annotated, List, Literal, Optional, Union
 
 # 1. Load Environment Variables
 from dotenv import load_dotenv
 load_dotenv()
 
-from langgraph.checkpoint.memory import MemorySaver
-from langchain_core.messages import AIMessage, HumanMessage, SystemMessage
+from langchain_core.runnables import RunnableConfig
+from langchain_core.messages import AIMessage, HumanMessage, RemoveMessage, SystemMessage, ToolMessage
 from langgraph.prebuilt import ToolNode
 from langgraph.graph import END, StateGraph
-from langchain_google_genai import ChatGoogleGenerativeAI
 # 2. Import Custom Components
+from src.admission import llm_limiter, report_queued
 from src.config import Config
-from src.tools.flight_search import generate_booking_link, search_outbound_flights, search_return_flights
-from src.state import AgentState
+from src.checkpointer import create_checkpointer
+from src.tools.browser_pool import browser_pool
+from src.tools.prefetch import prefetcher
+from src.tools.sessions import session_registry
+from src.tools.flight_search import generate_booking_link, plan_round_trip, search_flexible_dates, search_outbound_flights, search_return_flights
+from src.tools.encoding import OUTBOUND_PREFIX, RETURN_PREFIX, option_id
+from src.tools.preferences import set_trip_preferences
+from src.tools.price_watch import watch_flight_prices
+from src.metrics import GraphTimer
+from src.memory import SUMMARY_PROMPT, collapse_consumed_tool_results, memory_context, split_history, summary_request
+from src.selection import select_best
+from src.state import AgentState, FlightOption, RoundTripPlan
+from src.streaming import message_text
 # ------------------------------------------------------------------
-# 3. SETUP THE BRAIN
+# 3. SETUP THE BRAIN (built on first use, or by the warm-up: src/warmup.py)
 # ------------------------------------------------------------------
-llm = ChatGoogleGenerativeAI(
-    model=Config.MODEL_NAME,
-    temperature=0,
-    max_retries=2,
-)
-tools = [search_outbound_flights, search_return_flights, generate_booking_link]
-llm_with_tools = llm.bind_tools(tools)
+tools = [plan_round_trip, set_trip_preferences, search_outbound_flights, search_return_flights, generate_booking_link, search_flexible_dates, watch_flight_prices]
+_built = {}  # "llm", "llm_with_tools", "checkpointer", "graph"
+_build_lock = threading.RLock()  # the warm-up builds in a thread; the graph builds its checkpointer
+
+
+def get_llm():
+    """The Gemini client. Importing its SDK alone takes a couple of seconds."""
+    with _build_lock:
+        if "llm" not in _built:
+            from langchain_google_genai import ChatGoogleGenerativeAI
+            _built["llm"] = ChatGoogleGenerativeAI(
+                model=Config.MODEL_NAME,
+                temperature=0,
+                max_retries=2,
+            )
+        return _built["llm"]
+
+
+def get_llm_with_tools():
+    llm = get_llm()
+    with _build_lock:
+        if "llm_with_tools" not in _built:
+            _built["llm_with_tools"] = llm.bind_tools(tools)
+        return _built["llm_with_tools"]
+
+
+def get_checkpointer():
+    """The conversation store. Build it on the event loop that serves the graph (the SQLite one binds to it)."""
+    with _build_lock:
+        if "checkpointer" not in _built:
+            _built["checkpointer"] = create_checkpointer()
+        return _built["checkpointer"]
 # ------------------------------------------------------------------
 # 4. DEFINE THE "ARCHITECT" SYSTEM PROMPT
 # ------------------------------------------------------------------
@@ -37,6 +75,7 @@ Before searching, you must ensure you have precise data.
 Analyze the user's request for these keys. If any are missing or vague, ASK.
 
 1.  **Dates**: Exact Depart and Return dates (e.g., "2026-02-12" and "2026-02-16").
+    * If the user says their dates are flexible (e.g., "around March 10, +/- 2 days"), call `search_flexible_dates` ONCE with the center dates and `flex_days`, show or use the cheapest date pair, then continue with Step 1 using those exact dates (the results are cached, so Step 1 is instant).
 2.  **Airports:** * Convert cities to Airport Codes (e.g., "New York" -> JFK, LGA, or EWR).
     * *CRITICAL:* If a city has multiple airports (NY, London, DC, Tokyo, etc.), ASK the user if they have a preference or if "Any" is okay. 
 3.  **Stops:** (Non-stop vs. Any)
@@ -44,55 +83,34 @@ Analyze the user's request for these keys. If any are missing or vague, ASK.
 5.  **Timing:** (Morning/Afternoon/Night vs. Anytime)
 6.  **Budget:** (Max price, "Cheapest Option", or "No limit")
 
+Once you have all six answers, call `set_trip_preferences` with them (call it again if the user changes one later).
+
 **PHASE 2: AUTONOMOUS EXECUTION (Strict Tool usage)**
 Once you have the data, execute the workflow without stopping.
 
+**Fast Path: `plan_round_trip`**
+* Unless the user wants to compare options themselves, call `plan_round_trip` ONCE with the airports, dates and `preferences` (the same six answers). It runs Steps 1-5 in a single call.
+* `status` "booked": go straight to Step 6.
+* `status` "no_outbound" / "no_return": no flight met the preferences on that leg. Tell the user and ask them to adjust.
+* `status` "link_failed": run Steps 1-5 below instead (the searches are cached).
+
 **Step 1: Search Outbound**
 * Call `search_outbound_flights`.
 * **FORMATTING RULES:**
     * `origin`: Use the IATA code (e.g., "JFK").
     * `destination`: Use the IATA code (e.g., "LHR").
+    * *Multiple airports:* If the user is fine with "Any" airport in a city, pass them all in ONE call, comma-separated (e.g., "JFK,LGA,EWR") or as the metro code (e.g., "NYC", "LON", "WAS", "TYO"). Never call the tool once per airport; each result is tagged with its actual airports.
     * `depart_date`: Must be in `YYYY-MM-DD` format. The user's requested departure date is not flexible and must be followed exactly.
     * `return_date`: Must be in `YYYY-MM-DD` format. The user's requested return date is not flexible and must be followed exactly.
 
-**Step 2: Autonomous Selection**
-* Review the results from Step 1.
-* **Apply Budget Logic:**
-    * If "Max Price" is set: DISCARD any flight over the limit. If no flights remain, let the user know and ask to adjust their budget.
-    * If "Cheapest Option": Non-stop > Price, but the cheapest non-stop flight wins. If no non-stop flights, pick the cheapest overall. 
-    * If "No limit": Prioritize Non-stop > Airline Preference > Price
-* Pick the **single best flight** matching the User's Phase 1 preferences.
-* Make sure to note the `booking_link` from this flight for Step 3.
-
-**Step 3: Search Return (The Handshake)**
-* Call `search_return_flights`.
-* **CRITICAL:** You must pass the EXACT values from the flight selected in Step 2:
-    * `search_url`: Must be the `booking_link` from the chosen outbound flight.
-    * `outbound_airline`: Exact airline name.
-    * `outbound_departure_time`: Exact string (e.g. "12:59 PM").
-    * `outbound_arrival_time`: Exact string.
-    * `outbound_price`: Exact float (e.g., 813.0).
-    * `outbound_stops`: Exact string (e.g., "Nonstop").
-
-**Step 4: Autonomous Return Selection**
-* Review the results from Step 3.
-* **Apply Budget Logic:**
-    * If "Max Price" is set: DISCARD any flight over the limit. If no flights remain, let the user know and ask to adjust their budget.
-    * If "Cheapest Option": Non-stop > Price, but the cheapest non-stop flight wins. If no non-stop flights, pick the cheapest overall. 
-    * If "No limit": Prioritize Non-stop > Airline Preference > Price
-* Pick the **single best return flight** matching the User's Phase 1 preferences.
-* Make sure to note the `booking_link` from this flight for Step 5.
-
-**Step 5: Generate Booking Link (The Final Lock)**
-* Review the results from Step 3 and select the best return flight.
-* Call `generate_booking_link`.
-* **CRITICAL:** Pass the EXACT values from the chosen return flight:
-    * `search_url`: The `booking_link` returned in Step 3.
-    * `return_airline`: Exact airline name.
-    * `return_departure_time`: Exact string.
-    * `return_arrival_time`: Exact string.
-    * `return_price`: Exact float.
-    * `return_stops`: Exact string.
+**Steps 2-5: Automatic Selection and Booking**
+* The system applies the saved preferences for you: it picks the best outbound flight, calls `search_return_flights`, picks the best return flight and calls `generate_booking_link`. Each pick appears as a "Selected outbound/return flight" message. Do NOT call these tools yourself while this is working.
+* If search results come back WITHOUT a following selection, no flight met the preferences (e.g., everything is over the max price or there is no non-stop). Tell the user why and ask them to adjust; then call `set_trip_preferences` again and repeat Step 1 (it is cached, so it is instant).
+* Fallback only (no preferences saved): pick the best flight yourself and call `search_return_flights` / `generate_booking_link` with its `option_id` (e.g., "O3", then "R1").
+
+**Price Watch**
+* If the user wants you to "check again later" or keep an eye on prices, call `watch_flight_prices` with the same four arguments as `search_outbound_flights` instead of searching again. Prices are re-checked in the background.
+* When they come back and ask, call `watch_flight_prices` again: it returns the latest prices and what changed, instantly. Reply in plain text, not the Step 6 JSON.
 
 **Step 6: Final Output**
 * Present the final itinerary to the user.
@@ -124,15 +142,51 @@ Once you have the data, execute the workflow without stopping.
 # ------------------------------------------------------------------
 
 
-async def chatbot_node(state: AgentState):
+def _thread_key(config: Optional[RunnableConfig]) -> str:
+    return (config or {}).get("configurable", {}).get("thread_id") or "anonymous"
+
+
+async def chatbot_node(state: AgentState, config: RunnableConfig = None):
     """
     The central node. It looks at the conversation history and decides what to do next.
     """
-    messages = [SystemMessage(content=SYSTEM_PROMPT)] + state["messages"]
-    result = await llm_with_tools.ainvoke(messages)
+    context = memory_context(state)
+    system_prompt = f"{SYSTEM_PROMPT}\n{context}" if context else SYSTEM_PROMPT
+    messages = [SystemMessage(content=system_prompt)] + state["messages"]
+    async with llm_limiter.slot(_thread_key(config), report_queued("llm")):
+        result = await get_llm_with_tools().ainvoke(messages)
     return {"messages": [result]}
 
 
+async def _summarize(older: list, previous: Optional[str]) -> str:
+    result = await get_llm().ainvoke([SystemMessage(content=SUMMARY_PROMPT), HumanMessage(content=summary_request(previous, older))])
+    return message_text(result.content)
+
+
+async def memory_node(state: AgentState, config: RunnableConfig = None):
+    """
+    Runs once per user turn, before the LLM: shrinks tool results that were
+    already read and, past `Config.MEMORY_TOKEN_BUDGET`, folds the oldest turns
+    into `summary`. Pinned fields are untouched, so the prompt stays bounded.
+    """
+    collapsed = {message.id: message for message in collapse_consumed_tool_results(state["messages"])}
+    history = [collapsed.get(message.id, message) for message in state["messages"]]
+
+    older, _ = split_history(history, Config.MEMORY_TOKEN_BUDGET, Config.MEMORY_RECENT_TOKENS)
+    if not older:
+        return {"messages": list(collapsed.values())} if collapsed else {}
+
+    async with llm_limiter.slot(_thread_key(config), report_queued("llm")):
+        summary = await _summarize(older, state.get("summary"))
+    dropped = {message.id for message in older}
+    print(f"   🧠 Summarized {len(older)} older messages.")
+    return {
+        "summary": summary,
+        "messages": [RemoveMessage(id=message_id) for message_id in dropped]
+                    + [message for message_id, message in collapsed.items() if message_id not in dropped],
+    }
+
+
 def should_continue(state: AgentState) -> Literal["tools", "__end__"]:
     messages = state["messages"]
     last_message = messages[-1]
@@ -140,6 +194,79 @@ def should_continue(state: AgentState) -> Literal["tools", "__end__"]:
         return "tools"
     return "__end__"
 
+
+def _latest_tool_results(messages: list) -> List[ToolMessage]:
+    """The ToolMessages written by the last tools step."""
+    results = []
+    for message in reversed(messages):
+        if not isinstance(message, ToolMessage):
+            break
+        results.append(message)
+    return list(reversed(results))
+
+
+def _describe(leg: str, flight: FlightOption) -> str:
+    return (f"Selected {leg} flight: {flight.airline}, {flight.departure_time} ({flight.departure_city}) -> "
+            f"{flight.arrival_time} ({flight.arrival_city}), {flight.duration}, {flight.stops}, ${flight.price:.2f}")
+
+
+def _next_call(leg: str, flight: FlightOption, tool_name: str, chosen_id: str) -> AIMessage:
+    """An AIMessage that hands the picked flight to the next tool, exactly as the LLM would."""
+    return AIMessage(
+        content=f"{chosen_id}: {_describe(leg, flight)}",
+        tool_calls=[{"name": tool_name, "args": {"option_id": chosen_id}, "id": f"select-{uuid.uuid4().hex[:12]}", "type": "tool_call"}],
+    )
+
+
+async def select_node(state: AgentState):
+    """
+    Applies the saved preferences to fresh search results and chains straight
+    into the next tool, so no LLM round-trip is spent on picking flights.
+    Does nothing (the LLM takes over) without preferences or when nothing qualifies.
+    """
+    preferences = state.get("preferences")
+
+    for message in _latest_tool_results(state["messages"]):
+        if message.name == "plan_round_trip" and message.artifact:
+            # The fused tool already picked the legs; pin the ones it got to
+            plan = RoundTripPlan.model_validate(message.artifact)
+            legs = {"selected_outbound_flight": plan.outbound, "selected_return_flight": plan.return_flight}
+            return {key: flight for key, flight in legs.items() if flight is not None}
+        if message.name not in ("search_outbound_flights", "search_return_flights") or not message.artifact:
+            continue
+        if preferences is None:
+            return {}
+        flights = [FlightOption.model_validate(flight) for flight in message.artifact]
+
+        if message.name == "search_outbound_flights":
+            best = select_best(flights, preferences, "outbound")
+            if best is None:
+                print(f"   🧮 No outbound flight meets the preferences.")
+                return {}
+            print(f"   🧮 {_describe('outbound', best)}")
+            return {
+                "selected_outbound_flight": best,
+                "messages": [_next_call("outbound", best, "search_return_flights", option_id(OUTBOUND_PREFIX, flights.index(best)))],
+            }
+
+        best = select_best(flights, preferences, "return")
+        if best is None:
+            print(f"   🧮 No return flight meets the preferences.")
+            return {}
+        print(f"   🧮 {_describe('return', best)}")
+        return {
+            "selected_return_flight": best,
+            "messages": [_next_call("return", best, "generate_booking_link", option_id(RETURN_PREFIX, flights.index(best)))],
+        }
+    return {}
+
+
+def after_selection(state: AgentState) -> Literal["tools", "agent"]:
+    last_message = state["messages"][-1]
+    if isinstance(last_message, AIMessage) and last_message.tool_calls:
+        return "tools"
+    return "agent"
+
 # ------------------------------------------------------------------
 # 6. BUILD THE GRAPH
 # ------------------------------------------------------------------
@@ -147,19 +274,60 @@ def should_continue(state: AgentState) -> Literal["tools", "__end__"]:
 
 def create_agent():
     workflow = StateGraph(AgentState)
+    workflow.add_node("memory", memory_node)
     workflow.add_node("agent", chatbot_node)
     tool_node = ToolNode(tools)
     workflow.add_node("tools", tool_node)
-    workflow.set_entry_point("agent")
+    workflow.add_node("select", select_node)
+    workflow.set_entry_point("memory")
+    workflow.add_edge("memory", "agent")
     workflow.add_conditional_edges("agent", should_continue)
-    workflow.add_edge("tools", "agent")
-    memory = MemorySaver()
-    return workflow.compile(checkpointer=memory)
+    workflow.add_edge("tools", "select")
+    workflow.add_conditional_edges("select", after_selection)
+    # Every node, LLM call and tool call feeds the /metrics histograms
+    return workflow.compile(checkpointer=get_checkpointer()).with_config(callbacks=[GraphTimer()])
+
+
+def get_graph():
+    """The compiled agent graph."""
+    with _build_lock:
+        if "graph" not in _built:
+            _built["graph"] = create_agent()
+        return _built["graph"]
 
 
-compiled_graph = create_agent()
+def __getattr__(name: str):
+    # `agent.llm`, `agent.llm_with_tools`, `agent.checkpointer` and `agent.compiled_graph` still work, built on first access
+    accessors = {"llm": get_llm, "llm_with_tools": get_llm_with_tools, "checkpointer": get_checkpointer, "compiled_graph": get_graph}
+    if name in accessors:
+        return accessors[name]()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+# ------------------------------------------------------------------
+# 7. CANCELLED TURNS
+# ------------------------------------------------------------------
+CANCELLED_TOOL_RESULT = "Cancelled: the user left before this finished. Run it again if it is still needed."
+
+
+async def record_cancelled_turn(graph, config: RunnableConfig) -> int:
+    """
+    Called once a turn was cancelled mid-way (the client disconnected). The last
+    checkpoint may end on tool calls that never got a result, which the LLM
+    rejects on the next turn; each is answered with `CANCELLED_TOOL_RESULT`, as
+    if the tools step had returned it. Returns how many calls were closed.
+    """
+    snapshot = await graph.aget_state(config)
+    messages = (snapshot.values or {}).get("messages", [])
+    answered = {message.tool_call_id for message in messages if isinstance(message, ToolMessage)}
+    last_call = next((message for message in reversed(messages) if isinstance(message, AIMessage) and message.tool_calls), None)
+    pending = [call for call in last_call.tool_calls if call["id"] not in answered] if last_call else []
+    if pending:
+        results = [ToolMessage(content=CANCELLED_TOOL_RESULT, tool_call_id=call["id"], name=call["name"], status="error") for call in pending]
+        await graph.aupdate_state(config, {"messages": results}, as_node="tools")
+    return len(pending)
+
 # ------------------------------------------------------------------
-# 7. RUNNER (CLI MODE)
+# 8. RUNNER (CLI MODE)
 # ------------------------------------------------------------------
 
 
@@ -176,7 +344,7 @@ async def main():
         }
         print("   (Thinking...)")
         try:
-            async for event in compiled_graph.astream(initial_state, stream_mode="values"):
+            async for event in get_graph().astream(initial_state, stream_mode="values"):
                 if "messages" in event:
                     last_msg = event["messages"][-1]
                     # LOGGING
@@ -200,6 +368,10 @@ async def main():
                         chat_history = event["messages"]
         except Exception as e:
             print(f"❌ Error: {e}")
+    await get_checkpointer().stop()
+    await prefetcher.stop()
+    await session_registry.stop()
+    await browser_pool.stop()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,259 @@
+import asyncio
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Optional, Set
+
+import aiosqlite
+from langgraph.checkpoint.memory import MemorySaver
+from langgraph.checkpoint.serde.jsonplus import JsonPlusSerializer
+from langgraph.checkpoint.sqlite.aio import AsyncSqliteSaver
+
+from src.config import Config
+from src.state import DateMatrixCell, DateMatrixResult, FlightOption, RoundTripPlan, TripPreferences
+
+# Compaction keeps only the newest checkpoints of a thread. That is safe because
+# AgentState uses plain reducer channels (add_messages): every checkpoint holds the
+# full state and never needs its ancestors.
+
+# Our own models stored in AgentState; everything else is rejected on load
+STATE_TYPES = [(model.__module__, model.__name__) for model in (FlightOption, TripPreferences, RoundTripPlan, DateMatrixCell, DateMatrixResult)]
+
+def _serde() -> JsonPlusSerializer:
+    return JsonPlusSerializer(allowed_msgpack_modules=STATE_TYPES)
+
+# ------------------------------------------------------------------
+# 1. EVICTION, COMPACTION AND METRICS (shared by every backend)
+# ------------------------------------------------------------------
+class EvictingCheckpointer(ABC):
+    """
+    Mixin for a LangGraph checkpointer. Threads idle for `Config.CHECKPOINT_THREAD_TTL`
+    seconds are deleted, at most `Config.CHECKPOINT_MAX_THREADS` are kept (least
+    recently used goes first), and threads written since the last sweep are
+    compacted to their newest `Config.CHECKPOINT_KEEP_PER_THREAD` checkpoints.
+    """
+    backend = "base"
+
+    def _init_eviction(self) -> None:
+        # thread_id -> last write (wall clock, so it can be persisted)
+        self._last_used: "OrderedDict[str, float]" = OrderedDict()
+        self._dirty: Set[str] = set()
+        self._sweeper: Optional[asyncio.Task] = None
+        self.evictions = 0
+        self.compacted_checkpoints = 0
+
+    async def aput(self, config, checkpoint, metadata, new_versions):
+        saved = await super().aput(config, checkpoint, metadata, new_versions)
+        self._touch(config["configurable"]["thread_id"])
+        await self._enforce_limits()
+        return saved
+
+    async def adelete_thread(self, thread_id: str) -> None:
+        await super().adelete_thread(thread_id)
+        self._last_used.pop(thread_id, None)
+        self._dirty.discard(thread_id)
+
+    def _touch(self, thread_id: str, at: Optional[float] = None) -> None:
+        self._last_used[thread_id] = at if at is not None else time.time()
+        self._last_used.move_to_end(thread_id)
+        self._dirty.add(thread_id)
+
+    # --- Eviction ---
+    async def evict_expired(self) -> None:
+        cutoff = time.time() - Config.CHECKPOINT_THREAD_TTL
+        for thread_id, last_used in list(self._last_used.items()):
+            if last_used >= cutoff:
+                break  # ordered oldest first
+            print(f"🗑️  Checkpoints of thread {thread_id} expired")
+            await self.adelete_thread(thread_id)
+            self.evictions += 1
+
+    async def _enforce_limits(self) -> None:
+        while len(self._last_used) > Config.CHECKPOINT_MAX_THREADS:
+            oldest = next(iter(self._last_used))
+            await self.adelete_thread(oldest)
+            self.evictions += 1
+
+    # --- Compaction ---
+    @abstractmethod
+    async def compact(self, thread_id: str) -> int:
+        """Drops all but the newest checkpoints of `thread_id`. Returns how many went."""
+
+    async def sweep(self) -> None:
+        dirty, self._dirty = self._dirty, set()
+        for thread_id in dirty:
+            self.compacted_checkpoints += await self.compact(thread_id)
+        await self.evict_expired()
+
+    # --- Background sweeper ---
+    def start(self) -> None:
+        if self._sweeper is None:
+            self._sweeper = asyncio.create_task(self._sweep_loop())
+
+    async def stop(self) -> None:
+        if self._sweeper:
+            self._sweeper.cancel()
+            try:
+                await self._sweeper
+            except asyncio.CancelledError:
+                pass
+            self._sweeper = None
+
+    async def _sweep_loop(self) -> None:
+        while True:
+            await asyncio.sleep(Config.CHECKPOINT_SWEEP_INTERVAL)
+            try:
+                await self.sweep()
+            except Exception as e:
+                print(f"⚠️ Checkpoint sweep failed: {e}")
+
+    # --- Metrics ---
+    @abstractmethod
+    async def _sizes(self) -> dict:
+        """Stored checkpoints and bytes, plus anything backend-specific."""
+
+    async def stats(self) -> dict:
+        sizes = await self._sizes()
+        return {
+            "backend": self.backend,
+            "threads": len(self._last_used),
+            **sizes,
+            "evictions": self.evictions,
+            "compacted_checkpoints": self.compacted_checkpoints,
+        }
+
+# ------------------------------------------------------------------
+# 2. IN-PROCESS BACKEND
+# ------------------------------------------------------------------
+class EvictingMemorySaver(EvictingCheckpointer, MemorySaver):
+    """MemorySaver with bounded memory. Still lost on restart."""
+    backend = "memory"
+
+    def __init__(self):
+        super().__init__(serde=_serde())
+        self._init_eviction()
+
+    async def compact(self, thread_id: str) -> int:
+        removed = 0
+        for checkpoint_ns, checkpoints in self.storage.get(thread_id, {}).items():
+            ids = sorted(checkpoints)  # checkpoint ids sort by creation time
+            stale, kept = ids[:-Config.CHECKPOINT_KEEP_PER_THREAD], ids[-Config.CHECKPOINT_KEEP_PER_THREAD:]
+            if not stale:
+                continue
+            for checkpoint_id in stale:
+                del checkpoints[checkpoint_id]
+                self.writes.pop((thread_id, checkpoint_ns, checkpoint_id), None)
+            # Channel blobs are shared between checkpoints; keep the ones still referenced
+            referenced = set()
+            for checkpoint_id in kept:
+                checkpoint = self.serde.loads_typed(checkpoints[checkpoint_id][0])
+                referenced.update(checkpoint["channel_versions"].items())
+            for key in [k for k in self.blobs if k[0] == thread_id and k[1] == checkpoint_ns]:
+                if (key[2], key[3]) not in referenced:
+                    del self.blobs[key]
+            removed += len(stale)
+        return removed
+
+    async def _sizes(self) -> dict:
+        checkpoints = sum(len(c) for namespaces in self.storage.values() for c in namespaces.values())
+        size = sum(len(blob[1]) for blob in self.blobs.values())
+        size += sum(len(saved[0][1]) + len(saved[1][1]) for namespaces in self.storage.values() for c in namespaces.values() for saved in c.values())
+        size += sum(len(write[2][1]) for writes in self.writes.values() for write in writes.values())
+        return {"checkpoints": checkpoints, "bytes": size}
+
+# ------------------------------------------------------------------
+# 3. SQLITE BACKEND (survives restarts)
+# ------------------------------------------------------------------
+class EvictingSqliteSaver(EvictingCheckpointer, AsyncSqliteSaver):
+    """
+    AsyncSqliteSaver on a local file. Last-use times are persisted in a
+    `thread_activity` table so TTL and LRU order survive restarts too.
+    Build it inside the event loop that will use it.
+    """
+    backend = "sqlite"
+
+    def __init__(self, path: str):
+        conn = aiosqlite.connect(path)  # only opened (awaited) by setup() on first use
+        super().__init__(conn, serde=_serde())
+        self.path = path
+        self._activity_loaded = False
+        self._init_eviction()
+
+    async def setup(self) -> None:
+        await super().setup()
+        if self._activity_loaded:
+            return
+        async with self.lock:
+            if self._activity_loaded:
+                return
+            await self.conn.execute("CREATE TABLE IF NOT EXISTS thread_activity (thread_id TEXT PRIMARY KEY, last_used REAL NOT NULL)")
+            await self.conn.commit()
+            async with self.conn.execute("SELECT thread_id, last_used FROM thread_activity ORDER BY last_used") as cursor:
+                for thread_id, last_used in await cursor.fetchall():
+                    self._last_used[thread_id] = last_used
+            self._activity_loaded = True
+
+    async def sweep(self) -> None:
+        await self.setup()  # loads the persisted last-use times after a restart
+        await super().sweep()
+
+    async def adelete_thread(self, thread_id: str) -> None:
+        await super().adelete_thread(thread_id)
+        async with self.lock:
+            await self.conn.execute("DELETE FROM thread_activity WHERE thread_id = ?", (thread_id,))
+            await self.conn.commit()
+
+    async def compact(self, thread_id: str) -> int:
+        await self.setup()
+        async with self.lock:
+            # Persist the last-use time with the compaction, not on every write
+            last_used = self._last_used.get(thread_id)
+            if last_used is not None:
+                await self.conn.execute(
+                    "INSERT INTO thread_activity (thread_id, last_used) VALUES (?, ?) "
+                    "ON CONFLICT(thread_id) DO UPDATE SET last_used = excluded.last_used",
+                    (thread_id, last_used),
+                )
+            cursor = await self.conn.execute(
+                """
+                DELETE FROM checkpoints WHERE thread_id = ? AND checkpoint_id NOT IN (
+                    SELECT checkpoint_id FROM checkpoints AS newest
+                    WHERE newest.thread_id = checkpoints.thread_id AND newest.checkpoint_ns = checkpoints.checkpoint_ns
+                    ORDER BY checkpoint_id DESC LIMIT ?
+                )
+                """,
+                (thread_id, Config.CHECKPOINT_KEEP_PER_THREAD),
+            )
+            removed = cursor.rowcount
+            await self.conn.execute(
+                "DELETE FROM writes WHERE thread_id = ? AND checkpoint_id NOT IN (SELECT checkpoint_id FROM checkpoints WHERE thread_id = ?)",
+                (thread_id, thread_id),
+            )
+            await self.conn.commit()
+        return max(removed, 0)
+
+    async def _sizes(self) -> dict:
+        await self.setup()
+        async with self.lock:
+            async with self.conn.execute("SELECT COUNT(*) FROM checkpoints") as cursor:
+                (checkpoints,) = await cursor.fetchone()
+            async with self.conn.execute("SELECT page_count * page_size FROM pragma_page_count(), pragma_page_size()") as cursor:
+                (size,) = await cursor.fetchone()
+        return {"checkpoints": checkpoints, "bytes": size, "path": self.path}
+
+    async def stop(self) -> None:
+        await super().stop()
+        if self.is_setup:
+            await self.sweep()  # persist last-use times before the file is closed
+            await self.conn.close()
+
+# ------------------------------------------------------------------
+# 4. FACTORY
+# ------------------------------------------------------------------
+def create_checkpointer(backend: Optional[str] = None) -> EvictingCheckpointer:
+    backend = backend or Config.CHECKPOINTER_BACKEND
+    if backend == "sqlite":
+        return EvictingSqliteSaver(Config.CHECKPOINT_SQLITE_PATH)
+    if backend == "memory":
+        return EvictingMemorySaver()
+    raise ValueError(f"Unknown CHECKPOINTER_BACKEND: {backend!r} (use 'memory' or 'sqlite')")
@@ -8,10 +8,124 @@ class Config:
     # True - brower runs in background; False - browser window is visible
     HEADLESS = True
     TIMEOUT = 30000 
+    # Where the flight tools search (point at tests/fake_flights_server.py to run offline)
+    FLIGHTS_BASE_URL = os.getenv("FLIGHTS_BASE_URL", "https://www.google.com/travel/flights")
     
     # 2. The Human Mask
     # Makes the browser appear more like a real user
     USER_AGENT = "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/128.0.0.0 Safari/537.36"
     
     # 3. Model Name
-    MODEL_NAME = "gemini-3-flash-preview"
\ No newline at end of file
+    MODEL_NAME = "gemini-3-flash-preview"
+
+    # 4. Browser Pool
+    # Warm Chromium processes shared by every tool call (False - launch a browser per call)
+    BROWSER_POOL_ENABLED = os.getenv("BROWSER_POOL_ENABLED", "true").lower() == "true"
+    BROWSER_POOL_SIZE = int(os.getenv("BROWSER_POOL_SIZE", "2"))
+    # Seconds between checks for crashed/disconnected browsers
+    BROWSER_HEALTH_CHECK_INTERVAL = 30
+
+    # 5. Live Sessions
+    # Keep the selection page open between the outbound -> return -> booking-link tools
+    SESSIONS_ENABLED = os.getenv("SESSIONS_ENABLED", "true").lower() == "true"
+    SESSION_IDLE_TTL = int(os.getenv("SESSION_IDLE_TTL", "300"))   # seconds
+    MAX_OPEN_SESSIONS = int(os.getenv("MAX_OPEN_SESSIONS", "20"))
+    MAX_PAGES_PER_SESSION = 9   # one per airport pair of a search between two 3-airport metros (NYC -> WAS); bigger fan-outs close the oldest
+    SESSION_SWEEP_INTERVAL = 30
+
+    # 6. Card Extraction
+    # "bulk" - all cards in one page.evaluate call; "locator" - one text_content call per card
+    CARD_EXTRACTION_MODE = os.getenv("CARD_EXTRACTION_MODE", "bulk")
+
+    # 7. Search Result Cache
+    SEARCH_CACHE_ENABLED = os.getenv("SEARCH_CACHE_ENABLED", "true").lower() == "true"
+    SEARCH_CACHE_TTL = int(os.getenv("SEARCH_CACHE_TTL", "600"))   # seconds
+    SEARCH_CACHE_MAX_BYTES = int(os.getenv("SEARCH_CACHE_MAX_BYTES", str(32 * 1024 * 1024)))
+    # Path to a SQLite file for a cache that survives restarts ("" - memory only)
+    SEARCH_CACHE_SQLITE_PATH = os.getenv("SEARCH_CACHE_SQLITE_PATH", "")
+
+    # 8. Page Readiness (milliseconds)
+    # Each signal gives up after its own timeout; the first one to fire wins
+    READY_URL_CHANGE_TIMEOUT = 10000
+    READY_CARDS_RERENDER_TIMEOUT = 10000
+    READY_NETWORK_IDLE_TIMEOUT = 8000
+    READY_RESULTS_STABLE_TIMEOUT = 8000
+    READY_NETWORK_IDLE_WINDOW = 500     # no requests in flight for this long
+    READY_RESULTS_STABLE_WINDOW = 400   # result list unchanged for this long
+
+    # 9. Request Blocking
+    # We only read text from the result cards, so skip everything that is not needed to render them
+    BLOCK_RESOURCES_ENABLED = os.getenv("BLOCK_RESOURCES_ENABLED", "true").lower() == "true"
+    BLOCKED_RESOURCE_TYPES = ["image", "media", "font"]
+    BLOCKED_URL_PATTERNS = [
+        "google-analytics.com", "googletagmanager.com", "doubleclick.net",
+        "googlesyndication.com", "googleadservices.com", "/gen_204", "/log?",
+        "maps.googleapis.com", "maps.gstatic.com", "khms", "/maps/vt",
+    ]
+    # Always loaded, even if a rule above matches
+    ALLOWED_URL_PATTERNS = []
+    # Blocked requests never report a size; typical sizes used to estimate bytes saved
+    BLOCKED_BYTES_ESTIMATE = {
+        "image": 30000, "media": 250000, "font": 40000,
+        "script": 60000, "stylesheet": 20000, "xhr": 3000, "fetch": 3000, "other": 5000,
+    }
+
+    # 10. Multi-Airport Fan-out
+    # Airport pairs scraped at the same time for metro / multi-airport searches
+    FANOUT_CONCURRENCY = int(os.getenv("FANOUT_CONCURRENCY", "3"))
+
+    # 11. Flexible-Date Matrix
+    DATE_MATRIX_MAX_FLEX_DAYS = 3        # +/- days around each requested date
+    DATE_MATRIX_CONCURRENCY = int(os.getenv("DATE_MATRIX_CONCURRENCY", "4"))
+    DATE_MATRIX_BEST_OPTIONS = 5
+
+    # 12. Conversation Memory
+    # Above this many (approximate) history tokens, older turns are summarized
+    MEMORY_TOKEN_BUDGET = int(os.getenv("MEMORY_TOKEN_BUDGET", "8000"))
+    MEMORY_RECENT_TOKENS = int(os.getenv("MEMORY_RECENT_TOKENS", "3000"))   # newest turns kept verbatim
+    MEMORY_COLLAPSE_CHARS = 400          # tool results longer than this shrink to one line once used
+
+    # 13. Conversation Checkpoints
+    CHECKPOINTER_BACKEND = os.getenv("CHECKPOINTER_BACKEND", "sqlite")    # "sqlite" (survives restarts) or "memory"
+    CHECKPOINT_SQLITE_PATH = os.getenv("CHECKPOINT_SQLITE_PATH", "checkpoints.sqlite")
+    CHECKPOINT_THREAD_TTL = int(os.getenv("CHECKPOINT_THREAD_TTL", "86400"))   # idle seconds before a thread is deleted
+    CHECKPOINT_MAX_THREADS = int(os.getenv("CHECKPOINT_MAX_THREADS", "1000"))  # least recently used thread goes first
+    CHECKPOINT_KEEP_PER_THREAD = 3       # newest checkpoints kept per thread by compaction
+    CHECKPOINT_SWEEP_INTERVAL = 60       # seconds between compaction / expiry sweeps
+
+    # 14. Metrics (seconds)
+    # Histogram buckets of /metrics; a full chat turn can take a minute
+    METRICS_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+    # 15. Speculative Return Prefetch
+    # After an outbound search, scrape the returns of the likeliest picks in background tabs
+    PREFETCH_ENABLED = os.getenv("PREFETCH_ENABLED", "false").lower() == "true"
+    PREFETCH_TOP_K = int(os.getenv("PREFETCH_TOP_K", "2"))
+
+    # 16. Admission Control
+    # Chat turns running at once; the rest wait in a per-thread fair queue
+    CHAT_MAX_CONCURRENT = int(os.getenv("CHAT_MAX_CONCURRENT", "8"))
+    CHAT_MAX_QUEUE = int(os.getenv("CHAT_MAX_QUEUE", "32"))      # past this, /chat answers 503
+    BROWSER_MAX_PAGES = int(os.getenv("BROWSER_MAX_PAGES", "6"))  # pages open at once, all threads together
+    LLM_MAX_CONCURRENT = int(os.getenv("LLM_MAX_CONCURRENT", "4"))
+    ADMISSION_RETRY_AFTER = 5            # seconds, sent with a 503
+
+    # 17. Scrape Workers
+    # Browser work runs in this many local worker processes (0 = in the API process)
+    SCRAPE_WORKERS = int(os.getenv("SCRAPE_WORKERS", "0"))
+    SCRAPE_JOB_TIMEOUT = 180             # seconds before a job is given up on
+
+    # 18. Client Disconnects
+    # How often a /chat turn with no news checks that its client is still there
+    DISCONNECT_POLL_INTERVAL = 1.0       # seconds
+
+    # 19. Price Watch
+    # Registered route/date searches re-scraped in the background; only changes are stored
+    PRICE_WATCH_ENABLED = os.getenv("PRICE_WATCH_ENABLED", "true").lower() == "true"
+    PRICE_WATCH_SQLITE_PATH = os.getenv("PRICE_WATCH_SQLITE_PATH", "price_watch.sqlite")
+    PRICE_WATCH_INTERVAL = int(os.getenv("PRICE_WATCH_INTERVAL", "21600"))   # seconds between polls of a watch
+    PRICE_WATCH_JITTER = 0.2             # each interval is stretched or shrunk by up to 20%
+    PRICE_WATCH_CONCURRENCY = int(os.getenv("PRICE_WATCH_CONCURRENCY", "2"))  # polls running at once
+    PRICE_WATCH_MAX_WATCHES = int(os.getenv("PRICE_WATCH_MAX_WATCHES", "200"))
+    PRICE_WATCH_TICK = 30                # seconds between looks for due watches
+    PRICE_WATCH_RECENT_CHANGES = 20      # changes returned with a snapshot
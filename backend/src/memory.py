@@ -0,0 +1,98 @@
+from typing import List, Optional, Tuple
+
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage, ToolMessage
+from langchain_core.messages.utils import count_tokens_approximately
+
+from src.config import Config
+from src.streaming import message_text
+
+SUMMARY_PROMPT = """You keep the notes of a flight-planning assistant.
+Update the notes with the conversation below. Keep: the user's trip (airports, dates),
+their preferences, flights already chosen or rejected, booking links, and any open question.
+Drop small talk and raw search results. At most 150 words."""
+
+# ------------------------------------------------------------------
+# 1. COLLAPSE USED TOOL RESULTS
+# ------------------------------------------------------------------
+def _text(message: BaseMessage) -> str:
+    return message_text(message.content)
+
+def collapse_consumed_tool_results(messages: List[BaseMessage]) -> List[ToolMessage]:
+    """
+    Tool results from earlier turns (before the latest user message) have been
+    read already. Long ones are replaced (same id) by their first line; the
+    artifact stays, so option ids still resolve.
+    """
+    last_user = max((i for i, m in enumerate(messages) if isinstance(m, HumanMessage)), default=-1)
+    collapsed = []
+    for message in messages[:last_user]:
+        if not isinstance(message, ToolMessage) or len(_text(message)) <= Config.MEMORY_COLLAPSE_CHARS:
+            continue
+        first_line = _text(message).splitlines()[0][:200]
+        collapsed.append(ToolMessage(
+            content=f"{first_line} [full result collapsed after use]",
+            tool_call_id=message.tool_call_id,
+            name=message.name,
+            artifact=message.artifact,
+            id=message.id,
+        ))
+    return collapsed
+
+# ------------------------------------------------------------------
+# 2. WHAT TO SUMMARIZE
+# ------------------------------------------------------------------
+def split_history(messages: List[BaseMessage], budget: int, keep_tokens: int) -> Tuple[List[BaseMessage], List[BaseMessage]]:
+    """
+    (older messages to summarize, newest messages to keep). Only cuts at a user
+    message, so a tool call is never separated from its result, and always keeps
+    the current turn. Nothing is cut while the history fits in `budget`.
+    """
+    if count_tokens_approximately(messages) <= budget:
+        return [], messages
+    turn_starts = [i for i, m in enumerate(messages) if isinstance(m, HumanMessage)]
+    if not turn_starts:
+        return [], messages
+
+    cut = turn_starts[-1]
+    for start in reversed(turn_starts[:-1]):
+        if count_tokens_approximately(messages[start:]) > keep_tokens:
+            break
+        cut = start
+    return messages[:cut], messages[cut:]
+
+def transcript(messages: List[BaseMessage]) -> str:
+    lines = []
+    for message in messages:
+        if isinstance(message, HumanMessage):
+            lines.append(f"User: {_text(message)}")
+        elif isinstance(message, ToolMessage):
+            lines.append(f"Tool {message.name}: {_text(message).splitlines()[0] if _text(message) else ''}")
+        elif isinstance(message, AIMessage):
+            calls = ", ".join(f"{call['name']}({call['args']})" for call in message.tool_calls)
+            text = _text(message)
+            lines.append(f"Agent: {text}" + (f" [called {calls}]" if calls else ""))
+    return "\n".join(lines)
+
+# ------------------------------------------------------------------
+# 3. WHAT THE MODEL SEES INSTEAD
+# ------------------------------------------------------------------
+def memory_context(state: dict) -> str:
+    """Summary of older turns plus the pinned fields, appended to the system prompt."""
+    sections = []
+    if state.get("summary"):
+        sections.append(f"**Earlier in this conversation:**\n{state['summary']}")
+
+    pinned = []
+    if state.get("preferences"):
+        pinned.append(f"* Preferences: {state['preferences'].model_dump(exclude_defaults=True) or 'defaults'}")
+    for label, key in (("Selected outbound", "selected_outbound_flight"), ("Selected return", "selected_return_flight")):
+        flight = state.get(key)
+        if flight:
+            pinned.append(f"* {label}: {flight.airline} {flight.departure_time} -> {flight.arrival_time}, {flight.stops}, ${flight.price}")
+    if pinned:
+        sections.append("**Pinned:**\n" + "\n".join(pinned))
+    return "\n\n".join(sections)
+
+def summary_request(previous: Optional[str], older: List[BaseMessage]) -> str:
+    notes = f"Current notes:\n{previous}\n\n" if previous else ""
+    return f"{notes}Conversation:\n{transcript(older)}"
@@ -0,0 +1,147 @@
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, List, Optional, Tuple
+from uuid import UUID
+
+from langchain_core.callbacks import BaseCallbackHandler
+
+from src.config import Config
+
+# Latency histograms in the Prometheus text format (GET /metrics). Small enough
+# to keep in-house rather than pull in prometheus_client for four metrics.
+
+# Timings of the current /chat request, when it asked for them (see collect_timings)
+_timings: ContextVar[Optional[List[dict]]] = ContextVar("timings", default=None)
+
+# ------------------------------------------------------------------
+# 1. HISTOGRAM
+# ------------------------------------------------------------------
+class Histogram:
+    """A histogram with one label, e.g. `stage="page_goto"`."""
+
+    def __init__(self, name: str, help_text: str, label: str, buckets: Tuple[float, ...] = Config.METRICS_BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.label = label
+        self.buckets = tuple(sorted(buckets))
+        # label value -> [count per bucket (not cumulative)..., +Inf], sum
+        self._series: Dict[str, Tuple[List[int], List[float]]] = {}
+
+    @property
+    def short_name(self) -> str:
+        return self.name[len("travel_agent_"):-len("_seconds")]
+
+    def observe(self, value: str, seconds: float) -> None:
+        counts, total = self._series.setdefault(value, ([0] * (len(self.buckets) + 1), [0.0]))
+        counts[bisect_left(self.buckets, seconds)] += 1
+        total[0] += seconds
+        sink = _timings.get()
+        if sink is not None:
+            sink.append({"type": "timing", "metric": self.short_name, "name": value, "seconds": round(seconds, 4)})
+
+    @contextmanager
+    def time(self, value: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(value, time.perf_counter() - start)
+
+    def count(self, value: str) -> int:
+        series = self._series.get(value)
+        return sum(series[0]) if series else 0
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        for value, (counts, total) in sorted(self._series.items()):
+            label = f'{self.label}="{value}"'
+            cumulative = 0
+            for bound, count in zip(self.buckets, counts):
+                cumulative += count
+                lines.append(f'{self.name}_bucket{{{label},le="{bound}"}} {cumulative}')
+            lines.append(f'{self.name}_bucket{{{label},le="+Inf"}} {sum(counts)}')
+            lines.append(f"{self.name}_sum{{{label}}} {total[0]}")
+            lines.append(f"{self.name}_count{{{label}}} {sum(counts)}")
+        return lines
+
+    def reset(self) -> None:
+        self._series.clear()
+
+STAGE_SECONDS = Histogram(
+    "travel_agent_stage_seconds",
+    "Browser work: launch, page_goto, wait_for_selector, card_extraction, card_matching, click_wait.",
+    "stage",
+)
+GRAPH_STEP_SECONDS = Histogram("travel_agent_graph_step_seconds", "One run of a graph node.", "node")
+LLM_SECONDS = Histogram("travel_agent_llm_seconds", "One LLM call, by the graph node that made it.", "node")
+TOOL_SECONDS = Histogram("travel_agent_tool_seconds", "One tool call.", "tool")
+
+HISTOGRAMS = [STAGE_SECONDS, GRAPH_STEP_SECONDS, LLM_SECONDS, TOOL_SECONDS]
+
+def render_metrics() -> str:
+    return "\n".join(line for histogram in HISTOGRAMS for line in histogram.render()) + "\n"
+
+def replay_timings(timings: List[dict]) -> None:
+    """Records observations made in a scrape worker process as if they were made here."""
+    by_name = {histogram.short_name: histogram for histogram in HISTOGRAMS}
+    for timing in timings:
+        by_name[timing["metric"]].observe(timing["name"], timing["seconds"])
+
+def collect_timings() -> List[dict]:
+    """Every observation made by the current request from now on is also appended to the returned list."""
+    sink: List[dict] = []
+    _timings.set(sink)
+    return sink
+
+# ------------------------------------------------------------------
+# 2. GRAPH STEPS, LLM AND TOOL CALLS (LangChain callbacks)
+# ------------------------------------------------------------------
+class GraphTimer(BaseCallbackHandler):
+    """
+    Times every graph node, LLM call and tool call of the compiled graph.
+    Attached once with `compiled_graph.with_config(callbacks=[...])`.
+    """
+    run_inline = True  # on the event loop, so start/end times are not skewed by a thread hop
+
+    def __init__(self):
+        self._started: Dict[UUID, Tuple[Histogram, str, float]] = {}
+
+    def _start(self, run_id: UUID, histogram: Histogram, value: str) -> None:
+        self._started[run_id] = (histogram, value, time.perf_counter())
+
+    def _end(self, run_id: UUID) -> None:
+        started = self._started.pop(run_id, None)
+        if started:
+            histogram, value, start = started
+            histogram.observe(value, time.perf_counter() - start)
+
+    def on_chain_start(self, serialized, inputs, *, run_id, metadata=None, **kwargs):
+        node = (metadata or {}).get("langgraph_node")
+        if node and kwargs.get("name") == node:  # the node itself, not a runnable inside it
+            self._start(run_id, GRAPH_STEP_SECONDS, node)
+
+    def on_chat_model_start(self, serialized, messages, *, run_id, metadata=None, **kwargs):
+        self._start(run_id, LLM_SECONDS, (metadata or {}).get("langgraph_node", "none"))
+
+    def on_tool_start(self, serialized, input_str, *, run_id, **kwargs):
+        self._start(run_id, TOOL_SECONDS, kwargs.get("name") or (serialized or {}).get("name", "unknown"))
+
+    def on_chain_end(self, outputs, *, run_id, **kwargs):
+        self._end(run_id)
+
+    def on_chain_error(self, error, *, run_id, **kwargs):
+        self._end(run_id)
+
+    def on_llm_end(self, response, *, run_id, **kwargs):
+        self._end(run_id)
+
+    def on_llm_error(self, error, *, run_id, **kwargs):
+        self._end(run_id)
+
+    def on_tool_end(self, output, *, run_id, **kwargs):
+        self._end(run_id)
+
+    def on_tool_error(self, error, *, run_id, **kwargs):
+        self._end(run_id)
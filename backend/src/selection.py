@@ -0,0 +1,79 @@
+import re
+from typing import List, Optional, Tuple
+
+from src.state import FlightOption, TripPreferences
+
+# ------------------------------------------------------------------
+# 1. TIME-OF-DAY WINDOWS
+# ------------------------------------------------------------------
+# [start, end) in minutes after midnight; "night" wraps past midnight.
+TIME_WINDOWS = {
+    "morning": (5 * 60, 12 * 60),
+    "afternoon": (12 * 60, 17 * 60),
+    "evening": (17 * 60, 21 * 60),
+    "night": (21 * 60, 5 * 60),
+}
+
+_CLOCK_RE = re.compile(r"(\d{1,2}):(\d{2})\s*([AP]M)", re.IGNORECASE)
+
+def _minutes(clock: str) -> Optional[int]:
+    """"12:29 PM" -> 749. None if the string is not a clock time."""
+    match = _CLOCK_RE.search(clock or "")
+    if not match:
+        return None
+    hour, minute, meridiem = int(match.group(1)) % 12, int(match.group(2)), match.group(3).upper()
+    return (hour + (12 if meridiem == "PM" else 0)) * 60 + minute
+
+def in_window(clock: str, time_of_day: Optional[str]) -> bool:
+    if not time_of_day or time_of_day == "anytime":
+        return True
+    minutes = _minutes(clock)
+    if minutes is None:
+        return False
+    start, end = TIME_WINDOWS[time_of_day]
+    if start < end:
+        return start <= minutes < end
+    return minutes >= start or minutes < end
+
+# ------------------------------------------------------------------
+# 2. THE BUDGET POLICIES
+# ------------------------------------------------------------------
+def is_nonstop(flight: FlightOption) -> bool:
+    return flight.stops.strip().lower() == "nonstop"
+
+def _preferred_airline(flight: FlightOption, preferences: TripPreferences) -> bool:
+    if not preferences.preferred_airlines:
+        return True
+    airline = flight.airline.lower()
+    return any(wanted.lower() in airline for wanted in preferences.preferred_airlines)
+
+def _sort_key(flight: FlightOption, preferences: TripPreferences, time_of_day: Optional[str]) -> Tuple:
+    if preferences.budget_mode == "cheapest":
+        # Non-stop > Price: the cheapest non-stop wins, else the cheapest overall
+        return (not is_nonstop(flight), flight.price)
+    # "no_limit" (and "max_price" once over-budget flights are gone):
+    # Non-stop > Airline Preference > Timing > Price
+    return (
+        not is_nonstop(flight),
+        not _preferred_airline(flight, preferences),
+        not in_window(flight.departure_time, time_of_day),
+        flight.price,
+    )
+
+def rank_flights(flights: List[FlightOption], preferences: TripPreferences, leg: str = "outbound") -> List[FlightOption]:
+    """
+    Every eligible flight, best first. Hard filters (budget cap, non-stop only)
+    drop flights; everything else only changes the order.
+    """
+    time_of_day = preferences.outbound_time if leg == "outbound" else preferences.return_time
+    eligible = list(flights)
+    if preferences.budget_mode == "max_price" and preferences.max_price is not None:
+        eligible = [flight for flight in eligible if flight.price <= preferences.max_price]
+    if preferences.nonstop_only:
+        eligible = [flight for flight in eligible if is_nonstop(flight)]
+    return sorted(eligible, key=lambda flight: _sort_key(flight, preferences, time_of_day))
+
+def select_best(flights: List[FlightOption], preferences: TripPreferences, leg: str = "outbound") -> Optional[FlightOption]:
+    """The single best flight, or None if nothing passes the hard filters."""
+    ranked = rank_flights(flights, preferences, leg)
+    return ranked[0] if ranked else None
@@ -1,5 +1,5 @@
 import operator
-from typing import Annotated, List, TypedDict, Optional, Union
+from typing import Annotated, List, Literal, TypedDict, Optional, Union
 from langchain_core.messages import BaseMessage
 from langgraph.graph.message import add_messages
 from pydantic import BaseModel
@@ -23,6 +23,85 @@ class FlightOption(BaseModel):
     stops: str      
     booking_link: Optional[str] = None
 
+class DateMatrixCell(BaseModel):
+    """
+    One (depart, return) date pair of a flexible-date search.
+    """
+    depart_date: str
+    return_date: str
+    cheapest_price: Optional[float] = None
+    cheapest_flight: Optional[FlightOption] = None
+
+class DateMatrixResult(BaseModel):
+    """
+    Cheapest outbound price for every depart x return date pair.
+    `prices[i][j]` is the cheapest price departing `depart_dates[i]` and returning
+    `return_dates[j]` (None if nothing was found or return is before departure).
+    """
+    origin: str
+    destination: str
+    depart_dates: List[str]
+    return_dates: List[str]
+    prices: List[List[Optional[float]]]
+    best_options: List[DateMatrixCell]
+
+class TripPreferences(BaseModel):
+    """
+    The user's Phase 1 answers, in the shape the selection engine applies them.
+    """
+    budget_mode: Literal["max_price", "cheapest", "no_limit"] = "no_limit"
+    max_price: Optional[float] = None
+    nonstop_only: bool = False
+    preferred_airlines: List[str] = []
+    outbound_time: Literal["morning", "afternoon", "evening", "night", "anytime"] = "anytime"
+    return_time: Literal["morning", "afternoon", "evening", "night", "anytime"] = "anytime"
+
+class RoundTripPlan(BaseModel):
+    """
+    Result of the fused `plan_round_trip` tool. `status` says how far the
+    pipeline got: "booked", "no_outbound", "no_return" or "link_failed".
+    """
+    status: Literal["booked", "no_outbound", "no_return", "link_failed"]
+    outbound: Optional[FlightOption] = None
+    return_flight: Optional[FlightOption] = None
+    booking_link: Optional[str] = None
+    total_price: Optional[float] = None
+
+class PriceWatch(BaseModel):
+    """
+    A `search_outbound_flights` query that is re-scraped in the background.
+    Times are Unix seconds; `next_poll` is jittered so watches never poll in lockstep.
+    """
+    watch_id: str
+    origin: str
+    destination: str
+    depart_date: str
+    return_date: str
+    created_at: float
+    next_poll: float
+    first_polled: Optional[float] = None   # its flights are the baseline, not changes
+    last_polled: Optional[float] = None
+    polls: int = 0
+    failures: int = 0
+
+class PriceChange(BaseModel):
+    """
+    One difference between two polls of a watch; only these are stored.
+    `kind` is "added" (with the full `flight`), "price" or "removed".
+    """
+    at: float
+    kind: Literal["added", "price", "removed"]
+    flight_key: str
+    price: Optional[float] = None
+    previous_price: Optional[float] = None
+    flight: Optional[FlightOption] = None
+
+class WatchSnapshot(BaseModel):
+    """The latest flights of a watch (cheapest first) and its most recent changes (oldest first)."""
+    watch: PriceWatch
+    flights: List[FlightOption]
+    changes: List[PriceChange]
+
 # ------------------------------------------------------------------
 # 2. THE AGENT STATE
 # ------------------------------------------------------------------
@@ -37,6 +116,12 @@ class AgentState(TypedDict):
     # We use Optional because at the start of the chat, these are None.
     selected_outbound_flight: Optional[FlightOption]
     selected_return_flight: Optional[FlightOption]
+
+    # Structured Phase 1 preferences (set by the `set_trip_preferences` tool)
+    preferences: Optional[TripPreferences]
+
+    # Running summary of the turns that were trimmed from `messages`
+    summary: Optional[str]
     
     # Optional: Track if we are done
     is_booked: Optional[bool]
\ No newline at end of file
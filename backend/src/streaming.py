@@ -0,0 +1,179 @@
+import asyncio
+import json
+from typing import Any, AsyncIterator, Awaitable, Callable, List, Optional
+
+from src.config import Config
+
+# The final itinerary is a JSON object (see Step 6 of the system prompt), usually
+# wrapped in a ```json fence. Everything else the agent says is plain text.
+
+# ------------------------------------------------------------------
+# 1. MESSAGE TEXT
+# ------------------------------------------------------------------
+def message_text(content: Any) -> str:
+    """Text of a message or chunk; Gemini returns a list of blocks."""
+    if isinstance(content, list):
+        return "".join(block if isinstance(block, str) else block.get("text", "") for block in content if isinstance(block, (str, dict)))
+    return str(content or "")
+
+def strip_fence(text: str) -> str:
+    cleaned = text.strip()
+    if cleaned.startswith("```"):
+        cleaned = cleaned[3:]
+        if cleaned.startswith("json"):
+            cleaned = cleaned[4:]
+        if cleaned.rstrip().endswith("```"):
+            cleaned = cleaned.rstrip()[:-3]
+    return cleaned.strip()
+
+def final_message(text: str) -> dict:
+    """The `message` event: the itinerary object when the reply is JSON, else the text."""
+    try:
+        return {"type": "message", "content": json.loads(strip_fence(text))}
+    except (json.JSONDecodeError, TypeError):
+        return {"type": "message", "content": text}
+
+# ------------------------------------------------------------------
+# 2. INCREMENTAL PARSER
+# ------------------------------------------------------------------
+class ItineraryStream:
+    """
+    Consumes the tokens of one agent reply. Plain text is passed on as `token`
+    events; for a JSON reply each top-level field (`intro`, `outbound`,
+    `return`, ...) is sent as a `partial` event as soon as its value is closed.
+    """
+
+    def __init__(self):
+        self.text = ""
+        self.is_json: Optional[bool] = None
+        self._pos = 0           # next character to scan
+        self._depth = 0         # 0 = before the opening brace
+        self._in_string = False
+        self._escape = False
+        self._field_start = 0
+        self._closed = False
+
+    def feed(self, token: str) -> List[dict]:
+        self.text += token
+        if self.is_json is None:
+            head = self.text.lstrip()
+            if not head or (head.startswith("`") and len(head) < 3):
+                return []  # can't tell yet
+            self.is_json = head.startswith("{") or head.startswith("```")
+            if not self.is_json:
+                return [{"type": "token", "content": self.text}]
+        if not self.is_json:
+            return [{"type": "token", "content": token}]
+        return self._scan()
+
+    def _scan(self) -> List[dict]:
+        events = []
+        text = self.text
+        while self._pos < len(text) and not self._closed:
+            i, c = self._pos, text[self._pos]
+            self._pos += 1
+            if self._depth == 0:
+                if c == "{":
+                    self._depth = 1
+                    self._field_start = self._pos
+                continue
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif c == "\\":
+                    self._escape = True
+                elif c == '"':
+                    self._in_string = False
+            elif c == '"':
+                self._in_string = True
+            elif c in "{[":
+                self._depth += 1
+            elif c in "}]":
+                self._depth -= 1
+                if self._depth == 0:
+                    events += self._field(text[self._field_start:i])
+                    self._closed = True
+            elif c == "," and self._depth == 1:
+                events += self._field(text[self._field_start:i])
+                self._field_start = self._pos
+        return events
+
+    @staticmethod
+    def _field(segment: str) -> List[dict]:
+        segment = segment.strip()
+        if not segment:
+            return []
+        try:
+            (field, value), = json.loads("{" + segment + "}").items()
+        except (json.JSONDecodeError, ValueError):
+            return []
+        return [{"type": "partial", "field": field, "content": value}]
+
+# ------------------------------------------------------------------
+# 3. STOPPING WHEN THE CLIENT LEAVES
+# ------------------------------------------------------------------
+class ClientDisconnected(Exception):
+    """The /chat client closed the connection before the turn finished."""
+
+_DONE = object()
+_cleanups = set()  # keeps abandoned-run cleanups alive until they finish
+
+async def until_disconnected(
+    events: AsyncIterator,
+    is_disconnected: Callable[[], Awaitable[bool]],
+    on_abandoned: Optional[Callable[[], Awaitable[Any]]] = None,
+) -> AsyncIterator:
+    """
+    Yields from `events`, which runs in a task of its own. The client is checked
+    every `Config.DISCONNECT_POLL_INTERVAL` seconds, even while nothing is being
+    sent (a scrape in progress). Once it has gone the task is cancelled, and with
+    it whatever node, LLM call or scrape it was awaiting; then ClientDisconnected.
+    Whenever the run is cut short, `on_abandoned` runs after it has fully stopped.
+    """
+    queue: asyncio.Queue = asyncio.Queue()
+
+    async def drive() -> None:
+        try:
+            async for event in events:
+                queue.put_nowait(event)
+        finally:
+            queue.put_nowait(_DONE)
+
+    task = asyncio.create_task(drive())
+    getter: Optional[asyncio.Future] = None
+    loop = asyncio.get_running_loop()
+    next_check = loop.time() + Config.DISCONNECT_POLL_INTERVAL
+    try:
+        while True:
+            getter = getter or asyncio.ensure_future(queue.get())
+            await asyncio.wait({getter}, timeout=max(0.0, next_check - loop.time()))
+            if loop.time() >= next_check:
+                if await is_disconnected():
+                    raise ClientDisconnected()
+                next_check = loop.time() + Config.DISCONNECT_POLL_INTERVAL
+            if not getter.done():
+                continue
+            event, getter = getter.result(), None
+            if event is _DONE:
+                await task  # raises what the run raised
+                return
+            yield event
+    finally:
+        if getter is not None:
+            getter.cancel()
+        if not task.done():
+            task.cancel()
+            # Not cancellable itself: if we are being cancelled, it finishes on its own
+            cleanup = asyncio.create_task(_after_abandoned(task, on_abandoned))
+            _cleanups.add(cleanup)
+            cleanup.add_done_callback(_cleanups.discard)
+            await asyncio.shield(cleanup)
+
+async def _after_abandoned(task: asyncio.Task, on_abandoned: Optional[Callable[[], Awaitable[Any]]]) -> None:
+    await asyncio.gather(task, return_exceptions=True)
+    if on_abandoned is None:
+        return
+    try:
+        await on_abandoned()
+    except Exception as e:
+        print(f"⚠️ Cleanup after a cancelled turn failed: {e}")
@@ -0,0 +1,39 @@
+# ------------------------------------------------------------------
+# AIRLINE NAME TABLE
+# ------------------------------------------------------------------
+# Names as Google Flights prints them on result cards.
+# Order is priority: when a card mentions several carriers, the earliest entry wins.
+COMMON_AIRLINES = [
+    "Delta", "United", "American", "JetBlue", "Southwest",
+    "Spirit", "Frontier", "Alaska", "British Airways", "Virgin Atlantic",
+    "Air France", "Lufthansa", "Emirates", "Qatar", "Singapore Airlines"
+]
+
+OTHER_AIRLINES = [
+    # North America & Caribbean
+    "Hawaiian", "Sun Country", "Allegiant", "Breeze", "Avelo", "Air Canada",
+    "WestJet", "Porter", "Flair", "Aeromexico", "Volaris", "Viva Aerobus",
+    "Copa", "Caribbean Airlines", "Bahamasair", "Cape Air", "Silver Airways",
+    "Contour", "Southern Airways Express",
+    # Latin America
+    "Avianca", "LATAM", "Azul", "JetSMART", "Aerolineas Argentinas", "Sky Airline",
+    # Europe
+    "KLM", "Aer Lingus", "Iberia", "Air Europa", "Vueling", "TAP Air Portugal",
+    "Swiss", "Austrian", "Brussels Airlines", "Finnair", "Icelandair", "PLAY",
+    "Norse Atlantic", "Scandinavian Airlines", "Norwegian", "ITA Airways",
+    "Aegean", "Condor", "Eurowings", "easyJet", "Ryanair", "Wizz Air",
+    "Turkish Airlines", "Pegasus", "LOT Polish Airlines", "Air Serbia",
+    # Middle East & Africa
+    "Etihad", "Oman Air", "Gulf Air", "Kuwait Airways", "Saudia", "flydubai",
+    "Air Arabia", "Royal Jordanian", "El Al", "EgyptAir", "Ethiopian",
+    "Kenya Airways", "South African Airways", "Royal Air Maroc", "RwandAir",
+    # Asia & Pacific
+    "Air India", "IndiGo", "Vistara", "Korean Air", "Asiana", "China Airlines",
+    "EVA Air", "Cathay Pacific", "Air China", "China Eastern", "China Southern",
+    "Hainan", "Japan Airlines", "All Nippon Airways", "Thai Airways",
+    "Vietnam Airlines", "Philippine Airlines", "Cebu Pacific", "Malaysia Airlines",
+    "AirAsia", "Garuda Indonesia", "Scoot", "Qantas", "Virgin Australia",
+    "Jetstar", "Air New Zealand", "Fiji Airways",
+]
+
+AIRLINE_NAMES = COMMON_AIRLINES + OTHER_AIRLINES
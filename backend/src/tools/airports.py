@@ -0,0 +1,45 @@
+import re
+from typing import List
+
+# ------------------------------------------------------------------
+# METRO (CITY) CODES -> AIRPORTS
+# ------------------------------------------------------------------
+# Only metro codes that are not also the IATA code of a single airport.
+METRO_AIRPORTS = {
+    "NYC": ["JFK", "LGA", "EWR"],
+    "WAS": ["IAD", "DCA", "BWI"],
+    "CHI": ["ORD", "MDW"],
+    "YTO": ["YYZ", "YTZ"],
+    "YMQ": ["YUL", "YHU"],
+    "LON": ["LHR", "LGW", "STN", "LTN", "LCY", "SEN"],
+    "PAR": ["CDG", "ORY"],
+    "MIL": ["MXP", "LIN", "BGY"],
+    "ROM": ["FCO", "CIA"],
+    "STO": ["ARN", "BMA"],
+    "TYO": ["HND", "NRT"],
+    "OSA": ["KIX", "ITM"],
+    "SEL": ["ICN", "GMP"],
+    "BJS": ["PEK", "PKX"],
+    "BUE": ["EZE", "AEP"],
+    "RIO": ["GIG", "SDU"],
+    "SAO": ["GRU", "CGH", "VCP"],
+}
+
+def expand_airports(spec: str) -> List[str]:
+    """
+    "JFK" -> ["JFK"];  "NYC" -> ["JFK", "LGA", "EWR"];  "JFK, EWR" or "JFK/EWR" -> ["JFK", "EWR"].
+    Anything that is not a three-letter code ("New York") is kept as written for
+    the search query. Order is kept and duplicates are dropped.
+    """
+    airports: List[str] = []
+    for part in re.split(r"[,/|]", spec):
+        part = part.strip()
+        if not part:
+            continue
+        codes = [part]
+        if re.fullmatch(r"[A-Za-z]{3}", part):
+            codes = METRO_AIRPORTS.get(part.upper(), [part.upper()])
+        for airport in codes:
+            if airport not in airports:
+                airports.append(airport)
+    return airports
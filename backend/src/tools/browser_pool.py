@@ -0,0 +1,201 @@
+import asyncio
+import itertools
+from contextlib import asynccontextmanager
+from typing import Dict, List, Optional
+
+from src.config import Config
+from src.metrics import STAGE_SECONDS
+
+LAUNCH_ARGS = ["--disable-blink-features=AutomationControlled"]
+
+# ------------------------------------------------------------------
+# 1. A SINGLE POOLED BROWSER
+# ------------------------------------------------------------------
+class PooledBrowser:
+    """
+    One long-lived Chromium process plus the bookkeeping the pool needs.
+    """
+    def __init__(self, slot: int):
+        self.slot = slot
+        self.browser = None
+        self.active_contexts = 0
+        self.relaunch_lock = asyncio.Lock()
+
+    @property
+    def healthy(self) -> bool:
+        return self.browser is not None and self.browser.is_connected()
+
+    async def launch(self, playwright) -> None:
+        with STAGE_SECONDS.time("browser_launch"):
+            self.browser = await playwright.chromium.launch(headless=Config.HEADLESS, args=LAUNCH_ARGS)
+        self.active_contexts = 0
+
+    async def close(self) -> None:
+        if self.browser is None:
+            return
+        try:
+            await self.browser.close()
+        except Exception:
+            pass
+        self.browser = None
+
+# ------------------------------------------------------------------
+# 2. THE PROCESS-WIDE POOL
+# ------------------------------------------------------------------
+class BrowserPool:
+    """
+    Keeps `Config.BROWSER_POOL_SIZE` warm Chromium processes for the whole process.
+    Every tool call gets a fresh, isolated BrowserContext on one of them, so cookies
+    and storage never leak between requests, but nobody pays the browser cold start.
+    """
+    def __init__(self, size: Optional[int] = None):
+        self._requested_size = size
+        self.size = 0
+        self._playwright = None
+        self._browsers: List[PooledBrowser] = []
+        # id(context) -> the pooled browser it lives on, or the standalone (browser, playwright) pair
+        self._leases: Dict[int, object] = {}
+        self._round_robin = itertools.count()
+        self._start_lock = asyncio.Lock()
+        self._health_task: Optional[asyncio.Task] = None
+        self.started = False
+
+    @property
+    def pooled(self) -> bool:
+        """False when pooling is off or the pool has no browsers (`BROWSER_POOL_SIZE=0`)."""
+        size = self._requested_size if self._requested_size is not None else Config.BROWSER_POOL_SIZE
+        return Config.BROWSER_POOL_ENABLED and size > 0
+
+    async def start(self) -> None:
+        """Launches Playwright and the browsers. Safe to call more than once."""
+        async with self._start_lock:
+            if self.started or not self.pooled:
+                return
+            from playwright.async_api import async_playwright
+            self.size = self._requested_size if self._requested_size is not None else Config.BROWSER_POOL_SIZE
+            self._playwright = await async_playwright().start()
+            self._browsers = [PooledBrowser(slot) for slot in range(self.size)]
+            try:
+                await asyncio.gather(*(b.launch(self._playwright) for b in self._browsers))
+            except BaseException:
+                # Don't leave the driver (or half the pool) running if a launch fails
+                await asyncio.gather(*(b.close() for b in self._browsers))
+                self._browsers = []
+                await self._playwright.stop()
+                self._playwright = None
+                raise
+            self._health_task = asyncio.create_task(self._health_loop())
+            self.started = True
+            print(f"🌐 Browser pool ready ({self.size} browser(s)).")
+
+    async def stop(self) -> None:
+        """Closes every browser and the Playwright driver."""
+        async with self._start_lock:
+            if not self.started:
+                return
+            self.started = False
+            if self._health_task:
+                self._health_task.cancel()
+                try:
+                    await self._health_task
+                except asyncio.CancelledError:
+                    pass
+                self._health_task = None
+            await asyncio.gather(*(b.close() for b in self._browsers))
+            self._browsers = []
+            await self._playwright.stop()
+            self._playwright = None
+            print("🌐 Browser pool shut down.")
+
+    # --- Health Checking ---
+    async def _health_loop(self) -> None:
+        while True:
+            await asyncio.sleep(Config.BROWSER_HEALTH_CHECK_INTERVAL)
+            await self.check_health()
+
+    async def check_health(self) -> None:
+        """Relaunches any browser that crashed or disconnected."""
+        for pooled in self._browsers:
+            if not pooled.healthy:
+                await self._replace(pooled)
+
+    async def _replace(self, pooled: PooledBrowser, force: bool = False) -> None:
+        async with pooled.relaunch_lock:
+            # Another caller may have relaunched it while we waited for the lock.
+            if pooled.healthy and not force:
+                return
+            print(f"♻️  Browser #{pooled.slot} is down. Relaunching...")
+            await pooled.close()
+            await pooled.launch(self._playwright)
+
+    async def _pick_browser(self) -> PooledBrowser:
+        # Least-loaded browser first, round robin to break ties.
+        offset = next(self._round_robin) % len(self._browsers)
+        ordered = self._browsers[offset:] + self._browsers[:offset]
+        pooled = min(ordered, key=lambda b: b.active_contexts)
+        if not pooled.healthy:
+            await self._replace(pooled)
+        return pooled
+
+    # --- Context Leasing ---
+    async def new_context(self):
+        """
+        Leases a fresh BrowserContext. The caller owns it and must hand it back
+        with `release_context`.
+        """
+        if not self.pooled:
+            return await self._launch_standalone_context()
+        if not self.started:
+            await self.start()
+        pooled = await self._pick_browser()
+        try:
+            context = await pooled.browser.new_context(user_agent=Config.USER_AGENT)
+        except Exception:
+            # The browser died between the health check and now.
+            await self._replace(pooled, force=True)
+            context = await pooled.browser.new_context(user_agent=Config.USER_AGENT)
+        pooled.active_contexts += 1
+        self._leases[id(context)] = pooled
+        return context
+
+    async def release_context(self, context) -> None:
+        """Closes a leased context. The browser behind it stays warm."""
+        lease = self._leases.pop(id(context), None)
+        try:
+            await context.close()
+        except Exception:
+            pass
+        if isinstance(lease, PooledBrowser):
+            lease.active_contexts = max(0, lease.active_contexts - 1)
+        elif lease is not None:
+            browser, playwright = lease
+            await browser.close()
+            await playwright.stop()
+
+    async def _launch_standalone_context(self):
+        # Pool disabled or empty: the old one-browser-per-call behaviour.
+        from playwright.async_api import async_playwright
+        playwright = await async_playwright().start()
+        try:
+            with STAGE_SECONDS.time("browser_launch"):
+                browser = await playwright.chromium.launch(headless=Config.HEADLESS, args=LAUNCH_ARGS)
+            context = await browser.new_context(user_agent=Config.USER_AGENT)
+        except BaseException:
+            await playwright.stop()
+            raise
+        self._leases[id(context)] = (browser, playwright)
+        return context
+
+    @asynccontextmanager
+    async def page(self):
+        """
+        Yields a new page in a fresh context; the context is recycled on exit.
+        """
+        context = await self.new_context()
+        try:
+            page = await context.new_page()
+            yield page
+        finally:
+            await asyncio.shield(self.release_context(context))
+
+browser_pool = BrowserPool()
@@ -0,0 +1,121 @@
+import re
+from typing import Dict, Iterable, List, Optional, TypedDict
+
+from src.tools.airlines import AIRLINE_NAMES
+
+# ------------------------------------------------------------------
+# 1. PRECOMPILED PATTERNS
+# ------------------------------------------------------------------
+# Google Flights puts a narrow no-break space (U+202F) between the time and AM/PM
+# and no-break spaces (U+00A0) inside durations. We match them explicitly and
+# emit plain spaces, so "12:59 PM" comes out as "12:59 PM".
+SEP = r"[\s\u00a0\u202f]"
+_SEP_TRANSLATION = str.maketrans({"\u00a0": " ", "\u202f": " "})
+
+PRICE_RE = re.compile(r"\$([\d,]+)")
+TIME_RE = re.compile(rf"(\d{{1,2}}:\d{{2}}){SEP}?([AP]M)")
+DURATION_RE = re.compile(rf"\d+{SEP}*hr{SEP}*\d*{SEP}*min|\d+{SEP}*hr")
+STOPS_RE = re.compile(rf"(\d+){SEP}*stop")
+WHITESPACE_RE = re.compile(r"\s+")
+
+# ------------------------------------------------------------------
+# 2. AIRLINE MATCHER
+# ------------------------------------------------------------------
+class AirlineMatcher:
+    """
+    Finds the airline named in a card. When several names occur, the one listed
+    first in the table wins (same rule as the old `for name in COMMON_AIRLINES`
+    loop). The first `head` names, the usual carriers, are tried with `in`; the
+    rest of the table is one precompiled regex alternation, longest name first.
+    """
+    def __init__(self, names: Iterable[str], head: int = 8):
+        self.names: List[str] = list(dict.fromkeys(names))
+        self.head = self.names[:head]
+        tail = self.names[head:]
+        priority = {name: index for index, name in enumerate(self.names)}
+        # A regex hit also stands for any higher-priority tail name inside it ("Delta" in "Delta Connection")
+        self._rank: Dict[str, int] = {
+            name: min(priority[other] for other in tail if other in name) for name in tail
+        }
+        self._tail = re.compile("|".join(re.escape(name) for name in sorted(tail, key=len, reverse=True))) if tail else None
+
+    def match(self, text: str) -> Optional[str]:
+        """Returns the highest-priority airline named in `text`, or None."""
+        for name in self.head:
+            if name in text:
+                return name
+        if self._tail is None:
+            return None
+        ranks = [self._rank[hit] for hit in self._tail.findall(text)]
+        return self.names[min(ranks)] if ranks else None
+
+AIRLINE_MATCHER = AirlineMatcher(AIRLINE_NAMES)
+
+# ------------------------------------------------------------------
+# 3. THE PARSER
+# ------------------------------------------------------------------
+class CardRecord(TypedDict):
+    """The fields we read off one flight card."""
+    airline: str
+    price: float
+    dep_time: str
+    arr_time: str
+    duration: str
+    stops: str
+
+def normalize_text(text: str) -> str:
+    if not text: return ""
+    return text.lower().replace(" ", "").replace("\u00a0", "").replace("\u202f", "").strip()
+
+def parse_card(text: str, matcher: AirlineMatcher = AIRLINE_MATCHER) -> Optional[CardRecord]:
+    """
+    Parses the plain text of one flight card. Returns None for non-flight cards.
+    Pure function: no browser needed, so it can be tested and benchmarked on saved text.
+    """
+    if not text or "$" not in text: return None
+
+    # 1. Airline (fallback: first non-empty line)
+    airline = matcher.match(text)
+    if airline is None:
+        airline = "Unknown"
+        for line in text.split('\n'):
+            line = line.strip()
+            if line:
+                airline = line
+                break
+
+    # 2. Price
+    price = 0.0
+    price_match = PRICE_RE.search(text)
+    if price_match:
+        try:
+            price = float(price_match.group(1).replace(',', ''))
+        except ValueError: pass
+
+    # 3. Times
+    time_matches = TIME_RE.findall(text)
+    dep_time = f"{time_matches[0][0]} {time_matches[0][1]}" if time_matches else "Unknown"
+    arr_time = f"{time_matches[-1][0]} {time_matches[-1][1]}" if len(time_matches) > 1 else "Unknown"
+
+    # 4. Duration
+    duration = "Unknown"
+    duration_match = DURATION_RE.search(text)
+    if duration_match:
+        duration = WHITESPACE_RE.sub(" ", duration_match.group(0).translate(_SEP_TRANSLATION))
+
+    # 5. Stops
+    lowered = text.lower()
+    if "nonstop" in lowered:
+        stops = "Nonstop"
+    else:
+        stops_match = STOPS_RE.search(lowered)
+        stops = f"{stops_match.group(1)} Stop(s)" if stops_match else "Unknown"
+
+    return {
+        "airline": airline,
+        "price": price,
+        "dep_time": dep_time,
+        "arr_time": arr_time,
+        "duration": duration,
+        "stops": stops
+    }
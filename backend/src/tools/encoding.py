@@ -0,0 +1,124 @@
+import re
+import time
+from typing import Dict, List, Optional, Tuple
+
+from src.state import DateMatrixResult, FlightOption, PriceChange, RoundTripPlan, WatchSnapshot
+
+# ------------------------------------------------------------------
+# COMPACT TOOL RESULTS FOR THE LLM
+# ------------------------------------------------------------------
+# The model reads the tool content; the graph keeps the full FlightOption list as
+# the ToolMessage artifact. The content is a shared header plus one row per option,
+# so the long search URL, "N/A" flight numbers and placeholder cities are not
+# repeated 20+ times. Each row has a short id ("O3", "R1") that the next tool
+# accepts instead of the five-field fingerprint.
+
+OUTBOUND_PREFIX = "O"
+RETURN_PREFIX = "R"
+
+COLUMNS = "id|airline|depart|arrive|duration|stops|price"
+
+# Cities the return scrape fills in when it does not know the airports
+PLACEHOLDER_CITIES = {"Dest", "Origin"}
+
+_OPTION_ID_RE = re.compile(r"^\s*([A-Za-z])(\d+)\s*$")
+
+def option_id(prefix: str, index: int) -> str:
+    return f"{prefix}{index + 1}"
+
+def parse_option_id(value: str) -> Optional[Tuple[str, int]]:
+    """"O3" -> ("O", 2). None if `value` is not an option id."""
+    match = _OPTION_ID_RE.match(value or "")
+    if not match:
+        return None
+    return match.group(1).upper(), int(match.group(2)) - 1
+
+def _price(price: float) -> str:
+    return f"{price:.0f}" if float(price).is_integer() else f"{price:.2f}"
+
+def _route(flight: FlightOption) -> str:
+    if flight.departure_city in PLACEHOLDER_CITIES or flight.arrival_city in PLACEHOLDER_CITIES:
+        return ""
+    return f"{flight.departure_city}->{flight.arrival_city} "
+
+def encode_flights(flights: List[FlightOption], prefix: str, next_tool: str) -> str:
+    """
+    One header per (route, search URL) group, then `COLUMNS` rows. Row ids are
+    positions in `flights`, so rows keep their id even when grouped.
+    """
+    leg = "outbound" if prefix == OUTBOUND_PREFIX else "return"
+    if not flights:
+        return f"0 {leg} options."
+
+    groups: Dict[Tuple[str, str], List[str]] = {}
+    for index, flight in enumerate(flights):
+        row = "|".join([
+            option_id(prefix, index), flight.airline, flight.departure_time, flight.arrival_time,
+            flight.duration, flight.stops, _price(flight.price),
+        ])
+        groups.setdefault((_route(flight), flight.booking_link or ""), []).append(row)
+
+    lines = [f"{len(flights)} {leg} options, cheapest first ({COLUMNS}). Pass an id as `option_id` to {next_tool}."]
+    for (route, url), rows in groups.items():
+        lines.append(f"# {route}{url}".rstrip())
+        lines.extend(rows)
+    return "\n".join(lines)
+
+def encode_date_matrix(result: DateMatrixResult) -> str:
+    """The price grid as rows of depart dates and columns of return dates ("-" = none)."""
+    header = "depart\\return|" + "|".join(day[5:] for day in result.return_dates)
+    lines = [f"Cheapest outbound price {result.origin}->{result.destination} by date pair.", header]
+    for depart, row in zip(result.depart_dates, result.prices):
+        lines.append(depart[5:] + "|" + "|".join("-" if price is None else _price(price) for price in row))
+    if result.best_options:
+        best = ", ".join(f"{cell.depart_date}/{cell.return_date} ${_price(cell.cheapest_price)}" for cell in result.best_options)
+        lines.append(f"Best: {best}")
+    return "\n".join(lines)
+
+def _leg(label: str, flight: FlightOption) -> str:
+    return (f"{label}: {flight.airline}, {_route(flight)}{flight.departure_time} -> {flight.arrival_time}, "
+            f"{flight.duration}, {flight.stops}, ${_price(flight.price)}")
+
+def encode_plan(plan: RoundTripPlan) -> str:
+    lines = [f"status: {plan.status}"]
+    if plan.outbound:
+        lines.append(_leg("outbound", plan.outbound))
+    if plan.return_flight:
+        lines.append(_leg("return", plan.return_flight))
+    if plan.total_price is not None:
+        lines.append(f"total_price: ${_price(plan.total_price)}")
+    if plan.booking_link:
+        lines.append(f"booking_link: {plan.booking_link}")
+    return "\n".join(lines)
+
+WATCH_COLUMNS = "airline|depart|arrive|duration|stops|price"
+
+def _when(at: float) -> str:
+    return time.strftime("%Y-%m-%d %H:%M UTC", time.gmtime(at))
+
+def _change(change: PriceChange) -> str:
+    # "JFK|SRQ|JetBlue|8:00 AM|11:00 AM|Nonstop" -> "JetBlue 8:00 AM JFK->SRQ"
+    departure, arrival, airline, depart_time = change.flight_key.split("|")[:4]
+    flight = f"{airline} {depart_time} {departure}->{arrival}"
+    if change.kind == "added":
+        return f"{_when(change.at)} new: {flight} ${_price(change.price)}"
+    if change.kind == "removed":
+        return f"{_when(change.at)} gone: {flight} (was ${_price(change.previous_price)})"
+    return f"{_when(change.at)} price: {flight} ${_price(change.previous_price)} -> ${_price(change.price)}"
+
+def encode_watch(snapshot: WatchSnapshot, limit: int = 5) -> str:
+    """The cheapest `limit` flights of a price watch and its recent changes."""
+    watch = snapshot.watch
+    lines = [f"Price watch on {watch.origin}->{watch.destination} {watch.depart_date}/{watch.return_date} since {_when(watch.created_at)}."]
+    if watch.last_polled is None:
+        lines.append("First check in progress; call again later for prices.")
+        return "\n".join(lines)
+
+    lines.append(f"Last checked {_when(watch.last_polled)}: {len(snapshot.flights)} options, cheapest first ({WATCH_COLUMNS}).")
+    for flight in snapshot.flights[:limit]:
+        lines.append("|".join([flight.airline, flight.departure_time, flight.arrival_time, flight.duration, flight.stops, _price(flight.price)]))
+    changes = [change for change in snapshot.changes if change.at > watch.first_polled]
+    if changes:
+        lines.append("Changes (oldest first):")
+        lines.extend(_change(change) for change in changes)
+    return "\n".join(lines)
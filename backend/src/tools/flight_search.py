@@ -1,20 +1,41 @@
 import asyncio
-import re
-from typing import List, Set
+import itertools
+import uuid
+from datetime import date, timedelta
+from typing import Annotated, List, Optional, Set, Tuple
+from langchain_core.messages import ToolMessage
+from langchain_core.runnables import RunnableConfig
 from langchain_core.tools import tool
-from playwright.async_api import async_playwright, Page, Locator
+from langgraph.config import get_stream_writer
+from langgraph.prebuilt import InjectedState
+from playwright.async_api import Page, Locator
 from src.config import Config
-from src.state import FlightOption
+from src.metrics import STAGE_SECONDS
+from src.selection import rank_flights, select_best
+from src.state import DateMatrixCell, DateMatrixResult, FlightOption, RoundTripPlan, TripPreferences
+from src.tools import readiness
+from src.tools.airports import expand_airports
+from src.tools.card_parser import normalize_text, parse_card
+from src.tools.encoding import OUTBOUND_PREFIX, RETURN_PREFIX, encode_date_matrix, encode_flights, encode_plan, parse_option_id
+from src.tools.prefetch import prefetcher
+from src.tools.search_cache import outbound_cache, outbound_key, return_cache, return_key
+from src.tools.readiness import CARD_SELECTOR
+from src.tools.sessions import LivePage, session_registry
+from src.tools.single_flight import booking_flights, outbound_flights, return_flights
+from src.tools.workers import ScrapeJobError, run_job
 
-COMMON_AIRLINES = [
-    "Delta", "United", "American", "JetBlue", "Southwest", 
-    "Spirit", "Frontier", "Alaska", "British Airways", "Virgin Atlantic", 
-    "Air France", "Lufthansa", "Emirates", "Qatar", "Singapore Airlines"
-]
-
-def normalize_text(text: str) -> str:
-    if not text: return ""
-    return text.lower().replace(" ", "").replace("\u00a0", "").replace("\u202f", "").strip()
+# Pulls every card's text and stable attributes in a single page round-trip.
+BULK_EXTRACT_JS = """
+(selector) => Array.from(document.querySelectorAll(selector)).map((el, index) => {
+    const labelled = el.querySelector('[aria-label]');
+    const attributes = {};
+    for (const attr of el.attributes) {
+        if (attr.name.startsWith('data-')) attributes[attr.name] = attr.value;
+    }
+    if (labelled) attributes['aria-label'] = labelled.getAttribute('aria-label');
+    return { index: index, text: el.textContent || '', attributes: attributes };
+})
+"""
 
 async def _extract_card_data(card: Locator) -> dict:
     """
@@ -25,272 +46,427 @@ async def _extract_card_data(card: Locator) -> dict:
     except:
         return None
 
-    if not text or "$" not in text: return None
-    
-    # 1. Airline
-    airline = "Unknown"
-    for name in COMMON_AIRLINES:
-        if name in text:
-            airline = name
-            break
-    if airline == "Unknown":
-        lines = [line.strip() for line in text.split('\n') if line.strip()]
-        if lines: airline = lines[0]
-    
-    # 2. Price
-    price = 0.0
-    price_match = re.search(r'\$([\d,]+)', text)
-    if price_match:
+    return parse_card(text)
+
+# ------------------------------------------------------------------
+# SHARED PAGE HELPERS
+# ------------------------------------------------------------------
+def _thread_id(config: Optional[RunnableConfig]) -> Optional[str]:
+    return (config or {}).get("configurable", {}).get("thread_id")
+
+async def _load_results(page: Page, url: str) -> None:
+    with STAGE_SECONDS.time("page_goto"):
+        await page.goto(url, timeout=Config.TIMEOUT)
+    with STAGE_SECONDS.time("wait_for_selector"):
+        await page.wait_for_selector('div[role="main"]', state="visible", timeout=15000)
+
+async def _scan_cards(page: Page) -> List[dict]:
+    """
+    Parses every flight card on the page, tagging each with its DOM index
+    so it can be clicked later without another scan.
+    """
+    with STAGE_SECONDS.time("card_extraction"):
+        return await _extract_cards(page)
+
+async def _extract_cards(page: Page) -> List[dict]:
+    records = []
+    if Config.CARD_EXTRACTION_MODE == "bulk":
+        raw_cards = await page.evaluate(BULK_EXTRACT_JS, CARD_SELECTOR)
+        for raw in raw_cards:
+            data = parse_card(raw["text"])
+            if not data: continue
+            data["index"] = raw["index"]
+            data["attributes"] = raw["attributes"]
+            records.append(data)
+        return records
+
+    # "locator" mode: one round-trip per card
+    cards = await page.locator(CARD_SELECTOR).all()
+    for index, card in enumerate(cards):
+        data = await _extract_card_data(card)
+        if not data: continue
+        data["index"] = index
+        records.append(data)
+    return records
+
+def _find_card(records: List[dict], airline: str, departure_time: str, arrival_time: str, price: float, stops: str) -> Optional[dict]:
+    """
+    Strict fingerprint match (airline, both times, stops, price within $2).
+    """
+    target_airline = normalize_text(airline)
+    target_dep = normalize_text(departure_time)
+    target_arr = normalize_text(arrival_time)
+    target_stops = normalize_text(stops)
+
+    for data in records:
+        card_airline = normalize_text(data['airline'])
+        card_dep = normalize_text(data['dep_time'])
+        card_arr = normalize_text(data['arr_time'])
+        card_stops = normalize_text(data['stops'])
+
+        airline_match = (target_airline in card_airline) or (card_airline in target_airline)
+        time_match = (target_dep == card_dep) and (target_arr == card_arr)
+        stops_match = (target_stops == card_stops)
+        price_match = abs(data['price'] - price) < 2.0
+
+        if airline_match and time_match and stops_match and price_match:
+            return data
+    return None
+
+async def _click_card(page: Page, index: int, timeout: Optional[float] = None) -> readiness.PageSnapshot:
+    """Clicks the card at `index`; returns what the page looked like just before."""
+    before = await readiness.snapshot(page)
+    await page.locator(CARD_SELECTOR).nth(index).click(timeout=timeout)
+    return before
+
+async def _select_card(live: LivePage, url: str, expected_stage: str, **fingerprint) -> Tuple[Optional[dict], Optional[readiness.PageSnapshot]]:
+    """
+    Finds the card matching the fingerprint and clicks it.
+    Uses the cards the previous tool left on the live page when there is one,
+    and only replays `url` (navigate + full scan) when there isn't or it went stale.
+    Returns the matched card and the pre-click snapshot for the readiness wait.
+    """
+    page = live.page
+    if live.reused and live.stage == expected_stage:
+        with STAGE_SECONDS.time("card_matching"):
+            target = _find_card(live.cards, **fingerprint)
+        if not target:
+            return None, None
         try:
-            price = float(price_match.group(1).replace(',', ''))
-        except: pass
-        
-    # 3. Times
-    time_matches = re.findall(r'(\d{1,2}:\d{2}\s?[AP]M)', text)
-    dep_time = time_matches[0] if time_matches else "Unknown"
-    arr_time = time_matches[-1] if len(time_matches) > 1 else "Unknown"
-
-    # 4. Duration
-    duration = "Unknown"
-    duration_match = re.search(r'(\d+\s*hr\s*\d*\s*min|\d+\s*hr)', text)
-    if duration_match:
-        duration = duration_match.group(0)
-    
-    # 5. Stops
-    stops = "Unknown"
-    if "nonstop" in text.lower():
-        stops = "Nonstop"
-    else:
-        stops_match = re.search(r'(\d+)\s*stop', text.lower())
-        if stops_match:
-            stops = f"{stops_match.group(1)} Stop(s)"
-        else:
-            stops = "Unknown" 
-    
-    return {
-        "airline": airline,
-        "price": price,
-        "dep_time": dep_time,
-        "arr_time": arr_time,
-        "duration": duration,
-        "stops": stops
-    }
+            return target, await _click_card(page, target["index"], timeout=5000)
+        except Exception:
+            print("⚠️  Live page went stale. Replaying the search URL...")
+
+    await _load_results(page, url)
+    records = await _scan_cards(page)
+    with STAGE_SECONDS.time("card_matching"):
+        target = _find_card(records, **fingerprint)
+    if not target:
+        return None, None
+    return target, await _click_card(page, target["index"])
+
+def _as_tool_result(flights: List[FlightOption], prefix: str, next_tool: str) -> Tuple[str, List[FlightOption]]:
+    """
+    (content for the LLM, artifact for the graph). The selection node reads the
+    structured artifact; the model only needs the compact table. Both are cheapest
+    first, as the table header says, and share the option ids.
+    """
+    flights = sorted(flights, key=lambda flight: flight.price)
+    return encode_flights(flights, prefix, next_tool), flights
+
+def _resolve_option(state: Optional[dict], option_id: str, tool_name: str, prefix: str) -> Optional[FlightOption]:
+    """
+    Looks an option id ("O3") up in the artifact of the latest `tool_name` result.
+    """
+    parsed = parse_option_id(option_id)
+    if not parsed or parsed[0] != prefix:
+        return None
+    index = parsed[1]
+    for message in reversed((state or {}).get("messages", [])):
+        if isinstance(message, ToolMessage) and message.name == tool_name and message.artifact is not None:
+            options = message.artifact
+            return FlightOption.model_validate(options[index]) if 0 <= index < len(options) else None
+    return None
+
+def _to_flight_options(records: List[dict], departure_city: str, arrival_city: str, url: str) -> List[FlightOption]:
+    results = []
+    seen_ids: Set[str] = set()
+    for data in records:
+        unique_key = f"{data['airline']}-{data['dep_time']}-{data['price']}"
+        if unique_key in seen_ids: continue
+        seen_ids.add(unique_key)
+
+        flight = FlightOption(
+            airline=data['airline'],
+            flight_number="N/A",
+            departure_city=departure_city,
+            arrival_city=arrival_city,
+            departure_time=data['dep_time'],
+            arrival_time=data['arr_time'],
+            duration=data['duration'],
+            stops=data['stops'],
+            price=data['price'],
+            booking_link=url
+        )
+        results.append(flight)
+    return results
 
 # ------------------------------------------------------------------
 # TOOL 1: FAST OUTBOUND SEARCH
 # ------------------------------------------------------------------
-@tool
-async def search_outbound_flights(origin: str, destination: str, depart_date: str, return_date: str) -> List[FlightOption]:
+async def _search_outbound_pair(origin: str, destination: str, depart_date: str, return_date: str, thread_id: Optional[str]) -> List[FlightOption]:
     """
-    Step 1: Search for OUTBOUND flights. Returns ALL unique flight options.
+    Scrapes the outbound list for one airport pair (cache first).
     """
-    print(f"✈️  Tool 1: Fast Scrape {origin} -> {destination}")
+    cache_key = outbound_key(origin, destination, depart_date, return_date)
+    if Config.SEARCH_CACHE_ENABLED:
+        cached = await outbound_cache.get(cache_key)
+        if cached is not None:
+            print(f"⚡ Cache hit: {len(cached)} outbound options {origin} -> {destination}.")
+            return cached
     
     search_query = f"Flights from {origin} to {destination} on {depart_date} returning {return_date}"
-    url = f"https://www.google.com/travel/flights?q={search_query.replace(' ', '+')}"
+    url = f"{Config.FLIGHTS_BASE_URL}?q={search_query.replace(' ', '+')}"
+
+    # Identical searches running right now (other users, retries) share this scrape
+    try:
+        results = await outbound_flights.do(
+            cache_key, lambda: run_job("scrape_outbound", origin, destination, url, thread_id, route=thread_id),
+        )
+    except ScrapeJobError as e:
+        print(f"❌ Error in Outbound Search {origin} -> {destination}: {e}")
+        return []
+
+    if Config.SEARCH_CACHE_ENABLED:
+        await outbound_cache.set(cache_key, results)
+    return results
 
+async def _scrape_outbound(origin: str, destination: str, url: str, thread_id: Optional[str]) -> List[FlightOption]:
+    """
+    Loads the outbound list and parks the page for the return search.
+    """
     results = []
-    seen_ids: Set[str] = set() 
     
-    async with async_playwright() as p:
-        browser = await p.chromium.launch(headless=Config.HEADLESS, args=["--disable-blink-features=AutomationControlled"])
-        context = await browser.new_context(user_agent=Config.USER_AGENT)
-        page = await context.new_page()
-        
+    async with session_registry.page(thread_id) as live:
+        page = live.page
         try:
-            await page.goto(url, timeout=Config.TIMEOUT)
-            await page.wait_for_selector('div[role="main"]', state="visible", timeout=15000)
-            
-            cards = await page.locator('div[role="main"] li').all()
-            
-            for card in cards:
-                data = await _extract_card_data(card)
-                if not data: continue
-                
-                unique_key = f"{data['airline']}-{data['dep_time']}-{data['price']}"
-                if unique_key in seen_ids: continue
-                seen_ids.add(unique_key)
-                
-                flight = FlightOption(
-                    airline=data['airline'],
-                    flight_number="N/A",
-                    departure_city=origin,
-                    arrival_city=destination,
-                    departure_time=data['dep_time'],
-                    arrival_time=data['arr_time'],
-                    duration=data['duration'],
-                    stops=data['stops'],
-                    price=data['price'],
-                    booking_link=page.url 
-                )
-                results.append(flight)
+            await _load_results(page, url)
+            live.cards = await _scan_cards(page)
+            results = _to_flight_options(live.cards, origin, destination, page.url)
+
+            # Park the page so the return search can click straight from it
+            live.stage = "outbound"
+            live.keep_as = page.url
         except Exception as e:
-            print(f"❌ Error in Outbound Search: {e}")
-        finally:
-            await browser.close()
-            
+            print(f"❌ Error in Outbound Search {origin} -> {destination}: {e}")
+
+    return results
+
+async def _fan_out(pairs: List[Tuple[str, str]], depart_date: str, return_date: str, thread_id: Optional[str]) -> List[FlightOption]:
+    """
+    Scrapes every airport pair concurrently (at most `Config.FANOUT_CONCURRENCY`
+    at once) and merges them into one list, cheapest first.
+    """
+    semaphore = asyncio.Semaphore(Config.FANOUT_CONCURRENCY)
+
+    async def run(origin: str, destination: str) -> List[FlightOption]:
+        async with semaphore:
+            return await _search_outbound_pair(origin, destination, depart_date, return_date, thread_id)
+
+    return _merge_flights(await asyncio.gather(*(run(o, d) for o, d in pairs)))
+
+def _merge_flights(lists: List[List[FlightOption]]) -> List[FlightOption]:
+    """Concatenates per-pair results, drops duplicates, cheapest first."""
+    merged = []
+    seen_ids: Set[str] = set()
+    for flight in itertools.chain.from_iterable(lists):
+        unique_key = f"{flight.departure_city}-{flight.arrival_city}-{flight.airline}-{flight.departure_time}-{flight.price}"
+        if unique_key in seen_ids: continue
+        seen_ids.add(unique_key)
+        merged.append(flight)
+    merged.sort(key=lambda flight: flight.price)
+    return merged
+
+async def _search_outbound(origin: str, destination: str, depart_date: str, return_date: str, thread_id: Optional[str]) -> List[FlightOption]:
+    pairs = [(o, d) for o in expand_airports(origin) for d in expand_airports(destination) if o != d]
+    if len(pairs) == 1:
+        results = await _search_outbound_pair(pairs[0][0], pairs[0][1], depart_date, return_date, thread_id)
+    else:
+        print(f"   🔀 Fanning out over {len(pairs)} airport pairs...")
+        results = await _fan_out(pairs, depart_date, return_date, thread_id)
+
     print(f"✅ Found {len(results)} unique outbound options.")
     return results
 
+async def _prefetch_returns(flights: List[FlightOption], preferences: Optional[TripPreferences], thread_id: Optional[str]) -> None:
+    """
+    Speculatively scrapes the returns of the `Config.PREFETCH_TOP_K` likeliest picks
+    (the selection policy, else non-stop then price) while the pick is being made.
+    The top guess takes over the parked outbound page; the others open their own tabs.
+    """
+    if not thread_id or not flights:
+        return
+    jobs = []
+    for rank, flight in enumerate(rank_flights(flights, preferences or TripPreferences())[:Config.PREFETCH_TOP_K]):
+        fingerprint = (flight.airline, flight.departure_time, flight.arrival_time, flight.price, flight.stops)
+        job = lambda flight=flight, fingerprint=fingerprint, rank=rank: _search_returns(
+            flight.booking_link, thread_id, *fingerprint, speculative=True, reuse_page=rank == 0,
+        )
+        jobs.append((return_key(flight.booking_link, *fingerprint), job))
+    await prefetcher.schedule(thread_id, jobs)
+
+@tool(response_format="content_and_artifact")
+async def search_outbound_flights(
+    origin: str,
+    destination: str,
+    depart_date: str,
+    return_date: str,
+    config: RunnableConfig,
+    state: Annotated[Optional[dict], InjectedState] = None,
+) -> Tuple[str, List[FlightOption]]:
+    """
+    Step 1: Search for OUTBOUND flights. Returns ALL unique flight options.
+    `origin` and `destination` take one IATA code ("JFK"), several ("JFK,LGA,EWR"),
+    or a metro code ("NYC"); all airport pairs are searched at once and every
+    option is tagged with its actual airports.
+    """
+    print(f"✈️  Tool 1: Fast Scrape {origin} -> {destination}")
+    results = await _search_outbound(origin, destination, depart_date, return_date, _thread_id(config))
+    if Config.PREFETCH_ENABLED:
+        preferences = (state or {}).get("preferences")
+        preferences = TripPreferences.model_validate(preferences) if preferences else None
+        await _prefetch_returns(results, preferences, _thread_id(config))
+    return _as_tool_result(results, OUTBOUND_PREFIX, "search_return_flights")
+
 # ------------------------------------------------------------------
 # TOOL 2: SMART RETURN SEARCH (Reverted to < $2.0 tolerance)
 # ------------------------------------------------------------------
-@tool
-async def search_return_flights(
-    search_url: str, 
-    outbound_airline: str, 
-    outbound_departure_time: str, 
-    outbound_arrival_time: str, 
-    outbound_price: float,
-    outbound_stops: str
+async def _search_returns(
+    search_url: str, thread_id: Optional[str], airline: str, departure_time: str, arrival_time: str, price: float, stops: str,
+    speculative: bool = False, reuse_page: bool = True,
 ) -> List[FlightOption]:
     """
-    Step 2: Search for RETURN flights. Requires strict matching of the outbound flight.
+    Re-selects the outbound card and scrapes the return list (prefetch, then cache first).
+    `speculative` runs are the prefetcher's own guesses; with `reuse_page` False they
+    open a fresh tab instead of taking the parked outbound page.
     """
-    print(f"✈️  Tool 2: Re-locating Outbound Flight (Strict Match)...")
+    cache_key = return_key(search_url, airline, departure_time, arrival_time, price, stops)
+    if Config.PREFETCH_ENABLED and not speculative:
+        prefetched = await prefetcher.claim(thread_id, cache_key)
+        if prefetched is not None:
+            print(f"🔮 Prefetch hit: {len(prefetched)} return options.")
+            return prefetched
+    if Config.SEARCH_CACHE_ENABLED:
+        cached = await return_cache.get(cache_key)
+        if cached is not None:
+            print(f"⚡ Cache hit: {len(cached)} return options.")
+            return cached
     
+    try:
+        results = await return_flights.do(cache_key, lambda: run_job(
+            "scrape_returns", search_url, thread_id, airline, departure_time, arrival_time, price, stops, reuse_page, route=thread_id,
+        ))
+    except ScrapeJobError as e:
+        print(f"❌ Error in Return Search: {e}")
+        results = None
+    if results is None:
+        return []
+
+    if Config.SEARCH_CACHE_ENABLED:
+        await return_cache.set(cache_key, results)
+    print(f"✅ Found {len(results)} unique return options.")
+    return results
+
+async def _scrape_returns(
+    search_url: str, thread_id: Optional[str], airline: str, departure_time: str, arrival_time: str, price: float, stops: str,
+    reuse_page: bool = True,
+) -> Optional[List[FlightOption]]:
+    """
+    Clicks the outbound card and scrapes the return list. None if the card is gone.
+    """
     results = []
-    seen_ids: Set[str] = set()
     
-    target_airline = normalize_text(outbound_airline)
-    target_dep = normalize_text(outbound_departure_time)
-    target_arr = normalize_text(outbound_arrival_time)
-    target_stops = normalize_text(outbound_stops)
-    
-    async with async_playwright() as p:
-        browser = await p.chromium.launch(headless=Config.HEADLESS, args=["--disable-blink-features=AutomationControlled"])
-        context = await browser.new_context(user_agent=Config.USER_AGENT)
-        page = await context.new_page()
-        
+    async with session_registry.page(thread_id, search_url if reuse_page else None) as live:
+        page = live.page
         try:
-            await page.goto(search_url, timeout=Config.TIMEOUT)
-            await page.wait_for_selector('div[role="main"]', state="visible", timeout=15000)
-            
             # --- RE-SELECT OUTBOUND ---
-            cards = await page.locator('div[role="main"] li').all()
-            target_card = None
-            
-            for card in cards:
-                data = await _extract_card_data(card)
-                if not data: continue
-                
-                card_airline = normalize_text(data['airline'])
-                card_dep = normalize_text(data['dep_time'])
-                card_arr = normalize_text(data['arr_time'])
-                card_stops = normalize_text(data['stops'])
-                
-                airline_match = (target_airline in card_airline) or (card_airline in target_airline)
-                time_match = (target_dep == card_dep) and (target_arr == card_arr)
-                stops_match = (target_stops == card_stops)
-                # REVERTED: Strict tolerance
-                price_match = abs(data['price'] - outbound_price) < 2.0 
-
-                if airline_match and time_match and stops_match and price_match:
-                    target_card = card
-                    break
-            
-            if not target_card:
+            target, before = await _select_card(
+                live, search_url, "outbound",
+                airline=airline,
+                departure_time=departure_time,
+                arrival_time=arrival_time,
+                price=price,
+                stops=stops,
+            )
+            if not target:
                 print(f"❌ Critical: Could not re-locate outbound flight.")
-                return []
+                return None
             
-            await target_card.click()
-            await page.wait_for_timeout(3000)
+            await readiness.wait_for_new_results(page, before)
             
             # --- SCRAPE RETURNS ---
-            return_cards = await page.locator('div[role="main"] li').all()
-            
-            for card in return_cards:
-                data = await _extract_card_data(card)
-                if not data: continue
-                
-                unique_key = f"{data['airline']}-{data['dep_time']}-{data['price']}"
-                if unique_key in seen_ids: continue
-                seen_ids.add(unique_key)
-                
-                flight = FlightOption(
-                    airline=data['airline'],
-                    flight_number="N/A",
-                    departure_city="Dest", 
-                    arrival_city="Origin",
-                    departure_time=data['dep_time'],
-                    arrival_time=data['arr_time'],
-                    duration=data['duration'], 
-                    stops=data['stops'],     
-                    price=data['price'], 
-                    booking_link=page.url 
-                )
-                results.append(flight)
+            live.cards = await _scan_cards(page)
+            results = _to_flight_options(live.cards, "Dest", "Origin", page.url)
+
+            # Park the page (outbound now clicked) for the booking-link step
+            live.stage = "return"
+            live.keep_as = page.url
                 
         except Exception as e:
             print(f"❌ Error in Return Search: {e}")
-        finally:
-            await browser.close()
-            
-    print(f"✅ Found {len(results)} unique return options.")
+
     return results
 
+@tool(response_format="content_and_artifact")
+async def search_return_flights(
+    config: RunnableConfig,
+    option_id: Optional[str] = None,
+    search_url: Optional[str] = None, 
+    outbound_airline: Optional[str] = None, 
+    outbound_departure_time: Optional[str] = None, 
+    outbound_arrival_time: Optional[str] = None, 
+    outbound_price: Optional[float] = None,
+    outbound_stops: Optional[str] = None,
+    state: Annotated[Optional[dict], InjectedState] = None,
+) -> Tuple[str, List[FlightOption]]:
+    """
+    Step 2: Search for RETURN flights for the chosen outbound flight.
+    Pass its `option_id` from search_outbound_flights (e.g. "O3"). Otherwise pass the
+    exact `search_url` and outbound airline, times, price and stops (strict match).
+    """
+    print(f"✈️  Tool 2: Re-locating Outbound Flight (Strict Match)...")
+    if option_id:
+        chosen = _resolve_option(state, option_id, "search_outbound_flights", OUTBOUND_PREFIX)
+        if chosen is None:
+            return f"Error: unknown outbound option_id {option_id!r}.", []
+        search_url, outbound_airline, outbound_departure_time = chosen.booking_link, chosen.airline, chosen.departure_time
+        outbound_arrival_time, outbound_price, outbound_stops = chosen.arrival_time, chosen.price, chosen.stops
+    if None in (search_url, outbound_airline, outbound_departure_time, outbound_arrival_time, outbound_price, outbound_stops):
+        return "Error: pass an option_id or the full outbound fingerprint.", []
+
+    results = await _search_returns(
+        search_url, _thread_id(config),
+        outbound_airline, outbound_departure_time, outbound_arrival_time, outbound_price, outbound_stops,
+    )
+    return _as_tool_result(results, RETURN_PREFIX, "generate_booking_link")
+
 # ------------------------------------------------------------------
 # TOOL 3: FINAL BOOKING LINK (Reverted to < $2.0 tolerance)
 # ------------------------------------------------------------------
-@tool
-async def generate_booking_link(
-    search_url: str, 
-    return_airline: str, 
-    return_departure_time: str, 
-    return_arrival_time: str, 
-    return_price: float,
-    return_stops: str
-) -> str:
+LINK_ERROR = "Error: Could not generate link"
+
+async def _booking_link(search_url: str, thread_id: Optional[str], airline: str, departure_time: str, arrival_time: str, price: float, stops: str) -> str:
     """
-    Step 3: FINAL STEP. Selects the return flight using STRICT MATCHING and extracts the final booking URL.
+    Clicks the return card and returns the booking deep link (or `LINK_ERROR`).
     """
-    print(f"✈️  Tool 3: Generating Final Booking Link (Strict Match)...")
-    
-    target_airline = normalize_text(return_airline)
-    target_dep = normalize_text(return_departure_time)
-    target_arr = normalize_text(return_arrival_time)
-    target_stops = normalize_text(return_stops)
-    
-    final_url = "Error: Could not generate link"
+    key = return_key(search_url, airline, departure_time, arrival_time, price, stops)
+    try:
+        return await booking_flights.do(key, lambda: run_job(
+            "booking_link", search_url, thread_id, airline, departure_time, arrival_time, price, stops, route=thread_id,
+        ))
+    except ScrapeJobError as e:
+        print(f"❌ Error generating link: {e}")
+        return LINK_ERROR
 
-    async with async_playwright() as p:
-        browser = await p.chromium.launch(headless=Config.HEADLESS, args=["--disable-blink-features=AutomationControlled"])
-        context = await browser.new_context(user_agent=Config.USER_AGENT)
-        page = await context.new_page()
-        
+async def _click_booking_link(search_url: str, thread_id: Optional[str], airline: str, departure_time: str, arrival_time: str, price: float, stops: str) -> str:
+    final_url = LINK_ERROR
+
+    async with session_registry.page(thread_id, search_url) as live:
+        page = live.page
         try:
-            # 1. Go to the page where Outbound is already selected
-            await page.goto(search_url, timeout=Config.TIMEOUT)
-            await page.wait_for_selector('div[role="main"]', state="visible", timeout=15000)
-            
-            # 2. Find the Return Flight
-            cards = await page.locator('div[role="main"] li').all()
-            target_card = None
+            # 1. Find and click the Return Flight (live page if we still have it)
+            target, before = await _select_card(
+                live, search_url, "return",
+                airline=airline,
+                departure_time=departure_time,
+                arrival_time=arrival_time,
+                price=price,
+                stops=stops,
+            )
             
-            for card in cards:
-                data = await _extract_card_data(card)
-                if not data: continue
-                
-                # Card Fingerprint
-                card_airline = normalize_text(data['airline'])
-                card_dep = normalize_text(data['dep_time'])
-                card_arr = normalize_text(data['arr_time'])
-                card_stops = normalize_text(data['stops'])
-                
-                # Matching Logic
-                airline_match = (target_airline in card_airline) or (card_airline in target_airline)
-                time_match = (target_dep == card_dep) and (target_arr == card_arr)
-                stops_match = (target_stops == card_stops)
-                price_match = abs(data['price'] - return_price) < 2.0
-                
-                if airline_match and time_match and stops_match and price_match:
-                    target_card = card
-                    print(f"   🎯 RETURN MATCH FOUND: {data['airline']} {data['dep_time']}")
-                    break
-            
-            if target_card:
-                await target_card.click()
-                await page.wait_for_timeout(5000) 
+            if target:
+                print(f"   🎯 RETURN MATCH FOUND: {target['airline']} {target['dep_time']}")
+                await readiness.wait_for_booking_page(page, before)
                 final_url = page.url
                 print(f"✅ SUCCESS! Final Deep Link Generated.")
             else:
@@ -298,7 +474,185 @@ async def generate_booking_link(
                 
         except Exception as e:
             print(f"❌ Error generating link: {e}")
-        finally:
-            await browser.close()
 
-    return final_url
\ No newline at end of file
+    return final_url
+
+@tool
+async def generate_booking_link(
+    config: RunnableConfig,
+    option_id: Optional[str] = None,
+    search_url: Optional[str] = None, 
+    return_airline: Optional[str] = None, 
+    return_departure_time: Optional[str] = None, 
+    return_arrival_time: Optional[str] = None, 
+    return_price: Optional[float] = None,
+    return_stops: Optional[str] = None,
+    state: Annotated[Optional[dict], InjectedState] = None,
+) -> str:
+    """
+    Step 3: FINAL STEP. Selects the return flight and extracts the final booking URL.
+    Pass its `option_id` from search_return_flights (e.g. "R1"). Otherwise pass the
+    exact `search_url` and return airline, times, price and stops (strict match).
+    """
+    print(f"✈️  Tool 3: Generating Final Booking Link (Strict Match)...")
+    if option_id:
+        chosen = _resolve_option(state, option_id, "search_return_flights", RETURN_PREFIX)
+        if chosen is None:
+            return f"Error: unknown return option_id {option_id!r}."
+        search_url, return_airline, return_departure_time = chosen.booking_link, chosen.airline, chosen.departure_time
+        return_arrival_time, return_price, return_stops = chosen.arrival_time, chosen.price, chosen.stops
+    if None in (search_url, return_airline, return_departure_time, return_arrival_time, return_price, return_stops):
+        return "Error: pass an option_id or the full return fingerprint."
+
+    return await _booking_link(
+        search_url, _thread_id(config),
+        return_airline, return_departure_time, return_arrival_time, return_price, return_stops,
+    )
+
+# ------------------------------------------------------------------
+# TOOL 4: FLEXIBLE-DATE MATRIX
+# ------------------------------------------------------------------
+def _date_window(center: str, flex_days: int) -> List[str]:
+    day = date.fromisoformat(center)
+    return [(day + timedelta(days=offset)).isoformat() for offset in range(-flex_days, flex_days + 1)]
+
+@tool(response_format="content_and_artifact")
+async def search_flexible_dates(origin: str, destination: str, depart_date: str, return_date: str, flex_days: int = 2) -> Tuple[str, Optional[DateMatrixResult]]:
+    """
+    Use when the user's dates are flexible (e.g. "around March 10, +/- 2 days").
+    Searches every depart x return date pair within `flex_days` of the given dates
+    in parallel and returns a price grid (cheapest outbound price per date pair)
+    plus the best options. Same `origin`/`destination` format as search_outbound_flights.
+    """
+    flex_days = max(0, min(flex_days, Config.DATE_MATRIX_MAX_FLEX_DAYS))
+    try:
+        depart_dates = _date_window(depart_date, flex_days)
+        return_dates = _date_window(return_date, flex_days)
+    except ValueError:
+        return "Error: dates must be YYYY-MM-DD.", None
+    pairs = [(o, d) for o in expand_airports(origin) for d in expand_airports(destination) if o != d]
+    cells = [(dep, ret) for dep in depart_dates for ret in return_dates if ret >= dep]
+    print(f"✈️  Tool 4: Date Matrix {origin} -> {destination} ({len(cells)} date pairs x {len(pairs)} airport pairs)")
+
+    semaphore = asyncio.Semaphore(Config.DATE_MATRIX_CONCURRENCY)
+
+    async def run(o: str, d: str, dep: str, ret: str) -> List[FlightOption]:
+        async with semaphore:
+            # No thread_id: matrix pages are not worth parking; the pick is replayed from cache
+            return await _search_outbound_pair(o, d, dep, ret, None)
+
+    # One failed search leaves its cell empty instead of losing the whole grid
+    per_cell = await asyncio.gather(*(
+        asyncio.gather(*(run(o, d, dep, ret) for o, d in pairs), return_exceptions=True) for dep, ret in cells
+    ))
+
+    cheapest = {}
+    for (dep, ret), lists in zip(cells, per_cell):
+        failed = [found for found in lists if isinstance(found, BaseException)]
+        if failed:
+            print(f"❌ Error in Date Matrix {dep} / {ret}: {failed[0]}")
+        flights = _merge_flights([found for found in lists if not isinstance(found, BaseException)])
+        cheapest[(dep, ret)] = DateMatrixCell(
+            depart_date=dep,
+            return_date=ret,
+            cheapest_price=flights[0].price if flights else None,
+            cheapest_flight=flights[0] if flights else None,
+        )
+
+    prices = [[cheapest[(dep, ret)].cheapest_price if (dep, ret) in cheapest else None for ret in return_dates] for dep in depart_dates]
+    found = [cell for cell in cheapest.values() if cell.cheapest_price is not None]
+    best = sorted(found, key=lambda cell: cell.cheapest_price)[:Config.DATE_MATRIX_BEST_OPTIONS]
+
+    print(f"✅ Date matrix done: {len(found)}/{len(cells)} date pairs with flights.")
+    result = DateMatrixResult(
+        origin=origin,
+        destination=destination,
+        depart_dates=depart_dates,
+        return_dates=return_dates,
+        prices=prices,
+        best_options=best,
+    )
+    return encode_date_matrix(result), result
+
+# ------------------------------------------------------------------
+# TOOL 5: FUSED ROUND TRIP (outbound -> return -> link, one session)
+# ------------------------------------------------------------------
+def _progress(stage: str, **detail) -> None:
+    """
+    Streams a progress event to graph callers (`stream_mode="custom"`).
+    A no-op when the tool runs outside a graph.
+    """
+    try:
+        writer = get_stream_writer()
+    except (RuntimeError, KeyError):
+        return
+    writer({"stage": stage, **detail})
+
+@tool(response_format="content_and_artifact")
+async def plan_round_trip(
+    origin: str,
+    destination: str,
+    depart_date: str,
+    return_date: str,
+    config: RunnableConfig,
+    preferences: Optional[TripPreferences] = None,
+    state: Annotated[Optional[dict], InjectedState] = None,
+) -> Tuple[str, RoundTripPlan]:
+    """
+    Books a whole round trip in ONE call: searches outbound flights, picks the best
+    one with `preferences` (default: the ones saved with set_trip_preferences),
+    searches its returns, picks the best return and generates the booking link,
+    all on the same live browser page.
+    Same `origin`/`destination`/date formats as search_outbound_flights.
+    Check `status`: anything but "booked" means the pipeline stopped at that step.
+    """
+    print(f"✈️  Tool 5: Planning Round Trip {origin} -> {destination}")
+    if preferences is None:
+        saved = (state or {}).get("preferences")
+        preferences = TripPreferences.model_validate(saved) if saved else TripPreferences()
+    # Without a conversation thread, use a private one so the page still carries over
+    thread_id = _thread_id(config) or f"plan-{uuid.uuid4().hex[:12]}"
+    own_thread = not _thread_id(config)
+
+    try:
+        plan = await _plan(origin, destination, depart_date, return_date, preferences, thread_id)
+    finally:
+        if own_thread:
+            try:
+                await run_job("close_thread", thread_id, route=thread_id)
+            except ScrapeJobError as e:
+                print(f"⚠️ Could not close the round trip's pages: {e}")
+
+    print(f"✅ Round trip plan: {plan.status}")
+    return encode_plan(plan), plan
+
+async def _plan(origin: str, destination: str, depart_date: str, return_date: str, preferences: TripPreferences, thread_id: str) -> RoundTripPlan:
+    _progress("search_outbound_flights", origin=origin, destination=destination)
+    outbound = select_best(await _search_outbound(origin, destination, depart_date, return_date, thread_id), preferences, "outbound")
+    if outbound is None:
+        return RoundTripPlan(status="no_outbound")
+    print(f"   🧮 Outbound: {outbound.airline} {outbound.departure_time} ${outbound.price}")
+
+    _progress("search_return_flights", airline=outbound.airline, departure_time=outbound.departure_time, price=outbound.price)
+    returns = await _search_returns(
+        outbound.booking_link, thread_id,
+        outbound.airline, outbound.departure_time, outbound.arrival_time, outbound.price, outbound.stops,
+    )
+    back = select_best(returns, preferences, "return")
+    if back is None:
+        return RoundTripPlan(status="no_return", outbound=outbound)
+    print(f"   🧮 Return: {back.airline} {back.departure_time} ${back.price}")
+
+    _progress("generate_booking_link", airline=back.airline, departure_time=back.departure_time, price=back.price)
+    link = await _booking_link(
+        back.booking_link, thread_id,
+        back.airline, back.departure_time, back.arrival_time, back.price, back.stops,
+    )
+    # The return list shows round-trip totals
+    return RoundTripPlan(
+        status="booked" if link != LINK_ERROR else "link_failed",
+        outbound=outbound,
+        return_flight=back,
+        booking_link=link if link != LINK_ERROR else None,
+        total_price=back.price,
+    )
@@ -0,0 +1,66 @@
+from typing import Dict
+
+from src.config import Config
+
+# ------------------------------------------------------------------
+# 1. THE BLOCKING RULES
+# ------------------------------------------------------------------
+def should_block(resource_type: str, url: str) -> bool:
+    """
+    Allowlist beats denylist: a URL matching `Config.ALLOWED_URL_PATTERNS` always
+    loads. Otherwise block denied resource types and denied URL patterns.
+    """
+    if any(pattern in url for pattern in Config.ALLOWED_URL_PATTERNS):
+        return False
+    if resource_type in Config.BLOCKED_RESOURCE_TYPES:
+        return True
+    return any(pattern in url for pattern in Config.BLOCKED_URL_PATTERNS)
+
+# ------------------------------------------------------------------
+# 2. PER-PAGE ACCOUNTING
+# ------------------------------------------------------------------
+class NetworkStats:
+    """
+    Counts what the router did for one page. Blocked requests never report a size,
+    so bytes saved is an estimate from `Config.BLOCKED_BYTES_ESTIMATE`.
+    """
+    def __init__(self):
+        self.reset()
+
+    def reset(self) -> None:
+        self.requests_allowed = 0
+        self.requests_blocked = 0
+        self.est_bytes_saved = 0
+        self.blocked_by_type: Dict[str, int] = {}
+
+    def record_blocked(self, resource_type: str) -> None:
+        self.requests_blocked += 1
+        self.blocked_by_type[resource_type] = self.blocked_by_type.get(resource_type, 0) + 1
+        self.est_bytes_saved += Config.BLOCKED_BYTES_ESTIMATE.get(resource_type, Config.BLOCKED_BYTES_ESTIMATE["other"])
+
+    def as_dict(self) -> dict:
+        return {
+            "requests_allowed": self.requests_allowed,
+            "requests_blocked": self.requests_blocked,
+            "est_bytes_saved": self.est_bytes_saved,
+            "blocked_by_type": dict(self.blocked_by_type),
+        }
+
+    def summary(self) -> str:
+        return f"🚫 Blocked {self.requests_blocked} requests (~{self.est_bytes_saved / 1_000_000:.1f} MB saved), allowed {self.requests_allowed}"
+
+# ------------------------------------------------------------------
+# 3. INSTALLING THE ROUTER
+# ------------------------------------------------------------------
+async def install_request_blocking(page, stats: NetworkStats) -> None:
+    """Routes every request of `page` through the blocking rules."""
+    async def handle(route):
+        request = route.request
+        if should_block(request.resource_type, request.url):
+            stats.record_blocked(request.resource_type)
+            await route.abort("blockedbyclient")
+        else:
+            stats.requests_allowed += 1
+            await route.continue_()
+
+    await page.route("**/*", handle)
@@ -0,0 +1,43 @@
+from typing import Annotated, List, Literal, Optional
+
+from langchain_core.messages import ToolMessage
+from langchain_core.tools import InjectedToolCallId, tool
+from langgraph.types import Command
+
+from src.state import TripPreferences
+
+TimeOfDay = Literal["morning", "afternoon", "evening", "night", "anytime"]
+
+# ------------------------------------------------------------------
+# TOOL 0: SAVE THE PHASE 1 ANSWERS
+# ------------------------------------------------------------------
+@tool
+def set_trip_preferences(
+    budget_mode: Literal["max_price", "cheapest", "no_limit"],
+    tool_call_id: Annotated[str, InjectedToolCallId],
+    max_price: Optional[float] = None,
+    nonstop_only: bool = False,
+    preferred_airlines: Optional[List[str]] = None,
+    outbound_time: TimeOfDay = "anytime",
+    return_time: TimeOfDay = "anytime",
+) -> Command:
+    """
+    Save the user's Phase 1 preferences. Call this ONCE before `search_outbound_flights`
+    (and again if the user changes a preference). The system uses them to pick the
+    outbound and return flights automatically.
+    `budget_mode`: "max_price" (set `max_price`), "cheapest", or "no_limit".
+    `preferred_airlines`: airline names, empty for no preference.
+    """
+    preferences = TripPreferences(
+        budget_mode=budget_mode,
+        max_price=max_price,
+        nonstop_only=nonstop_only,
+        preferred_airlines=preferred_airlines or [],
+        outbound_time=outbound_time,
+        return_time=return_time,
+    )
+    print(f"📝 Preferences saved: {preferences.model_dump()}")
+    return Command(update={
+        "preferences": preferences,
+        "messages": [ToolMessage(content="Preferences saved.", tool_call_id=tool_call_id)],
+    })
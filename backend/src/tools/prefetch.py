@@ -0,0 +1,114 @@
+import asyncio
+import time
+from typing import Awaitable, Callable, Dict, Iterable, List, Optional, Tuple
+
+from src.state import FlightOption
+from src.tools.workers import ScrapeJobError, run_job
+
+# ------------------------------------------------------------------
+# 1. ONE GUESS
+# ------------------------------------------------------------------
+class Speculation:
+    """A background return search for one outbound candidate."""
+    def __init__(self, key: str, job: Callable[[], Awaitable[List[FlightOption]]]):
+        self.key = key
+        self.started = time.monotonic()
+        self.finished: Optional[float] = None
+        self.task = asyncio.create_task(job())
+        self.task.add_done_callback(self._done)
+
+    def _done(self, _task) -> None:
+        self.finished = time.monotonic()
+
+    @property
+    def seconds(self) -> float:
+        return (self.finished or time.monotonic()) - self.started
+
+# ------------------------------------------------------------------
+# 2. THE PREFETCHER
+# ------------------------------------------------------------------
+class ReturnPrefetcher:
+    """
+    Holds the speculative return searches of each thread, keyed by the
+    outbound fingerprint (`return_key`). The real return search claims its
+    key: a finished guess answers at once, a running one is awaited, and
+    every other guess of the thread is cancelled (or its parked page closed).
+    """
+    def __init__(self):
+        self._threads: Dict[str, Dict[str, Speculation]] = {}
+        self.launched = 0
+        self.used = 0
+        self.cancelled = 0
+        self.wasted = 0
+        self.used_seconds = 0.0
+        self.wasted_seconds = 0.0
+
+    async def schedule(self, thread_id: str, jobs: Iterable[Tuple[str, Callable[[], Awaitable[List[FlightOption]]]]]) -> None:
+        """Starts one speculation per (key, job). A new outbound search supersedes the old guesses."""
+        await self.discard(thread_id)
+        speculations = {}
+        for key, job in jobs:
+            if key not in speculations:
+                speculations[key] = Speculation(key, job)
+                self.launched += 1
+        if speculations:
+            print(f"🔮 Prefetching returns for {len(speculations)} outbound candidates.")
+            self._threads[thread_id] = speculations
+
+    async def claim(self, thread_id: Optional[str], key: str) -> Optional[List[FlightOption]]:
+        """The results guessed for `key`, or None if it was not guessed (or the guess failed)."""
+        speculations = self._threads.pop(thread_id, None) if thread_id else None
+        if not speculations:
+            return None
+        chosen = speculations.pop(key, None)
+        await self._drop(thread_id, speculations.values())
+        if chosen is None:
+            return None
+        await asyncio.wait([chosen.task])
+        if chosen.task.cancelled() or chosen.task.exception():
+            return None
+        results = chosen.task.result()
+        self.used += 1
+        self.used_seconds += chosen.seconds
+        return results
+
+    async def discard(self, thread_id: str) -> None:
+        await self._drop(thread_id, self._threads.pop(thread_id, {}).values())
+
+    async def _drop(self, thread_id: str, speculations: Iterable[Speculation]) -> None:
+        running = []
+        for speculation in speculations:
+            if not speculation.task.done():
+                speculation.task.cancel()
+                running.append(speculation)
+                self.cancelled += 1
+                continue
+            self.wasted += 1
+            self.wasted_seconds += speculation.seconds
+            results = None if speculation.task.cancelled() or speculation.task.exception() else speculation.task.result()
+            if results:
+                # The guess parked its return list page under the return options' link
+                try:
+                    await run_job("discard_page", thread_id, results[0].booking_link, route=thread_id)
+                except ScrapeJobError as e:
+                    print(f"⚠️ Could not close a wasted prefetch page: {e}")
+        if running:
+            await asyncio.gather(*(s.task for s in running), return_exceptions=True)
+            self.wasted_seconds += sum(s.seconds for s in running)
+
+    async def stop(self) -> None:
+        for thread_id in list(self._threads):
+            await self.discard(thread_id)
+
+    def stats(self) -> dict:
+        return {
+            "pending_threads": len(self._threads),
+            "launched": self.launched,
+            "used": self.used,
+            "cancelled": self.cancelled,
+            "wasted": self.wasted,
+            "used_seconds": round(self.used_seconds, 3),
+            "wasted_seconds": round(self.wasted_seconds, 3),
+        }
+
+prefetcher = ReturnPrefetcher()
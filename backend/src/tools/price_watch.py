@@ -0,0 +1,352 @@
+import asyncio
+import hashlib
+import random
+import sqlite3
+import threading
+import time
+from datetime import date
+from typing import Dict, List, Optional, Set, Tuple
+
+from langchain_core.tools import tool
+
+from src.config import Config
+from src.state import FlightOption, PriceChange, PriceWatch, WatchSnapshot
+from src.tools.encoding import encode_watch
+from src.tools.flight_search import _search_outbound
+from src.tools.search_cache import outbound_cache, outbound_key
+
+# ------------------------------------------------------------------
+# 1. WHAT CHANGED BETWEEN TWO POLLS
+# ------------------------------------------------------------------
+def watch_id(origin: str, destination: str, depart_date: str, return_date: str) -> str:
+    """The same query always gets the same watch, whoever registers it."""
+    return hashlib.sha1(outbound_key(origin, destination, depart_date, return_date).encode()).hexdigest()[:12]
+
+def flight_key(flight: FlightOption) -> str:
+    """A flight's identity, without its price. Readable: the tool shows it for gone flights."""
+    fields = [flight.departure_city, flight.arrival_city, flight.airline, flight.departure_time, flight.arrival_time, flight.stops]
+    return "|".join(" ".join(field.split()) for field in fields)
+
+def diff_flights(previous: Dict[str, FlightOption], current: List[FlightOption], at: float) -> Tuple[Dict[str, FlightOption], List[PriceChange]]:
+    """(the new latest flights by key, the changes from `previous` to them)."""
+    latest: Dict[str, FlightOption] = {}
+    for flight in sorted(current, key=lambda flight: flight.price):
+        latest.setdefault(flight_key(flight), flight)  # two fares for one flight: the cheaper one
+
+    changes = []
+    for key, flight in latest.items():
+        before = previous.get(key)
+        if before is None:
+            changes.append(PriceChange(at=at, kind="added", flight_key=key, price=flight.price, flight=flight))
+        elif before.price != flight.price:
+            changes.append(PriceChange(at=at, kind="price", flight_key=key, price=flight.price, previous_price=before.price))
+    for key in previous.keys() - latest.keys():
+        changes.append(PriceChange(at=at, kind="removed", flight_key=key, previous_price=previous[key].price))
+    return latest, changes
+
+def apply_changes(flights: Dict[str, FlightOption], changes: List[PriceChange]) -> None:
+    """Replays stored changes onto `flights` (in place)."""
+    for change in changes:
+        if change.kind == "added":
+            flights[change.flight_key] = change.flight
+        elif change.kind == "price" and change.flight_key in flights:
+            flights[change.flight_key] = flights[change.flight_key].model_copy(update={"price": change.price})
+        elif change.kind == "removed":
+            flights.pop(change.flight_key, None)
+
+# ------------------------------------------------------------------
+# 2. THE TIME-SERIES STORE (SQLite, runs in a worker thread)
+# ------------------------------------------------------------------
+class WatchStore:
+    """
+    Watches plus the changes of every poll. A poll where nothing moved writes no
+    change rows; a price move is one row of numbers. The full flight is only
+    written when it first appears.
+    """
+    def __init__(self, path: str):
+        self.path = path
+        self._db: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._db is None:
+            self._db = sqlite3.connect(self.path, check_same_thread=False)
+            self._db.executescript(
+                "CREATE TABLE IF NOT EXISTS watches (watch_id TEXT PRIMARY KEY, payload TEXT);"
+                "CREATE TABLE IF NOT EXISTS watch_changes ("
+                " watch_id TEXT, at REAL, kind TEXT, flight_key TEXT, price REAL, previous_price REAL, flight TEXT);"
+                "CREATE INDEX IF NOT EXISTS watch_changes_by_watch ON watch_changes (watch_id, at);"
+            )
+            self._db.commit()
+        return self._db
+
+    def load(self) -> List[Tuple[PriceWatch, List[PriceChange]]]:
+        with self._lock:
+            db = self._connect()
+            loaded = []
+            for (payload,) in db.execute("SELECT payload FROM watches").fetchall():
+                watch = PriceWatch.model_validate_json(payload)
+                loaded.append((watch, self._changes(db, watch.watch_id)))
+            return loaded
+
+    def save(self, watch: PriceWatch, changes: List[PriceChange] = ()) -> None:
+        with self._lock:
+            db = self._connect()
+            db.execute("INSERT OR REPLACE INTO watches (watch_id, payload) VALUES (?, ?)", (watch.watch_id, watch.model_dump_json()))
+            db.executemany(
+                "INSERT INTO watch_changes (watch_id, at, kind, flight_key, price, previous_price, flight) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                [(watch.watch_id, c.at, c.kind, c.flight_key, c.price, c.previous_price, c.flight.model_dump_json() if c.flight else None) for c in changes],
+            )
+            db.commit()
+
+    def delete(self, watch_id: str) -> None:
+        with self._lock:
+            db = self._connect()
+            db.execute("DELETE FROM watches WHERE watch_id = ?", (watch_id,))
+            db.execute("DELETE FROM watch_changes WHERE watch_id = ?", (watch_id,))
+            db.commit()
+
+    def changes(self, watch_id: str, limit: Optional[int] = None) -> List[PriceChange]:
+        with self._lock:
+            return self._changes(self._connect(), watch_id, limit)
+
+    def _changes(self, db: sqlite3.Connection, watch_id: str, limit: Optional[int] = None) -> List[PriceChange]:
+        rows = db.execute(
+            "SELECT at, kind, flight_key, price, previous_price, flight FROM watch_changes"
+            " WHERE watch_id = ? ORDER BY at DESC, rowid DESC LIMIT ?",
+            (watch_id, -1 if limit is None else limit),
+        ).fetchall()
+        return [
+            PriceChange(
+                at=at, kind=kind, flight_key=key, price=price, previous_price=previous_price,
+                flight=FlightOption.model_validate_json(flight) if flight else None,
+            )
+            for at, kind, key, price, previous_price, flight in reversed(rows)
+        ]
+
+    def close(self) -> None:
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+# ------------------------------------------------------------------
+# 3. THE SCHEDULER
+# ------------------------------------------------------------------
+class TooManyWatches(ValueError):
+    """`Config.PRICE_WATCH_MAX_WATCHES` are registered already."""
+
+def _iso_date(value: str) -> str:
+    try:
+        return date.fromisoformat(value.strip()).isoformat()
+    except ValueError:
+        raise ValueError(f"dates must be YYYY-MM-DD, got {value!r}.")
+
+def _departed(watch: PriceWatch, today: date) -> bool:
+    try:
+        return date.fromisoformat(watch.depart_date) < today
+    except ValueError:
+        return True  # unreadable: it can never be polled usefully
+
+def _next_poll(now: float) -> float:
+    jitter = random.uniform(1 - Config.PRICE_WATCH_JITTER, 1 + Config.PRICE_WATCH_JITTER)
+    return now + Config.PRICE_WATCH_INTERVAL * jitter
+
+class PriceWatcher:
+    """
+    Re-scrapes every registered watch about every `Config.PRICE_WATCH_INTERVAL`
+    seconds (jittered), at most `Config.PRICE_WATCH_CONCURRENCY` at a time, and
+    keeps each watch's latest flights in memory so a snapshot costs no scrape.
+    Watches whose departure date has passed are dropped.
+    """
+    def __init__(self, sqlite_path: Optional[str] = None):
+        self._sqlite_path = sqlite_path
+        self._store: Optional[WatchStore] = None
+        self._open_lock = asyncio.Lock()
+        # Saves and deletes of a watch go one at a time, so an unwatch is never undone by a poll
+        self._write_lock = asyncio.Lock()
+        self._watches: Dict[str, PriceWatch] = {}
+        self._latest: Dict[str, Dict[str, FlightOption]] = {}  # watch id -> flight key -> flight
+        self._polling: Set[str] = set()
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._loop_task: Optional[asyncio.Task] = None
+        self._tasks: Set[asyncio.Task] = set()
+        self.polls = 0
+        self.failures = 0
+        self.changes = 0
+
+    async def start(self) -> None:
+        if self._loop_task is not None:
+            return
+        await self._open()
+        self._loop_task = asyncio.create_task(self._run())
+        print(f"👀 Price watch started with {len(self._watches)} watches.")
+
+    async def _open(self) -> None:
+        """Loads the watches and replays their changes into the latest flights (once)."""
+        async with self._open_lock:
+            if self._store is not None:
+                return
+            store = WatchStore(self._sqlite_path or Config.PRICE_WATCH_SQLITE_PATH)
+            for watch, changes in await asyncio.to_thread(store.load):
+                self._watches[watch.watch_id] = watch
+                apply_changes(self._latest.setdefault(watch.watch_id, {}), changes)
+            self._semaphore = asyncio.Semaphore(Config.PRICE_WATCH_CONCURRENCY)
+            self._store = store
+
+    async def stop(self) -> None:
+        if self._loop_task:
+            self._loop_task.cancel()
+            await asyncio.gather(self._loop_task, return_exceptions=True)
+            self._loop_task = None
+        for task in list(self._tasks):
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        if self._store:
+            self._store.close()
+
+    # --- Registering and reading ---
+    async def watch(self, origin: str, destination: str, depart_date: str, return_date: str) -> PriceWatch:
+        """Registers the query (or returns its existing watch). A fresh cached search becomes its first poll."""
+        depart_date, return_date = _iso_date(depart_date), _iso_date(return_date)
+        await self._open()
+        key = watch_id(origin, destination, depart_date, return_date)
+        if key in self._watches:
+            return self._watches[key]
+        if len(self._watches) >= Config.PRICE_WATCH_MAX_WATCHES:
+            raise TooManyWatches(f"Already watching {len(self._watches)} searches, the maximum.")
+
+        now = time.time()
+        watch = PriceWatch(
+            watch_id=key, origin=origin.strip().upper(), destination=destination.strip().upper(),
+            depart_date=depart_date, return_date=return_date, created_at=now, next_poll=now,
+        )
+        self._watches[key] = watch
+        self._latest[key] = {}
+        cached = await outbound_cache.get(outbound_key(origin, destination, depart_date, return_date)) if Config.SEARCH_CACHE_ENABLED else None
+        if cached:
+            await self._record(watch, cached)
+        else:
+            await self._save(watch)
+            self._launch(watch)
+        print(f"👀 Watching {watch.origin} -> {watch.destination} ({watch.depart_date} / {watch.return_date}).")
+        return watch
+
+    async def unwatch(self, key: str) -> bool:
+        await self._open()
+        async with self._write_lock:
+            if self._watches.pop(key, None) is None:
+                return False
+            self._latest.pop(key, None)
+            await asyncio.to_thread(self._store.delete, key)
+        return True
+
+    def watches(self) -> List[PriceWatch]:
+        return list(self._watches.values())
+
+    async def snapshot(self, key: str, recent: Optional[int] = None) -> Optional[WatchSnapshot]:
+        """The latest flights (from memory) and the most recent changes."""
+        await self._open()
+        watch = self._watches.get(key)
+        if watch is None:
+            return None
+        limit = recent if recent is not None else Config.PRICE_WATCH_RECENT_CHANGES
+        changes = await asyncio.to_thread(self._store.changes, key, limit) if limit else []
+        flights = sorted(self._latest[key].values(), key=lambda flight: flight.price)
+        return WatchSnapshot(watch=watch, flights=flights, changes=changes)
+
+    # --- Polling ---
+    async def _run(self) -> None:
+        while True:
+            self.poll_due()
+            await asyncio.sleep(Config.PRICE_WATCH_TICK)
+
+    def poll_due(self) -> None:
+        """Starts a poll for every watch that is due (and not already polling)."""
+        now, today = time.time(), date.today()
+        for watch in list(self._watches.values()):
+            if _departed(watch, today):
+                print(f"👀 Dropping the watch on {watch.origin} -> {watch.destination}: it has departed.")
+                task = asyncio.create_task(self.unwatch(watch.watch_id))
+                self._tasks.add(task)
+                task.add_done_callback(self._tasks.discard)
+            elif watch.next_poll <= now:
+                self._launch(watch)
+
+    def _launch(self, watch: PriceWatch) -> None:
+        if watch.watch_id in self._polling:
+            return
+        self._polling.add(watch.watch_id)
+        task = asyncio.create_task(self._poll(watch))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _poll(self, watch: PriceWatch) -> None:
+        try:
+            async with self._semaphore:
+                # No thread: a one-shot page, and the background shares the browser limiter fairly
+                flights = await _search_outbound(watch.origin, watch.destination, watch.depart_date, watch.return_date, None)
+            if not flights:
+                # A failed scrape, not every flight gone: keep the snapshot, try again next time
+                self.failures += 1
+                watch.failures += 1
+                watch.next_poll = _next_poll(time.time())
+                await self._save(watch)
+                return
+            await self._record(watch, flights)
+        except Exception as e:
+            self.failures += 1
+            watch.next_poll = _next_poll(time.time())
+            print(f"⚠️ Price watch poll of {watch.origin} -> {watch.destination} failed: {e}")
+        finally:
+            self._polling.discard(watch.watch_id)
+
+    async def _save(self, watch: PriceWatch) -> None:
+        async with self._write_lock:
+            if watch.watch_id in self._watches:  # not unwatched meanwhile
+                await asyncio.to_thread(self._store.save, watch)
+
+    async def _record(self, watch: PriceWatch, flights: List[FlightOption]) -> None:
+        async with self._write_lock:
+            if watch.watch_id not in self._watches:
+                return  # unwatched while polling: nothing to keep
+            now = time.time()
+            latest, changes = diff_flights(self._latest.get(watch.watch_id, {}), flights, now)
+            self._latest[watch.watch_id] = latest
+            watch.first_polled = watch.first_polled or now
+            watch.last_polled, watch.next_poll = now, _next_poll(now)
+            watch.polls += 1
+            self.polls += 1
+            self.changes += len(changes)
+            await asyncio.to_thread(self._store.save, watch, changes)
+        if changes:
+            print(f"👀 {watch.origin} -> {watch.destination}: {len(changes)} changes.")
+
+    def stats(self) -> dict:
+        return {
+            "watches": len(self._watches),
+            "polling": len(self._polling),
+            "polls": self.polls,
+            "failures": self.failures,
+            "changes": self.changes,
+        }
+
+price_watcher = PriceWatcher()
+
+# ------------------------------------------------------------------
+# TOOL: WATCH A SEARCH
+# ------------------------------------------------------------------
+@tool
+async def watch_flight_prices(origin: str, destination: str, depart_date: str, return_date: str) -> str:
+    """
+    Keep an eye on the outbound prices of a search (same arguments as
+    search_outbound_flights) when the user wants to "check again later".
+    The search is re-checked in the background. Calling this again for the
+    same search returns the latest prices and what changed, without searching.
+    """
+    print(f"👀 Tool: Price Watch {origin} -> {destination}")
+    try:
+        watch = await price_watcher.watch(origin, destination, depart_date, return_date)
+    except ValueError as e:
+        return f"Error: {e}"
+    return encode_watch(await price_watcher.snapshot(watch.watch_id))
@@ -0,0 +1,157 @@
+import asyncio
+import itertools
+import time
+from typing import Awaitable, Callable, Dict, List, Optional
+
+from src.config import Config
+from src.metrics import STAGE_SECONDS
+
+CARD_SELECTOR = 'div[role="main"] li'
+
+# Count + first/last card text: changes whenever the result list is re-rendered.
+_SIGNATURE = """
+    const cards = document.querySelectorAll(selector);
+    const signature = cards.length
+        ? cards.length + '|' + cards[0].textContent + '|' + cards[cards.length - 1].textContent
+        : '0';
+"""
+
+LIST_SIGNATURE_JS = "(selector) => {" + _SIGNATURE + "return signature; }"
+
+LIST_CHANGED_JS = "([selector, before]) => {" + _SIGNATURE + "return cards.length > 0 && signature !== before; }"
+
+# Polls inside the page: true once a *new* list has held still for `windowMs`.
+LIST_STABLE_JS = "([selector, before, windowMs, token]) => {" + _SIGNATURE + """
+    const now = performance.now();
+    const state = (window.__resultStability = window.__resultStability || {});
+    const s = state[token] || (state[token] = { signature: null, since: now });
+    if (signature !== s.signature) { s.signature = signature; s.since = now; return false; }
+    return cards.length > 0 && signature !== before && now - s.since >= windowMs;
+}"""
+
+_tokens = itertools.count()
+
+# ------------------------------------------------------------------
+# 1. SNAPSHOT BEFORE ACTING
+# ------------------------------------------------------------------
+class PageSnapshot:
+    """What the page looked like right before a click."""
+    def __init__(self, url: str, signature: str):
+        self.url = url
+        self.signature = signature
+
+async def snapshot(page) -> PageSnapshot:
+    return PageSnapshot(page.url, await page.evaluate(LIST_SIGNATURE_JS, CARD_SELECTOR))
+
+# ------------------------------------------------------------------
+# 2. THE SIGNALS (each one raises on its own timeout)
+# ------------------------------------------------------------------
+async def _url_changed(page, before: PageSnapshot) -> None:
+    await page.wait_for_url(lambda url: url != before.url, wait_until="commit", timeout=Config.READY_URL_CHANGE_TIMEOUT)
+
+async def _cards_rerendered(page, before: PageSnapshot) -> None:
+    await page.wait_for_function(
+        LIST_CHANGED_JS, arg=[CARD_SELECTOR, before.signature],
+        polling=100, timeout=Config.READY_CARDS_RERENDER_TIMEOUT,
+    )
+
+async def _results_stable(page, before: PageSnapshot) -> None:
+    await page.wait_for_function(
+        LIST_STABLE_JS, arg=[CARD_SELECTOR, before.signature, Config.READY_RESULTS_STABLE_WINDOW, next(_tokens)],
+        polling=100, timeout=Config.READY_RESULTS_STABLE_TIMEOUT,
+    )
+
+async def _network_idle(page) -> None:
+    """
+    No request in flight for `Config.READY_NETWORK_IDLE_WINDOW` ms.
+    (Playwright's own "networkidle" load state is already reached after the first
+    load, so it resolves instantly after an in-page click.)
+    """
+    in_flight = set()
+    last_activity = [time.monotonic()]
+
+    def on_start(request):
+        in_flight.add(request)
+        last_activity[0] = time.monotonic()
+
+    def on_end(request):
+        in_flight.discard(request)
+        last_activity[0] = time.monotonic()
+
+    page.on("request", on_start)
+    page.on("requestfinished", on_end)
+    page.on("requestfailed", on_end)
+    try:
+        window = Config.READY_NETWORK_IDLE_WINDOW / 1000
+        deadline = time.monotonic() + Config.READY_NETWORK_IDLE_TIMEOUT / 1000
+        while True:
+            now = time.monotonic()
+            if not in_flight and now - last_activity[0] >= window:
+                return
+            if now >= deadline:
+                raise asyncio.TimeoutError("network never went idle")
+            await asyncio.sleep(0.05)
+    finally:
+        page.remove_listener("request", on_start)
+        page.remove_listener("requestfinished", on_end)
+        page.remove_listener("requestfailed", on_end)
+
+# ------------------------------------------------------------------
+# 3. RACING SIGNALS
+# ------------------------------------------------------------------
+async def first_signal(signals: Dict[str, Callable[[], Awaitable[None]]]) -> Optional[str]:
+    """
+    Runs every signal and returns the name of the first one that succeeds,
+    or None if they all time out / fail. The losers are cancelled.
+    """
+    tasks = {asyncio.ensure_future(factory()): name for name, factory in signals.items()}
+    pending = set(tasks)
+    try:
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is None:
+                    return tasks[task]
+        return None
+    finally:
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+
+async def _wait(page, label: str, changed: Dict[str, Callable], settled: Dict[str, Callable]) -> List[Optional[str]]:
+    start = time.monotonic()
+    fired = [await first_signal(changed), await first_signal(settled)]
+    elapsed = time.monotonic() - start
+    STAGE_SECONDS.observe("click_wait", elapsed)
+    names = ", ".join(name or "timeout" for name in fired)
+    print(f"   ⏱️  {label} ready in {elapsed:.2f}s ({names})")
+    return fired
+
+# ------------------------------------------------------------------
+# 4. READINESS CHECKS USED BY THE TOOLS
+# ------------------------------------------------------------------
+async def wait_for_new_results(page, before: PageSnapshot) -> List[Optional[str]]:
+    """
+    After clicking an outbound card: wait until the list has been replaced by
+    the return options (URL change or re-render), then until it has settled.
+    """
+    return await _wait(
+        page, "Return list",
+        changed={
+            "url_change": lambda: _url_changed(page, before),
+            "cards_rerendered": lambda: _cards_rerendered(page, before),
+        },
+        # Network idle alone can fire between the URL change and the new list
+        # arriving, so the list itself has to settle here.
+        settled={"results_stable": lambda: _results_stable(page, before)},
+    )
+
+async def wait_for_booking_page(page, before: PageSnapshot) -> List[Optional[str]]:
+    """
+    After clicking a return card: the booking deep link appears as a URL change.
+    """
+    return await _wait(
+        page, "Booking page",
+        changed={"url_change": lambda: _url_changed(page, before)},
+        settled={"network_idle": lambda: _network_idle(page)},
+    )
@@ -0,0 +1,167 @@
+import asyncio
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import List, Optional, Tuple
+
+from src.config import Config
+from src.state import FlightOption
+from src.tools.card_parser import normalize_text
+
+# ------------------------------------------------------------------
+# 1. CACHE KEYS
+# ------------------------------------------------------------------
+def outbound_key(origin: str, destination: str, depart_date: str, return_date: str) -> str:
+    return "|".join([origin.strip().upper(), destination.strip().upper(), depart_date.strip(), return_date.strip()])
+
+def return_key(search_url: str, airline: str, departure_time: str, arrival_time: str, price: float, stops: str) -> str:
+    """The outbound fingerprint, on the search it came from."""
+    return "|".join([
+        search_url.strip(),
+        normalize_text(airline),
+        normalize_text(departure_time),
+        normalize_text(arrival_time),
+        normalize_text(stops),
+        str(int(round(price))),
+    ])
+
+# ------------------------------------------------------------------
+# 2. THE TWO-TIER CACHE
+# ------------------------------------------------------------------
+class SearchCache:
+    """
+    TTL + LRU cache for scraped flight lists.
+    Memory tier: bounded by the serialized size of its entries (`max_bytes`).
+    Disk tier (optional): a SQLite table that survives restarts; hits are promoted to memory.
+    """
+    def __init__(self, namespace: str, ttl: Optional[int] = None, max_bytes: Optional[int] = None, sqlite_path: Optional[str] = None):
+        self.namespace = namespace
+        self.ttl = ttl if ttl is not None else Config.SEARCH_CACHE_TTL
+        self.max_bytes = max_bytes if max_bytes is not None else Config.SEARCH_CACHE_MAX_BYTES
+        self.sqlite_path = sqlite_path if sqlite_path is not None else Config.SEARCH_CACHE_SQLITE_PATH
+
+        # key -> (expires_at, payload)
+        self._memory: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+        self._bytes = 0
+        self._db: Optional[sqlite3.Connection] = None
+        self._db_lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.disk_hits = 0
+        self.evictions = 0
+
+    # --- Public API ---
+    async def get(self, key: str) -> Optional[List[FlightOption]]:
+        payload = self._memory_get(key)
+        if payload is None and self.sqlite_path:
+            entry = await asyncio.to_thread(self._disk_get, key)
+            if entry is not None:
+                # Promoted with its stored expiry: a disk hit never extends the TTL
+                expires_at, payload = entry
+                self.disk_hits += 1
+                self._memory_set(key, payload, expires_at)
+        if payload is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return [FlightOption(**item) for item in json.loads(payload)]
+
+    async def set(self, key: str, flights: List[FlightOption]) -> None:
+        if not flights:
+            return  # never cache a failed scrape
+        payload = json.dumps([flight.model_dump() for flight in flights])
+        expires_at = time.time() + self.ttl
+        self._memory_set(key, payload, expires_at)
+        if self.sqlite_path:
+            await asyncio.to_thread(self._disk_set, key, payload, expires_at)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "disk_hits": self.disk_hits,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+            "entries": len(self._memory),
+            "bytes": self._bytes,
+            "evictions": self.evictions,
+        }
+
+    def clear(self) -> None:
+        self._memory.clear()
+        self._bytes = 0
+
+    # --- Memory Tier ---
+    def _memory_get(self, key: str) -> Optional[str]:
+        entry = self._memory.get(key)
+        if entry is None:
+            return None
+        expires_at, payload = entry
+        if expires_at < time.time():
+            self._memory_drop(key)
+            return None
+        self._memory.move_to_end(key)
+        return payload
+
+    def _memory_set(self, key: str, payload: str, expires_at: float) -> None:
+        if len(payload) > self.max_bytes:
+            return
+        if key in self._memory:
+            self._memory_drop(key)
+        self._memory[key] = (expires_at, payload)
+        self._bytes += len(payload)
+        while self._bytes > self.max_bytes:
+            oldest = next(iter(self._memory))
+            self._memory_drop(oldest)
+            self.evictions += 1
+
+    def _memory_drop(self, key: str) -> None:
+        _, payload = self._memory.pop(key)
+        self._bytes -= len(payload)
+
+    # --- Disk Tier (runs in a worker thread) ---
+    def _connect(self) -> sqlite3.Connection:
+        if self._db is None:
+            self._db = sqlite3.connect(self.sqlite_path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS search_cache ("
+                " namespace TEXT, key TEXT, expires_at REAL, payload TEXT,"
+                " PRIMARY KEY (namespace, key))"
+            )
+            self._db.commit()
+        return self._db
+
+    def _disk_get(self, key: str) -> Optional[Tuple[float, str]]:
+        """(expires_at, payload), or None when missing or expired."""
+        with self._db_lock:
+            db = self._connect()
+            row = db.execute(
+                "SELECT expires_at, payload FROM search_cache WHERE namespace = ? AND key = ?",
+                (self.namespace, key),
+            ).fetchone()
+            if row is None:
+                return None
+            if row[0] < time.time():
+                db.execute("DELETE FROM search_cache WHERE namespace = ? AND key = ?", (self.namespace, key))
+                db.commit()
+                return None
+            return row[0], row[1]
+
+    def _disk_set(self, key: str, payload: str, expires_at: float) -> None:
+        with self._db_lock:
+            db = self._connect()
+            db.execute(
+                "INSERT OR REPLACE INTO search_cache (namespace, key, expires_at, payload) VALUES (?, ?, ?, ?)",
+                (self.namespace, key, expires_at, payload),
+            )
+            db.execute("DELETE FROM search_cache WHERE expires_at < ?", (time.time(),))
+            db.commit()
+
+outbound_cache = SearchCache("outbound")
+return_cache = SearchCache("return")
+
+def cache_stats() -> dict:
+    return {"outbound": outbound_cache.stats(), "return": return_cache.stats()}
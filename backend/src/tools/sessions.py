@@ -0,0 +1,262 @@
+import asyncio
+import time
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from typing import Dict, List, Optional
+
+from src.admission import browser_limiter, report_queued
+from src.config import Config
+from src.tools.browser_pool import browser_pool
+from src.tools.network import NetworkStats, install_request_blocking
+
+# ------------------------------------------------------------------
+# 1. A PAGE THAT OUTLIVES A SINGLE TOOL CALL
+# ------------------------------------------------------------------
+class LivePage:
+    """
+    A Playwright page plus what the last tool learned about it.
+    `stage` is "outbound" (outbound list showing) or "return" (outbound clicked,
+    return list showing). `cards` holds the parsed cards of the last scan, each
+    with its DOM `index`, so the next tool can click without rescanning.
+    """
+    def __init__(self, page):
+        self.page = page
+        self.reused = False
+        self.stage: Optional[str] = None
+        self.cards: List[dict] = []
+        # Set by the tool when the page is worth keeping; it is parked under this URL.
+        self.keep_as: Optional[str] = None
+        self.last_used = time.monotonic()
+        # What the request router blocked during the current tool call
+        self.network = NetworkStats()
+        self.routed = False
+
+    async def begin_call(self) -> None:
+        """Resets per-call state; installs request blocking the first time."""
+        self.network.reset()
+        if Config.BLOCK_RESOURCES_ENABLED and not self.routed:
+            await install_request_blocking(self.page, self.network)
+            self.routed = True
+
+    def end_call(self) -> None:
+        if self.routed:
+            print(f"   {self.network.summary()}")
+
+    async def close(self) -> None:
+        try:
+            await self.page.close()
+        except Exception:
+            pass
+
+
+class FlightSession:
+    """All live pages of one conversation, sharing a single browser context."""
+    def __init__(self, thread_id: str, context):
+        self.thread_id = thread_id
+        self.context = context
+        self.pages: Dict[str, LivePage] = {}
+        self.in_use = 0
+        self.last_used = time.monotonic()
+
+# ------------------------------------------------------------------
+# 2. THE PER-THREAD REGISTRY
+# ------------------------------------------------------------------
+class SessionRegistry:
+    """
+    Keeps the selection page open between `search_outbound_flights`,
+    `search_return_flights` and `generate_booking_link` for each `thread_id`.
+    Idle sessions expire after `Config.SESSION_IDLE_TTL` seconds and at most
+    `Config.MAX_OPEN_SESSIONS` are kept (least recently used goes first).
+    """
+    def __init__(self):
+        self._sessions: "OrderedDict[str, FlightSession]" = OrderedDict()
+        self._lock = asyncio.Lock()
+        self._sweeper: Optional[asyncio.Task] = None
+
+    @property
+    def open_sessions(self) -> int:
+        return len(self._sessions)
+
+    def start(self) -> None:
+        if self._sweeper is None:
+            self._sweeper = asyncio.create_task(self._sweep_loop())
+
+    async def stop(self) -> None:
+        if self._sweeper:
+            self._sweeper.cancel()
+            try:
+                await self._sweeper
+            except asyncio.CancelledError:
+                pass
+            self._sweeper = None
+        for thread_id in list(self._sessions):
+            await self.close_thread(thread_id)
+
+    async def _sweep_loop(self) -> None:
+        while True:
+            await asyncio.sleep(Config.SESSION_SWEEP_INTERVAL)
+            await self.evict_expired()
+
+    # --- Checkout / Park ---
+    @asynccontextmanager
+    async def page(self, thread_id: Optional[str], url: Optional[str] = None):
+        """
+        Yields a LivePage. If `url` matches a page parked for this thread, that page
+        is reused (`live.reused` is True); otherwise a new page is opened. On exit the
+        page is parked under `live.keep_as`, or closed if the tool did not set it.
+        Without a `thread_id` this is a plain one-shot page from the browser pool.
+        At most `Config.BROWSER_MAX_PAGES` pages are in use at once, across all threads.
+        """
+        async with browser_limiter.slot(thread_id or "anonymous", report_queued("browser")):
+            async with self._page(thread_id, url) as live:
+                yield live
+
+    @asynccontextmanager
+    async def _page(self, thread_id: Optional[str], url: Optional[str]):
+        if not thread_id or not Config.SESSIONS_ENABLED:
+            async with self._lock:
+                await self._make_room()
+            async with browser_pool.page() as page:
+                live = LivePage(page)
+                await live.begin_call()
+                try:
+                    yield live
+                finally:
+                    live.end_call()
+            return
+
+        live = await self._checkout(thread_id, url)
+        try:
+            await live.begin_call()
+            yield live
+        except asyncio.CancelledError:
+            live.keep_as = None  # stopped half-way through a click: close it, never park it
+            raise
+        finally:
+            live.end_call()
+            await asyncio.shield(self._checkin(thread_id, live))
+
+    async def _checkout(self, thread_id: str, url: Optional[str]) -> LivePage:
+        self.start()
+        context = None
+        while True:
+            async with self._lock:
+                session = self._sessions.get(thread_id)
+                if session is None and context is not None:
+                    session, context = FlightSession(thread_id, context), None
+                    self._sessions[thread_id] = session
+                if session is not None:
+                    self._sessions.move_to_end(thread_id)
+                    session.in_use += 1
+                    session.last_used = time.monotonic()
+
+                    live = session.pages.pop(url, None) if url else None
+                    if live is not None:
+                        live.reused = True
+                        print(f"♻️  Reusing live page for thread {thread_id}.")
+                    else:
+                        await self._make_room()
+                    break
+            # First call of this thread: open its context without holding up the other threads
+            context = await browser_pool.new_context()
+        if context is not None:
+            await browser_pool.release_context(context)  # another call of this thread got there first
+        if live is not None:
+            return live
+        try:
+            return LivePage(await session.context.new_page())
+        except Exception:
+            # The browser behind this session died; start over with a fresh context.
+            context = await browser_pool.new_context()
+            async with self._lock:
+                current = self._sessions.get(thread_id)
+                if current is session:
+                    await self.close_thread(thread_id)
+                    current = None
+                if current is None:
+                    current, context = FlightSession(thread_id, context), None
+                    self._sessions[thread_id] = current
+                current.in_use += 1
+            if context is not None:
+                await browser_pool.release_context(context)  # another call already started over
+            return LivePage(await current.context.new_page())
+
+    async def _checkin(self, thread_id: str, live: LivePage) -> None:
+        async with self._lock:
+            session = self._sessions.get(thread_id)
+            if session is None:
+                await live.close()
+                return
+            session.in_use -= 1
+            session.last_used = time.monotonic()
+            if live.keep_as and not live.page.is_closed():
+                live.reused = False
+                live.last_used = session.last_used
+                replaced = session.pages.pop(live.keep_as, None)
+                if replaced is not None and replaced is not live:
+                    await replaced.close()
+                session.pages[live.keep_as] = live
+                while len(session.pages) > Config.MAX_PAGES_PER_SESSION:
+                    oldest = min(session.pages, key=lambda u: session.pages[u].last_used)
+                    await session.pages.pop(oldest).close()
+            else:
+                await live.close()
+            await self._enforce_limits()
+
+    # --- Eviction ---
+    @property
+    def parked_pages(self) -> int:
+        return sum(len(session.pages) for session in self._sessions.values())
+
+    async def _make_room(self) -> None:
+        """
+        Before a page opens: parked pages count against the browser limiter too, so
+        the least recently used ones (of any thread) are closed until the pages in
+        use plus the parked ones fit in its capacity. Call with the lock held.
+        """
+        while self.parked_pages and self.parked_pages + browser_limiter.active > browser_limiter.capacity:
+            session, url = min(
+                ((session, url) for session in self._sessions.values() for url in session.pages),
+                key=lambda pair: pair[0].pages[pair[1]].last_used,
+            )
+            print(f"🧹 Page limit reached. Closing a parked page of thread {session.thread_id}.")
+            await session.pages.pop(url).close()
+
+    async def discard(self, thread_id: str, url: str) -> None:
+        """Closes the page parked under `url`, if nobody will come back for it."""
+        async with self._lock:
+            session = self._sessions.get(thread_id)
+            live = session.pages.pop(url, None) if session else None
+            if live is not None:
+                await live.close()
+
+    async def close_thread(self, thread_id: str) -> None:
+        """Closes every page of a thread and returns its context to the pool."""
+        session = self._sessions.pop(thread_id, None)
+        if session is None:
+            return
+        for live in session.pages.values():
+            await live.close()
+        await browser_pool.release_context(session.context)
+
+    async def evict_expired(self) -> None:
+        async with self._lock:
+            now = time.monotonic()
+            for thread_id, session in list(self._sessions.items()):
+                if session.in_use == 0 and now - session.last_used > Config.SESSION_IDLE_TTL:
+                    print(f"🧹 Session for thread {thread_id} expired.")
+                    await self.close_thread(thread_id)
+
+    async def _enforce_limits(self) -> None:
+        # Drop idle sessions with nothing parked, then the least recently used ones.
+        for thread_id, session in list(self._sessions.items()):
+            if session.in_use == 0 and not session.pages:
+                await self.close_thread(thread_id)
+        for thread_id, session in list(self._sessions.items()):
+            if len(self._sessions) <= Config.MAX_OPEN_SESSIONS:
+                break
+            if session.in_use == 0:
+                print(f"🧹 Session cap reached. Closing thread {thread_id}.")
+                await self.close_thread(thread_id)
+
+session_registry = SessionRegistry()
@@ -0,0 +1,71 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Dict
+
+# ------------------------------------------------------------------
+# 1. ONE SHARED CALL
+# ------------------------------------------------------------------
+class _Call:
+    def __init__(self, task: asyncio.Task):
+        self.task = task
+        self.waiters = 0
+
+# ------------------------------------------------------------------
+# 2. THE COORDINATOR
+# ------------------------------------------------------------------
+class SingleFlight:
+    """
+    Collapses concurrent identical work into one run. The first caller for a
+    key starts it; callers arriving while it runs wait on the same task and
+    get the same result or the same exception. Nothing is kept once it
+    finishes (that is the search cache's job). The run is cancelled only when
+    every waiter has been cancelled.
+    """
+    def __init__(self, name: str):
+        self.name = name
+        self._calls: Dict[str, _Call] = {}
+        self.runs = 0
+        self.shared = 0
+        self.failures = 0
+
+    @property
+    def in_flight(self) -> int:
+        return len(self._calls)
+
+    async def do(self, key: str, work: Callable[[], Awaitable[Any]]) -> Any:
+        call = self._calls.get(key)
+        if call is None or call.task.done():  # finished, its entry not yet cleared: start afresh
+            call = _Call(asyncio.create_task(work()))
+            call.task.add_done_callback(lambda task, key=key: self._finished(key, task))
+            self._calls[key] = call
+            self.runs += 1
+        else:
+            self.shared += 1
+            print(f"🤝 Joining an identical {self.name} scrape already in progress.")
+
+        call.waiters += 1
+        try:
+            return await asyncio.shield(call.task)
+        except asyncio.CancelledError:
+            if not call.task.done() and call.waiters == 1:
+                call.task.cancel()  # the last one waiting gave up
+                if self._calls.get(key) is call:
+                    del self._calls[key]  # nobody new may join a run being cancelled
+            raise
+        finally:
+            call.waiters -= 1
+
+    def _finished(self, key: str, task: asyncio.Task) -> None:
+        if self._calls.get(key) is not None and self._calls[key].task is task:
+            del self._calls[key]
+        if not task.cancelled() and task.exception() is not None:
+            self.failures += 1
+
+    def stats(self) -> dict:
+        return {"in_flight": self.in_flight, "runs": self.runs, "shared": self.shared, "failures": self.failures}
+
+outbound_flights = SingleFlight("outbound")
+return_flights = SingleFlight("return")
+booking_flights = SingleFlight("booking link")
+
+def single_flight_stats() -> dict:
+    return {flight.name: flight.stats() for flight in (outbound_flights, return_flights, booking_flights)}
@@ -0,0 +1,246 @@
+import asyncio
+import importlib
+import itertools
+import multiprocessing
+import queue
+import uuid
+import zlib
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from src.admission import browser_limiter, report_queued
+from src.config import Config
+
+# Browser jobs the tools can submit: name -> (module, attribute path). Looked up
+# at call time, so the workers never import the agent and tests can patch them.
+JOBS = {
+    "scrape_outbound": ("src.tools.flight_search", "_scrape_outbound"),
+    "scrape_returns": ("src.tools.flight_search", "_scrape_returns"),
+    "booking_link": ("src.tools.flight_search", "_click_booking_link"),
+    "close_thread": ("src.tools.sessions", "session_registry.close_thread"),
+    "discard_page": ("src.tools.sessions", "session_registry.discard"),
+}
+
+# Jobs that hold a browser page while they run
+PAGE_JOBS = {"scrape_outbound", "scrape_returns", "booking_link"}
+
+# Sent in place of a job name: stop the job with that id (its caller gave up)
+CANCEL = "__cancel__"
+
+class ScrapeJobError(RuntimeError):
+    """A job failed in its worker, lost its worker, or ran past `Config.SCRAPE_JOB_TIMEOUT`."""
+
+def _resolve(name: str) -> Callable:
+    module_name, path = JOBS[name]
+    target: Any = importlib.import_module(module_name)
+    for attribute in path.split("."):
+        target = getattr(target, attribute)
+    return target
+
+# ------------------------------------------------------------------
+# 1. THE WORKER PROCESS
+# ------------------------------------------------------------------
+def _worker_main(index: int, workers: int, requests: "multiprocessing.Queue", responses: "multiprocessing.Queue") -> None:
+    """Entry point of a worker process: its own event loop, browser pool and sessions."""
+    asyncio.run(_serve(index, workers, requests, responses))
+
+async def _serve(index: int, workers: int, requests, responses) -> None:
+    from src.metrics import collect_timings
+    from src.tools.browser_pool import browser_pool
+    from src.tools.sessions import session_registry
+
+    # Its share of the page limit, so parked pages stay under it across all workers
+    browser_limiter.capacity = max(1, Config.BROWSER_MAX_PAGES // workers)
+
+    if Config.BROWSER_POOL_ENABLED:
+        try:
+            await browser_pool.start()
+        except Exception as e:
+            print(f"⚠️ Scrape worker {index} could not pre-warm browsers: {e}")
+    session_registry.start()
+    print(f"👷 Scrape worker {index} ready.")
+
+    loop = asyncio.get_running_loop()
+    running: Dict[str, asyncio.Task] = {}
+
+    async def run(job_id: str, name: str, args: tuple) -> None:
+        timings = collect_timings()  # shipped back so /metrics and `timing` events see them
+        try:
+            result = await _resolve(name)(*args)
+            responses.put((job_id, True, result, timings))
+        except Exception as e:
+            responses.put((job_id, False, f"{type(e).__name__}: {e}", timings))
+
+    while True:
+        job = await loop.run_in_executor(None, requests.get)
+        if job is None:
+            break
+        job_id, name, _ = job
+        if name == CANCEL:
+            if job_id in running:
+                print(f"🛑 Scrape worker {index} cancelling a job its caller gave up on.")
+                running[job_id].cancel()
+            continue
+        task = asyncio.create_task(run(*job))
+        running[job_id] = task
+        task.add_done_callback(lambda _, job_id=job_id: running.pop(job_id, None))
+
+    for task in list(running.values()):
+        task.cancel()
+    await asyncio.gather(*running.values(), return_exceptions=True)
+    await session_registry.stop()
+    await browser_pool.stop()
+
+# ------------------------------------------------------------------
+# 2. THE POOL (API PROCESS SIDE)
+# ------------------------------------------------------------------
+class ScrapeWorkerPool:
+    """
+    `Config.SCRAPE_WORKERS` local processes doing all browser work, so scraping
+    never blocks the API event loop. Jobs of one thread always go to the same
+    worker, because that is where its live pages are parked. Plain
+    multiprocessing queues; no broker.
+    """
+    def __init__(self, size: Optional[int] = None):
+        self._requested_size = size
+        self.size = 0
+        self._context = multiprocessing.get_context("spawn")  # no forked event loops or browsers
+        self._processes: List[multiprocessing.Process] = []
+        self._requests: List["multiprocessing.Queue"] = []
+        self._responses: Optional["multiprocessing.Queue"] = None
+        # job id -> (future, worker index)
+        self._pending: Dict[str, Tuple[asyncio.Future, int]] = {}
+        self._reader: Optional[asyncio.Task] = None
+        self._round_robin = itertools.count()
+        self.started = False
+        self.completed = 0
+        self.failed = 0
+        self.cancelled = 0
+        self.restarts = 0
+
+    def start(self) -> None:
+        if self.started:
+            return
+        self.size = self._requested_size or Config.SCRAPE_WORKERS
+        self._responses = self._context.Queue()
+        for index in range(self.size):
+            self._requests.append(self._context.Queue())
+            self._processes.append(self._spawn(index))
+        self._reader = asyncio.create_task(self._read_loop())
+        self.started = True
+        print(f"👷 Started {self.size} scrape workers.")
+
+    def _spawn(self, index: int) -> multiprocessing.Process:
+        process = self._context.Process(
+            target=_worker_main, args=(index, self.size, self._requests[index], self._responses),
+            name=f"scrape-worker-{index}", daemon=True,
+        )
+        process.start()
+        return process
+
+    async def stop(self) -> None:
+        if not self.started:
+            return
+        self.started = False
+        for requests in self._requests:
+            requests.put(None)
+        for process in self._processes:
+            await asyncio.to_thread(process.join, 10)
+            if process.is_alive():
+                process.terminate()
+        if self._reader:
+            self._reader.cancel()
+            await asyncio.gather(self._reader, return_exceptions=True)
+        for future, _ in self._pending.values():
+            if not future.done():
+                future.set_exception(ScrapeJobError("Scrape workers stopped"))
+        self._pending.clear()
+        self._processes, self._requests = [], []
+
+    def worker_for(self, route: Optional[str]) -> int:
+        if route is None:
+            return next(self._round_robin) % self.size
+        return zlib.crc32(route.encode()) % self.size
+
+    async def submit(self, name: str, args: tuple, route: Optional[str] = None) -> Any:
+        from src.metrics import replay_timings
+
+        job_id = uuid.uuid4().hex
+        index = self.worker_for(route)
+        future = asyncio.get_running_loop().create_future()
+        self._pending[job_id] = (future, index)
+        self._requests[index].put((job_id, name, args))
+        try:
+            ok, result, timings = await asyncio.wait_for(future, Config.SCRAPE_JOB_TIMEOUT)
+        except (asyncio.CancelledError, asyncio.TimeoutError) as e:
+            # Nobody will read the result: stop the browser work in the worker too
+            if self.started:
+                self._requests[index].put((job_id, CANCEL, ()))
+                self.cancelled += 1
+            if isinstance(e, asyncio.TimeoutError):
+                raise ScrapeJobError(f"Scrape job {name} timed out") from e
+            raise
+        except ScrapeJobError:
+            self.failed += 1  # its worker died or the pool stopped
+            raise
+        finally:
+            self._pending.pop(job_id, None)
+        replay_timings(timings)
+        if not ok:
+            self.failed += 1
+            raise ScrapeJobError(f"Scrape job {name} failed: {result}")
+        self.completed += 1
+        return result
+
+    async def _read_loop(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            self._restart_dead_workers()
+            try:
+                job_id, ok, result, timings = await loop.run_in_executor(None, self._responses.get, True, 1.0)
+            except queue.Empty:
+                continue
+            pending = self._pending.get(job_id)
+            if pending and not pending[0].done():
+                pending[0].set_result((ok, result, timings))
+
+    def _restart_dead_workers(self) -> None:
+        for index, process in enumerate(self._processes):
+            if process.is_alive() or not self.started:
+                continue
+            print(f"⚠️ Scrape worker {index} died. Restarting it...")
+            for future, worker in self._pending.values():
+                if worker == index and not future.done():
+                    future.set_exception(ScrapeJobError(f"Scrape worker {index} died"))
+            self._processes[index] = self._spawn(index)
+            self.restarts += 1
+
+    def stats(self) -> dict:
+        return {
+            "workers": self.size if self.started else 0,
+            "alive": sum(process.is_alive() for process in self._processes),
+            "pending": len(self._pending),
+            "completed": self.completed,
+            "failed": self.failed,
+            "cancelled": self.cancelled,
+            "restarts": self.restarts,
+        }
+
+scrape_workers = ScrapeWorkerPool()
+
+# ------------------------------------------------------------------
+# 3. SUBMITTING JOBS
+# ------------------------------------------------------------------
+async def run_job(name: str, *args, route: Optional[str] = None) -> Any:
+    """
+    Runs a browser job: on the worker that owns `route` (the thread_id) when the
+    pool is running, otherwise right here in this process. Page jobs sent to a
+    worker take their browser slot here first, so the page limit holds across
+    all workers and the /chat stream still sees `queued` events.
+    Raises `ScrapeJobError` when a worker job fails.
+    """
+    if not scrape_workers.started:
+        return await _resolve(name)(*args)
+    if name not in PAGE_JOBS:
+        return await scrape_workers.submit(name, args, route)
+    async with browser_limiter.slot(route or "anonymous", report_queued("browser")):
+        return await scrape_workers.submit(name, args, route)
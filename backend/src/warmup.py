@@ -0,0 +1,112 @@
+import asyncio
+import time
+from typing import Awaitable, Callable, Dict, Optional
+
+from src.config import Config
+
+# ------------------------------------------------------------------
+# 1. WHAT THE FIRST CHAT TURN NEEDS
+# ------------------------------------------------------------------
+def _build_agent():
+    """Runs in a thread: mostly imports (LangChain, LangGraph, the Gemini SDK) and the LLM client."""
+    from src import agent
+    agent.get_llm_with_tools()
+    return agent
+
+async def _start_browsers() -> None:
+    from src.tools.browser_pool import browser_pool
+    from src.tools.workers import scrape_workers
+
+    if Config.SCRAPE_WORKERS:
+        # Browsers live in the worker processes; this process only serves the API
+        scrape_workers.start()
+    elif Config.BROWSER_POOL_ENABLED:
+        # The Playwright driver and the shared Chromium pool
+        await browser_pool.start()
+
+async def _start_price_watch() -> None:
+    from src.tools.price_watch import price_watcher  # already imported by the agent's tools
+    await price_watcher.start()
+
+# ------------------------------------------------------------------
+# 2. THE WARM-UP
+# ------------------------------------------------------------------
+class Warmup:
+    """
+    Loads the agent (LLM client, tools, compiled graph) and the browsers in
+    parallel, in the background, then starts the price watch. The server answers
+    `/health` at once and `/ready` once the first chat turn would not pay any
+    cold start. Anything asked for before that waits for it (or builds it, if
+    nothing started the warm-up).
+    """
+    def __init__(self):
+        self.imported_at: Optional[float] = None
+        self.ready_at: Optional[float] = None
+        self.steps: Dict[str, float] = {}  # step -> seconds
+        self.errors: Dict[str, str] = {}
+        self._task: Optional[asyncio.Task] = None
+        self._agent: Optional[asyncio.Future] = None
+
+    @property
+    def ready(self) -> bool:
+        return self.ready_at is not None and not self.errors
+
+    def start(self, imported_at: float) -> None:
+        """`imported_at`: `time.perf_counter()` when the server module started importing."""
+        if self._task is None:
+            self.imported_at = imported_at
+            if self._agent is None:
+                self._agent = asyncio.ensure_future(self._step("agent", self._load_agent))
+            self._task = asyncio.create_task(self._run())
+
+    async def _run(self) -> None:
+        await asyncio.gather(self._agent, self._step("browsers", _start_browsers), return_exceptions=True)
+        if Config.PRICE_WATCH_ENABLED and self._loaded():
+            await asyncio.gather(self._step("price_watch", _start_price_watch), return_exceptions=True)
+        self.ready_at = time.perf_counter()
+        steps = ", ".join(f"{name} {seconds:.2f}s" for name, seconds in self.steps.items())
+        if self.errors:
+            print(f"⚠️ Warm-up finished with errors: {self.errors}")
+        print(f"🚀 Ready {self.ready_at - self.imported_at:.2f}s after import ({steps}).")
+
+    async def _step(self, name: str, load: Callable[[], Awaitable]):
+        start = time.perf_counter()
+        try:
+            return await load()
+        except Exception as e:
+            self.errors[name] = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            self.steps[name] = round(time.perf_counter() - start, 3)
+
+    async def _load_agent(self):
+        agent = await asyncio.to_thread(_build_agent)
+        agent.get_checkpointer().start()  # on this loop, which serves the graph
+        await asyncio.to_thread(agent.get_graph)
+        self.errors.pop("agent", None)  # a retry after a failed warm-up
+        return agent
+
+    async def agent(self):
+        """The `src.agent` module, built and with its checkpointer running."""
+        if self._agent is None or (self._agent.done() and not self._loaded()):
+            self._agent = asyncio.ensure_future(self._load_agent())
+        return await asyncio.shield(self._agent)
+
+    async def stop(self) -> None:
+        if self._task:
+            await asyncio.gather(self._task, return_exceptions=True)
+        if self._loaded():
+            await self._agent.result().checkpointer.stop()
+
+    def _loaded(self) -> bool:
+        return self._agent is not None and self._agent.done() and not self._agent.cancelled() and self._agent.exception() is None
+
+    def stats(self) -> dict:
+        return {
+            "status": "ready" if self.ready else "failed" if self.errors and self.ready_at else "warming",
+            "import_to_ready_seconds": round(self.ready_at - self.imported_at, 3) if self.ready_at else None,
+            "steps": self.steps,
+            "errors": self.errors,
+        }
+
+warmup = Warmup()
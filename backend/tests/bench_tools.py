@@ -0,0 +1,138 @@
+import argparse
+import asyncio
+import itertools
+import statistics
+import sys
+import os
+import time
+from typing import Any, Dict, List, Tuple
+
+# Add project root to path so we can import src
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.config import Config
+from src.tools.browser_pool import browser_pool
+from src.tools.flight_search import generate_booking_link, search_outbound_flights, search_return_flights
+from src.tools.search_cache import outbound_cache, return_cache
+from src.tools.sessions import session_registry
+from fake_flights_server import FakeFlightsServer
+
+# ------------------------------------------------------------------
+# END-TO-END TOOL LATENCY BENCHMARK (offline)
+# ------------------------------------------------------------------
+# Runs the full outbound -> return -> booking-link chain against the local
+# stand-in server and reports p50/p95 per tool for every mode combination.
+#
+#   python tests/bench_tools.py --runs 10 --latency-ms 200 --cards 120
+
+MODES = {
+    "pool": [True, False],
+    "cache": [False, True],
+    "extraction": ["bulk", "locator"],
+}
+
+TRIP = {"origin": "JFK", "destination": "SRQ", "depart_date": "2026-02-12", "return_date": "2026-02-16"}
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+async def _timed(coro) -> Tuple[float, Any]:
+    start = time.perf_counter()
+    result = await coro
+    return time.perf_counter() - start, result
+
+
+def _call(name: str, args: dict) -> dict:
+    """Invoke as a tool call so the search tools hand back their structured artifact."""
+    return {"type": "tool_call", "id": f"bench-{name}", "name": name, "args": args}
+
+
+async def run_chain(run: int) -> Dict[str, float]:
+    """One full booking: the three tools in the same thread, like the agent does."""
+    config = {"configurable": {"thread_id": f"bench-{run}"}}
+    timings = {}
+
+    timings["search_outbound_flights"], outbound = await _timed(
+        search_outbound_flights.ainvoke(_call("search_outbound_flights", TRIP), config=config))
+    outbound = outbound.artifact
+    if not outbound:
+        raise RuntimeError("outbound search returned nothing")
+    pick = outbound[0]
+
+    timings["search_return_flights"], returns = await _timed(search_return_flights.ainvoke(_call("search_return_flights", {
+        "search_url": pick.booking_link,
+        "outbound_airline": pick.airline,
+        "outbound_departure_time": pick.departure_time,
+        "outbound_arrival_time": pick.arrival_time,
+        "outbound_price": pick.price,
+        "outbound_stops": pick.stops,
+    }), config=config))
+    returns = returns.artifact
+    if not returns:
+        raise RuntimeError("return search returned nothing")
+    back = returns[0]
+
+    timings["generate_booking_link"], link = await _timed(generate_booking_link.ainvoke({
+        "search_url": back.booking_link,
+        "return_airline": back.airline,
+        "return_departure_time": back.departure_time,
+        "return_arrival_time": back.arrival_time,
+        "return_price": back.price,
+        "return_stops": back.stops,
+    }, config=config))
+    if "booking" not in link:
+        raise RuntimeError(f"booking link failed: {link}")
+    return timings
+
+
+async def bench_mode(pool: bool, cache: bool, extraction: str, runs: int) -> Dict[str, List[float]]:
+    Config.BROWSER_POOL_ENABLED = pool
+    Config.SEARCH_CACHE_ENABLED = cache
+    Config.CARD_EXTRACTION_MODE = extraction
+    outbound_cache.clear()
+    return_cache.clear()
+    if pool:
+        await browser_pool.start()
+
+    samples: Dict[str, List[float]] = {}
+    try:
+        for run in range(runs):
+            for tool_name, seconds in (await run_chain(run)).items():
+                samples.setdefault(tool_name, []).append(seconds)
+    finally:
+        await session_registry.stop()
+        await browser_pool.stop()
+    return samples
+
+
+async def main(args) -> None:
+    server = FakeFlightsServer(args.latency_ms, args.render_delay_ms, args.click_delay_ms, args.cards)
+    Config.FLIGHTS_BASE_URL = await server.start()
+    Config.HEADLESS = True
+    print(f"🛫 Fake Google Flights at {Config.FLIGHTS_BASE_URL} ({args.runs} runs per mode)\n")
+
+    header = f"{'pool':<6}{'cache':<7}{'extract':<9}{'tool':<26}{'p50 (s)':>9}{'p95 (s)':>9}"
+    print(header)
+    print("-" * len(header))
+    try:
+        for pool, cache, extraction in itertools.product(*MODES.values()):
+            samples = await bench_mode(pool, cache, extraction, args.runs)
+            for tool_name, values in samples.items():
+                print(f"{str(pool):<6}{str(cache):<7}{extraction:<9}{tool_name:<26}"
+                      f"{statistics.median(values):>9.3f}{percentile(values, 95):>9.3f}")
+    finally:
+        await server.stop()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="p50/p95 latency of the flight tools against the offline stand-in")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--latency-ms", type=int, default=100, help="server latency per response")
+    parser.add_argument("--render-delay-ms", type=int, default=200, help="delay before cards render")
+    parser.add_argument("--click-delay-ms", type=int, default=100, help="delay before a click navigates")
+    parser.add_argument("--cards", type=int, default=None, help="pad each result list to this many cards")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,44 @@
+import glob
+import os
+import re
+from typing import List, Tuple
+
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+
+FIELD_RE = re.compile(r"^\s*\S+\s+(Airline|Est\. Price|Total Price|Depart|Arrive|Duration|Stops):\s*(.*?)\s*$")
+
+def load_saved_flights(pattern: str = "*.txt") -> List[dict]:
+    """
+    Reads the saved search reports (tests/*.txt by default) back into flight dicts.
+    """
+    flights = []
+    for path in sorted(glob.glob(os.path.join(TESTS_DIR, pattern))):
+        current = None
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                if re.match(r"^(RETURN )?OPTION #\d+", line):
+                    current = {}
+                    flights.append(current)
+                    continue
+                match = FIELD_RE.match(line)
+                if current is not None and match:
+                    key, value = match.groups()
+                    current[key] = value
+    return [f for f in flights if "Airline" in f]
+
+def render_card_text(flight: dict, route: str = "JFK\u2013SRQ") -> str:
+    """
+    Rebuilds the textContent Google Flights gives for a result card: fields glued
+    together, U+202F before AM/PM and U+00A0 inside durations.
+    """
+    dep = re.sub(r"[ \u202f]", "\u202f", flight["Depart"])
+    arr = re.sub(r"[ \u202f]", "\u202f", flight["Arrive"])
+    duration = flight["Duration"].replace(" ", "\u00a0")
+    stops = "Nonstop" if flight["Stops"] == "Nonstop" else flight["Stops"].replace(" Stop(s)", " stop")
+    price = flight.get("Est. Price") or flight.get("Total Price")
+    price = "$" + format(int(float(price.lstrip("$"))), ",")
+    return f"{dep} \u2013 {arr}{flight['Airline']}{duration}{route}{stops}78 kg CO2e{price}round trip"
+
+def saved_card_texts() -> List[Tuple[str, dict]]:
+    """(card text, expected report fields) for every saved flight."""
+    return [(render_card_text(f), f) for f in load_saved_flights()]
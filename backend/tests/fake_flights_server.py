@@ -0,0 +1,148 @@
+import argparse
+import asyncio
+import json
+import sys
+import os
+from typing import List, Optional
+
+from aiohttp import web
+
+sys.path.append(os.path.abspath(os.path.dirname(__file__)))
+
+from card_fixtures import load_saved_flights, render_card_text
+
+# ------------------------------------------------------------------
+# OFFLINE GOOGLE FLIGHTS STAND-IN
+# ------------------------------------------------------------------
+# Serves the recorded results (tests/*_search_test.txt) as pages with the same
+# shape the tools scrape: cards are `div[role="main"] li`, clicking an outbound
+# card leads to the return list, clicking a return card leads to the booking page.
+#
+#   python tests/fake_flights_server.py --port 8765 --latency-ms 300
+#   FLIGHTS_BASE_URL=http://127.0.0.1:8765/travel/flights uvicorn main:app
+
+PAGE_TEMPLATE = """<!doctype html>
+<html><head><title>{title}</title></head>
+<body>
+<div role="main"><ul id="results"></ul></div>
+<script>
+const CARDS = {cards};
+const NEXT = {next};
+const CLICK_DELAY = {click_delay};
+setTimeout(() => {{
+    const list = document.getElementById('results');
+    const header = document.createElement('li');
+    header.textContent = 'Top departing flights';
+    list.appendChild(header);
+    CARDS.forEach((text, i) => {{
+        const card = document.createElement('li');
+        card.textContent = text;
+        card.setAttribute('data-id', 'card-' + i);
+        card.addEventListener('click', () => setTimeout(() => {{ location.href = NEXT + i; }}, CLICK_DELAY));
+        list.appendChild(card);
+    }});
+}}, {render_delay});
+</script>
+</body></html>"""
+
+BOOKING_TEMPLATE = """<!doctype html>
+<html><head><title>Booking options</title></head>
+<body><div role="main"><h1>Booking options</h1><p>{summary}</p></div></body></html>"""
+
+
+def _expand(flights: List[dict], count: Optional[int]) -> List[dict]:
+    """Repeats the recorded flights (with shifted prices) to reach `count` cards."""
+    if not count or count <= len(flights):
+        return flights
+    expanded = []
+    for i in range(count):
+        flight = dict(flights[i % len(flights)])
+        bump = 10 * (i // len(flights))
+        price = float((flight.get("Est. Price") or flight.get("Total Price")).lstrip("$")) + bump
+        flight["Est. Price"] = f"${price}"
+        flight.pop("Total Price", None)
+        expanded.append(flight)
+    return expanded
+
+
+class FakeFlightsServer:
+    """
+    aiohttp app serving the three pages. `latency_ms` delays every response,
+    `render_delay_ms` delays the cards appearing, `click_delay_ms` delays the
+    navigation after a card click, `cards` pads each list to that many cards.
+    """
+    def __init__(self, latency_ms: int = 0, render_delay_ms: int = 0, click_delay_ms: int = 0, cards: Optional[int] = None):
+        self.latency_ms = latency_ms
+        self.render_delay_ms = render_delay_ms
+        self.click_delay_ms = click_delay_ms
+        self.outbound = _expand(load_saved_flights("outbound_search_test.txt"), cards)
+        self.returns = _expand(load_saved_flights("return_search_test.txt"), cards)
+        self.requests = 0
+        self._runner: Optional[web.AppRunner] = None
+        self.base_url = ""
+
+    def app(self) -> web.Application:
+        app = web.Application(middlewares=[self._latency])
+        app.router.add_get("/travel/flights", self.outbound_page)
+        app.router.add_get("/travel/flights/search", self.return_page)
+        app.router.add_get("/travel/flights/booking", self.booking_page)
+        return app
+
+    @web.middleware
+    async def _latency(self, request, handler):
+        self.requests += 1
+        if self.latency_ms:
+            await asyncio.sleep(self.latency_ms / 1000)
+        return await handler(request)
+
+    def _page(self, title: str, cards: List[str], next_url: str) -> web.Response:
+        html = PAGE_TEMPLATE.format(
+            title=title,
+            cards=json.dumps(cards),
+            next=json.dumps(next_url),
+            click_delay=self.click_delay_ms,
+            render_delay=self.render_delay_ms,
+        )
+        return web.Response(text=html, content_type="text/html")
+
+    async def outbound_page(self, request: web.Request) -> web.Response:
+        cards = [render_card_text(f, "JFK\u2013SRQ") for f in self.outbound]
+        return self._page("Outbound flights", cards, "/travel/flights/search?tfs=out")
+
+    async def return_page(self, request: web.Request) -> web.Response:
+        outbound = request.query.get("tfs", "out0")
+        cards = [render_card_text(f, "SRQ\u2013JFK") for f in self.returns]
+        return self._page("Return flights", cards, f"/travel/flights/booking?tfs={outbound}-ret")
+
+    async def booking_page(self, request: web.Request) -> web.Response:
+        summary = request.query.get("tfs", "")
+        return web.Response(text=BOOKING_TEMPLATE.format(summary=summary), content_type="text/html")
+
+    # --- In-process lifecycle (for benchmarks and tests) ---
+    async def start(self, host: str = "127.0.0.1", port: int = 0) -> str:
+        self._runner = web.AppRunner(self.app())
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, host, port)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        self.base_url = f"http://{host}:{port}/travel/flights"
+        return self.base_url
+
+    async def stop(self) -> None:
+        if self._runner:
+            await self._runner.cleanup()
+            self._runner = None
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Offline Google Flights stand-in")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency-ms", type=int, default=0)
+    parser.add_argument("--render-delay-ms", type=int, default=0)
+    parser.add_argument("--click-delay-ms", type=int, default=0)
+    parser.add_argument("--cards", type=int, default=None)
+    args = parser.parse_args()
+
+    server = FakeFlightsServer(args.latency_ms, args.render_delay_ms, args.click_delay_ms, args.cards)
+    print(f"🛫 Fake Google Flights on http://127.0.0.1:{args.port}/travel/flights")
+    web.run_app(server.app(), host="127.0.0.1", port=args.port)
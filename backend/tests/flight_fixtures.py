@@ -0,0 +1,18 @@
+from src.state import FlightOption
+
+# Shared by the tests that need FlightOptions but no real scrape.
+
+DEFAULTS = {
+    "flight_number": "N/A",
+    "departure_city": "JFK",
+    "arrival_city": "SRQ",
+    "departure_time": "8:00 AM",
+    "arrival_time": "11:00 AM",
+    "duration": "3 hr",
+    "stops": "Nonstop",
+    "booking_link": "https://example.test/search",
+}
+
+def make_flight(airline: str = "Delta", price: float = 300.0, **fields) -> FlightOption:
+    """A non-stop JFK -> SRQ option; any other field can be passed to override it."""
+    return FlightOption(airline=airline, price=price, **{**DEFAULTS, **fields})
@@ -0,0 +1,354 @@
+import argparse
+import asyncio
+import json
+import statistics
+import sys
+import os
+import tempfile
+import time
+import uuid
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from typing import Annotated, Any, Dict, List, Optional, Tuple
+
+# Add project root to path so we can import src
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+os.environ.setdefault("GOOGLE_API_KEY", "test-key")  # the real model is never called
+
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, HumanMessage, ToolMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+from langchain_core.tools import tool
+from langgraph.prebuilt import InjectedState
+
+import main
+from src import agent
+from src.admission import admission_stats, chat_limiter, llm_limiter
+from src.checkpointer import create_checkpointer
+from src.config import Config
+from src.state import FlightOption
+from src.tools.encoding import OUTBOUND_PREFIX, RETURN_PREFIX
+from src.tools.flight_search import _as_tool_result, _resolve_option
+from bench_tools import percentile
+
+# ------------------------------------------------------------------
+# /chat LOAD TEST (offline)
+# ------------------------------------------------------------------
+# Runs the FastAPI app in-process, with a scripted stand-in for Gemini and stub
+# flight tools, fires N concurrent SSE sessions at /chat and reports throughput,
+# time to first event, p50/p95/p99 completion and peak RSS.
+#
+#   python tests/load_chat.py --sessions 50 --llm-latency-ms 300 --tool-latency-ms 2000
+
+TRIP = {"origin": "JFK", "destination": "SRQ", "depart_date": "2026-03-10", "return_date": "2026-03-16"}
+
+# The tool calls of one booking turn, in order; then the final reply
+SCRIPT = [
+    ("search_outbound_flights", TRIP),
+    ("search_return_flights", {"option_id": "O1"}),
+    ("generate_booking_link", {"option_id": "R1"}),
+]
+
+ITINERARY = {
+    "intro": "I found a great nonstop round-trip option.",
+    "outbound": {"airline": "JetBlue", "date": "March 10, 2026", "departure": "12:29 PM (JFK)", "arrival": "3:43 PM (SRQ)", "duration": "3 hr 14 min", "stops": "Nonstop"},
+    "return": {"airline": "Delta", "date": "March 16, 2026", "departure": "5:35 PM (SRQ)", "arrival": "8:29 PM (JFK)", "duration": "2 hr 54 min", "stops": "Nonstop"},
+    "total_price": "$348.00",
+    "booking_link": "https://www.google.com/travel/flights/booking?tfs=abc",
+}
+REPLY = "```json\n" + json.dumps(ITINERARY, indent=2) + "\n```"
+
+SEARCH_URL = "https://www.google.com/travel/flights/search?tfs=load"
+
+def _flight(airline: str, departure_city: str, arrival_city: str, departure_time: str, arrival_time: str, duration: str, price: float) -> FlightOption:
+    return FlightOption(
+        airline=airline, flight_number="N/A", departure_city=departure_city, arrival_city=arrival_city,
+        departure_time=departure_time, arrival_time=arrival_time, duration=duration, stops="Nonstop",
+        price=price, booking_link=SEARCH_URL,
+    )
+
+OUTBOUND_FLIGHTS = [
+    _flight("Delta", "JFK", "SRQ", "8:00 AM", "11:05 AM", "3 hr 5 min", 198.0),
+    _flight("JetBlue", "JFK", "SRQ", "12:29 PM", "3:43 PM", "3 hr 14 min", 172.0),
+]
+RETURN_FLIGHTS = [_flight("Delta", "Dest", "Origin", "5:35 PM", "8:29 PM", "2 hr 54 min", 348.0)]
+
+
+class ScriptedChatModel(BaseChatModel):
+    """
+    Stands in for ChatGoogleGenerativeAI: after `latency` seconds, replies with
+    the next tool call of SCRIPT (counted from the last user message), then
+    with the itinerary. Streams the reply in `chunk_size` pieces.
+    """
+    latency: float = 0.0
+    chunk_size: int = 16
+
+    @property
+    def _llm_type(self) -> str:
+        return "scripted"
+
+    def _reply(self, messages: list) -> AIMessage:
+        step = 0
+        for message in reversed(messages):
+            if isinstance(message, HumanMessage):
+                break
+            step += isinstance(message, ToolMessage)
+        if step < len(SCRIPT):
+            name, args = SCRIPT[step]
+            return AIMessage(content="", tool_calls=[{"name": name, "args": args, "id": f"call-{uuid.uuid4().hex[:12]}", "type": "tool_call"}])
+        return AIMessage(content=REPLY)
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        time.sleep(self.latency)
+        return ChatResult(generations=[ChatGeneration(message=self._reply(messages))])
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        await asyncio.sleep(self.latency)
+        return ChatResult(generations=[ChatGeneration(message=self._reply(messages))])
+
+    async def _astream(self, messages, stop=None, run_manager=None, **kwargs):
+        await asyncio.sleep(self.latency)
+        reply = self._reply(messages)
+        if reply.tool_calls:
+            call = reply.tool_calls[0]
+            chunks = [AIMessageChunk(content="", tool_call_chunks=[
+                {"name": call["name"], "args": json.dumps(call["args"]), "id": call["id"], "index": 0, "type": "tool_call_chunk"}])]
+        else:
+            chunks = [AIMessageChunk(content=REPLY[start:start + self.chunk_size]) for start in range(0, len(REPLY), self.chunk_size)]
+        for chunk in chunks:
+            generation = ChatGenerationChunk(message=chunk)
+            if run_manager:
+                await run_manager.on_llm_new_token(chunk.content, chunk=generation)
+            yield generation
+
+
+def _pick(state: dict, option_id: str, tool_name: str, prefix: str) -> FlightOption:
+    chosen = _resolve_option(state, option_id, tool_name, prefix)
+    if chosen is None:
+        raise LookupError(f"option_id {option_id!r} not in the {tool_name} artifact")  # fails the turn
+    return chosen
+
+
+def stub_tools(latency: float) -> list:
+    """
+    The three booking tools, under their real names, each answering after `latency`
+    seconds. Results are encoded like the real ones (table + FlightOption artifact),
+    and option ids are resolved from the graph state, so the select node and the
+    option-id path run as in production.
+    """
+    @tool(response_format="content_and_artifact")
+    async def search_outbound_flights(origin: str, destination: str, depart_date: str, return_date: str) -> Tuple[str, List[FlightOption]]:
+        """Stub outbound search."""
+        await asyncio.sleep(latency)
+        return _as_tool_result(OUTBOUND_FLIGHTS, OUTBOUND_PREFIX, "search_return_flights")
+
+    @tool(response_format="content_and_artifact")
+    async def search_return_flights(option_id: str, state: Annotated[dict, InjectedState]) -> Tuple[str, List[FlightOption]]:
+        """Stub return search."""
+        _pick(state, option_id, "search_outbound_flights", OUTBOUND_PREFIX)
+        await asyncio.sleep(latency)
+        return _as_tool_result(RETURN_FLIGHTS, RETURN_PREFIX, "generate_booking_link")
+
+    @tool
+    async def generate_booking_link(option_id: str, state: Annotated[dict, InjectedState]) -> str:
+        """Stub booking link."""
+        _pick(state, option_id, "search_return_flights", RETURN_PREFIX)
+        await asyncio.sleep(latency)
+        return ITINERARY["booking_link"]
+
+    return [search_outbound_flights, search_return_flights, generate_booking_link]
+
+
+@asynccontextmanager
+async def stubbed_agent(llm_latency: float, tool_latency: float, checkpointer: str = "memory"):
+    """
+    The real graph (memory -> agent -> tools -> select) built with the stand-ins
+    and served by `main.app`; everything is put back on exit.
+    """
+    saved = (dict(agent._built), agent.tools, main.compiled_graph, Config.CHECKPOINT_SQLITE_PATH)
+    with tempfile.TemporaryDirectory() as tmp:
+        Config.CHECKPOINT_SQLITE_PATH = os.path.join(tmp, "checkpoints.sqlite")
+        model = ScriptedChatModel(latency=llm_latency)
+        agent._built.update({"llm": model, "llm_with_tools": model})
+        agent.tools = stub_tools(tool_latency)
+        agent._built["checkpointer"] = create_checkpointer(checkpointer)
+        agent.checkpointer.start()
+        main.compiled_graph = agent.create_agent()
+        try:
+            yield main.compiled_graph
+        finally:
+            await agent.checkpointer.stop()
+            built, agent.tools, main.compiled_graph, Config.CHECKPOINT_SQLITE_PATH = saved
+            agent._built.clear()
+            agent._built.update(built)
+
+# ------------------------------------------------------------------
+# ONE SSE SESSION
+# ------------------------------------------------------------------
+
+
+@dataclass
+class Turn:
+    status: Optional[int] = None
+    first_event: Optional[float] = None  # seconds from the request to the first SSE event
+    seconds: float = 0.0                 # ... to the end of the stream
+    events: List[dict] = field(default_factory=list)
+
+    @property
+    def completed(self) -> bool:
+        return self.status == 200 and bool(self.events) and self.events[-1]["type"] == "message" and isinstance(self.events[-1]["content"], dict)
+
+    @property
+    def rejected(self) -> bool:
+        """Shed by admission control: a 503 up front, or a busy error once the stream had started."""
+        return self.status == 503 or (bool(self.events) and "retry_after" in self.events[-1])
+
+
+async def chat_turn(thread_id: str, message: str, stream_tokens: bool = False) -> Turn:
+    """POSTs one message to /chat straight through the ASGI app, timing every SSE event."""
+    body = json.dumps({"message": message, "thread_id": thread_id, "stream_tokens": stream_tokens}).encode()
+    requests = [{"type": "http.request", "body": body, "more_body": False}]
+    done = asyncio.Event()
+    turn = Turn()
+    start = time.perf_counter()
+
+    async def receive():
+        if requests:
+            return requests.pop()
+        await done.wait()  # the client stays until the stream ends
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            turn.status = message["status"]
+        elif message["type"] == "http.response.body":
+            chunk = message.get("body", b"").decode()
+            if chunk.startswith("data: ") and turn.first_event is None:
+                turn.first_event = time.perf_counter() - start
+            turn.events.extend(json.loads(line[6:]) for line in chunk.splitlines() if line.startswith("data: "))
+            if not message.get("more_body"):
+                done.set()
+
+    # What uvicorn sends for a POST /chat
+    scope = {
+        "type": "http", "asgi": {"version": "3.0", "spec_version": "2.3"}, "http_version": "1.1",
+        "method": "POST", "scheme": "http", "path": "/chat", "raw_path": b"/chat", "root_path": "",
+        "query_string": b"", "headers": [(b"content-type", b"application/json")],
+        "client": ("load", 1), "server": ("load", 80),
+    }
+    await main.app(scope, receive, send)
+    turn.seconds = time.perf_counter() - start
+    return turn
+
+
+async def run_session(session: int, turns: int, stream_tokens: bool) -> List[Turn]:
+    """One conversation: `turns` bookings in a row on its own thread."""
+    results = []
+    for _ in range(turns):
+        results.append(await chat_turn(f"load-{session}", "Round trip JFK to SRQ, March 10 to 16", stream_tokens))
+    return results
+
+# ------------------------------------------------------------------
+# THE LOAD RUN
+# ------------------------------------------------------------------
+
+
+def rss_mb() -> float:
+    """Resident memory of this process now; the peak so far where /proc is missing."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+    except OSError:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / 2**20 if sys.platform == "darwin" else peak / 2**10  # bytes on macOS, KiB elsewhere
+
+
+async def _sample_rss(peak: List[float], interval: float = 0.05) -> None:
+    while True:
+        peak[0] = max(peak[0], rss_mb())
+        await asyncio.sleep(interval)
+
+
+def _spread(samples: List[float]) -> Dict[str, float]:
+    if not samples:
+        return {"p50": 0.0, "p95": 0.0, "p99": 0.0}
+    return {"p50": round(statistics.median(samples), 4), "p95": round(percentile(samples, 95), 4), "p99": round(percentile(samples, 99), 4)}
+
+
+async def run_load(sessions: int, turns: int = 1, llm_latency: float = 0.0, tool_latency: float = 0.0,
+                   stream_tokens: bool = False, checkpointer: str = "memory") -> Dict[str, Any]:
+    """Fires `sessions` concurrent conversations at /chat and sums them up."""
+    async with stubbed_agent(llm_latency, tool_latency, checkpointer):
+        start_rss = rss_mb()
+        peak = [start_rss]
+        sampler = asyncio.create_task(_sample_rss(peak))
+        start = time.perf_counter()
+        try:
+            results = await asyncio.gather(*(run_session(n, turns, stream_tokens) for n in range(sessions)))
+        finally:
+            sampler.cancel()
+        seconds = time.perf_counter() - start
+        peak[0] = max(peak[0], rss_mb())
+
+    all_turns = [turn for session in results for turn in session]
+    completed = [turn for turn in all_turns if turn.completed]
+    return {
+        "sessions": sessions,
+        "turns": len(all_turns),
+        "completed": len(completed),
+        "rejected": sum(turn.rejected for turn in all_turns),
+        "failed": sum(not turn.completed and not turn.rejected for turn in all_turns),
+        "seconds": round(seconds, 3),
+        "turns_per_second": round(len(completed) / seconds, 2),
+        "events_per_second": round(sum(len(turn.events) for turn in all_turns) / seconds, 1),
+        "first_event_seconds": _spread([turn.first_event for turn in completed]),
+        "completion_seconds": _spread([turn.seconds for turn in completed]),
+        "rss_mb": {"start": round(start_rss, 1), "peak": round(peak[0], 1)},
+        "admission": admission_stats(),
+    }
+
+
+def print_report(report: Dict[str, Any]) -> None:
+    print(f"\n{report['sessions']} sessions, {report['turns']} turns in {report['seconds']:.2f}s: "
+          f"{report['completed']} completed, {report['rejected']} rejected (busy), {report['failed']} failed")
+    print(f"Throughput: {report['turns_per_second']} turns/s, {report['events_per_second']} SSE events/s\n")
+    header = f"{'':<22}{'p50 (s)':>9}{'p95 (s)':>9}{'p99 (s)':>9}"
+    print(header)
+    print("-" * len(header))
+    for label, key in (("time to first event", "first_event_seconds"), ("completion", "completion_seconds")):
+        spread = report[key]
+        print(f"{label:<22}{spread['p50']:>9.3f}{spread['p95']:>9.3f}{spread['p99']:>9.3f}")
+    print(f"\nRSS: {report['rss_mb']['start']} MB at start, {report['rss_mb']['peak']} MB peak")
+    for name, stats in report["admission"].items():
+        print(f"   {name}: capacity {stats['capacity']}, admitted {stats['admitted']}, "
+              f"rejected {stats['rejected']}, avg wait {stats['avg_wait_seconds']}s")
+
+
+async def main_async(args) -> None:
+    chat_limiter.capacity = args.chat_concurrency
+    chat_limiter.max_queue = args.max_queue
+    llm_limiter.capacity = args.llm_concurrency
+    print(f"🧪 {args.sessions} concurrent sessions x {args.turns} turns, LLM {args.llm_latency_ms} ms, "
+          f"tools {args.tool_latency_ms} ms, {args.checkpointer} checkpointer")
+    report = await run_load(args.sessions, args.turns, args.llm_latency_ms / 1000, args.tool_latency_ms / 1000,
+                            args.stream_tokens, args.checkpointer)
+    print_report(report)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Concurrent SSE sessions against /chat with a stub LLM and stub tools")
+    parser.add_argument("--sessions", type=int, default=20)
+    parser.add_argument("--turns", type=int, default=1, help="bookings per session, one after the other")
+    parser.add_argument("--llm-latency-ms", type=int, default=300, help="delay of every LLM call")
+    parser.add_argument("--tool-latency-ms", type=int, default=1000, help="delay of every tool call")
+    parser.add_argument("--stream-tokens", action="store_true", help="ask for token and partial events too")
+    parser.add_argument("--checkpointer", choices=["memory", "sqlite"], default="memory", help="sqlite uses a temporary file")
+    parser.add_argument("--chat-concurrency", type=int, default=Config.CHAT_MAX_CONCURRENT)
+    parser.add_argument("--max-queue", type=int, default=Config.CHAT_MAX_QUEUE)
+    parser.add_argument("--llm-concurrency", type=int, default=Config.LLM_MAX_CONCURRENT)
+    parser.add_argument("--json", help="also write the report to this file")
+    asyncio.run(main_async(parser.parse_args()))
@@ -0,0 +1,100 @@
+import asyncio
+import json
+import sys
+import os
+
+# Add project root to path so we can import src
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+os.environ.setdefault("GOOGLE_API_KEY", "test-key")  # the agent module builds its LLM client on import
+
+import httpx
+import pytest
+from langchain_core.messages import AIMessage
+from langgraph.graph import StateGraph
+
+import main
+from src.admission import FairLimiter, Overloaded
+from src.state import AgentState
+
+def test_waiters_are_served_round_robin_per_thread():
+    async def run():
+        limiter = FairLimiter("test", capacity=1)
+        served = []
+
+        async def work(key: str, name: str):
+            async with limiter.slot(key):
+                served.append(name)
+                await asyncio.sleep(0.01)
+
+        # Thread "a" sends three requests before "b" sends one
+        tasks = [asyncio.create_task(work("a", "a1"))]
+        await asyncio.sleep(0)
+        tasks += [asyncio.create_task(work("a", name)) for name in ("a2", "a3")]
+        await asyncio.sleep(0)
+        tasks.append(asyncio.create_task(work("b", "b1")))
+        await asyncio.sleep(0)
+        positions = [(ticket.key, ticket.position) for ticket in limiter._order()]
+        await asyncio.gather(*tasks)
+        return served, positions, limiter.stats()
+
+    served, positions, stats = asyncio.run(run())
+    assert served == ["a1", "a2", "b1", "a3"]
+    # "b" does not wait behind all of "a"'s backlog
+    assert positions == [("a", 1), ("b", 2), ("a", 3)]
+    assert stats["admitted"] == 4 and stats["active"] == 0 and stats["waiting"] == 0
+
+def test_full_queue_is_refused_and_cancelled_waiters_leave():
+    async def run():
+        limiter = FairLimiter("test", capacity=1, max_queue=1)
+        running = limiter.enqueue("a")
+        waiting = asyncio.create_task(limiter.slot("b").__aenter__())
+        await asyncio.sleep(0)
+        with pytest.raises(Overloaded):
+            limiter.enqueue("c")
+        waiting.cancel()
+        await asyncio.gather(waiting, return_exceptions=True)
+        late = limiter.enqueue("c")  # room again
+        running.release()
+        return late.admitted, limiter.stats()
+
+    admitted, stats = asyncio.run(run())
+    assert admitted
+    assert stats["rejected"] == 1 and stats["waiting"] == 0
+
+def test_chat_queues_then_sheds_load(monkeypatch):
+    limiter = FairLimiter("chat", capacity=1, max_queue=1)
+    monkeypatch.setattr(main, "chat_limiter", limiter)
+
+    async def run():
+        gate = asyncio.Event()
+
+        async def agent(state: AgentState):
+            await gate.wait()
+            return {"messages": [AIMessage(content="done")]}
+
+        workflow = StateGraph(AgentState)
+        workflow.add_node("agent", agent)
+        workflow.set_entry_point("agent")
+        workflow.set_finish_point("agent")
+        monkeypatch.setattr(main, "compiled_graph", workflow.compile())
+
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=main.app), base_url="http://test") as client:
+            def chat(thread_id: str):
+                return asyncio.create_task(client.post("/chat", json={"message": "hi", "thread_id": thread_id}))
+
+            first = chat("t1")
+            while limiter.active == 0:
+                await asyncio.sleep(0.01)
+            second = chat("t2")
+            while limiter.waiting == 0:
+                await asyncio.sleep(0.01)
+            rejected = await client.post("/chat", json={"message": "hi", "thread_id": "t3"})
+            gate.set()
+            return await first, await second, rejected
+
+    first, second, rejected = asyncio.run(run())
+    events = lambda response: [json.loads(line[6:]) for line in response.text.splitlines() if line.startswith("data: ")]
+    assert events(first) == [{"type": "message", "content": "done"}]
+    assert events(second) == [{"type": "queued", "position": 1, "resource": "chat"}, {"type": "message", "content": "done"}]
+    assert rejected.status_code == 503 and rejected.headers["retry-after"] == "5"
+    assert limiter.active == 0
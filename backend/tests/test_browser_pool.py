@@ -0,0 +1,131 @@
+import asyncio
+import sys
+import os
+
+# Add project root to path so we can import src
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import pytest
+
+from src.config import Config
+from src.tools.browser_pool import BrowserPool
+
+# A stand-in for Playwright: browsers that can crash, contexts that record their closing
+class FakeContext:
+    def __init__(self, browser):
+        self.browser = browser
+        self.closed = False
+
+    async def new_page(self):
+        return object()
+
+    async def close(self):
+        self.closed = True
+
+class FakeBrowser:
+    def __init__(self, number: int):
+        self.number = number
+        self.connected = True
+        self.fail_next_context = False
+
+    def is_connected(self) -> bool:
+        return self.connected
+
+    async def new_context(self, user_agent=None):
+        if self.fail_next_context:
+            self.fail_next_context = False
+            raise RuntimeError("Target closed")
+        return FakeContext(self)
+
+    async def close(self):
+        self.connected = False
+
+class FakePlaywright:
+    def __init__(self, launched: list):
+        self.launched = launched
+        self.stopped = False
+        self.chromium = self
+
+    async def launch(self, headless=None, args=None):
+        browser = FakeBrowser(len(self.launched))
+        self.launched.append(browser)
+        return browser
+
+    async def start(self):
+        return self
+
+    async def stop(self):
+        self.stopped = True
+
+@pytest.fixture
+def playwright(monkeypatch):
+    """Every Playwright driver started, and every browser launched, in order."""
+    drivers, launched = [], []
+
+    def async_playwright():
+        drivers.append(FakePlaywright(launched))
+        return drivers[-1]
+
+    monkeypatch.setattr("playwright.async_api.async_playwright", async_playwright)
+    monkeypatch.setattr(Config, "BROWSER_POOL_ENABLED", True)
+    return drivers, launched
+
+def test_contexts_spread_over_warm_browsers(playwright):
+    drivers, launched = playwright
+
+    async def run():
+        pool = BrowserPool(size=2)
+        await pool.start()
+        await pool.start()  # already running
+        contexts = [await pool.new_context() for _ in range(4)]
+        loads = [b.active_contexts for b in pool._browsers]
+        await pool.release_context(contexts[0])
+        after_release = [b.active_contexts for b in pool._browsers]
+        await pool.stop()
+        return contexts, loads, after_release
+
+    contexts, loads, after_release = asyncio.run(run())
+    assert len(drivers) == 1 and len(launched) == 2  # launched once, shared by every context
+    assert loads == [2, 2]
+    assert sorted(after_release) == [1, 2]
+    assert contexts[0].closed and not contexts[1].closed
+    assert drivers[0].stopped and not any(b.connected for b in launched)
+
+def test_dead_browsers_are_replaced(playwright, monkeypatch):
+    monkeypatch.setattr(Config, "BROWSER_HEALTH_CHECK_INTERVAL", 0.01)
+    drivers, launched = playwright
+
+    async def run():
+        pool = BrowserPool(size=1)
+        await pool.start()
+        launched[0].connected = False  # Chromium crashed
+        await asyncio.sleep(0.05)      # the health loop notices
+        relaunched = pool._browsers[0].browser
+
+        relaunched.fail_next_context = True  # dies between the health check and the lease
+        context = await pool.new_context()
+        await pool.stop()
+        return relaunched, context
+
+    relaunched, context = asyncio.run(run())
+    assert relaunched is launched[1]
+    assert context.browser is launched[2]  # relaunched once more and the lease retried
+    assert len(launched) == 3
+
+@pytest.mark.parametrize("size, enabled", [(0, True), (2, False)])
+def test_empty_or_disabled_pool_falls_back_to_a_browser_per_context(playwright, monkeypatch, size, enabled):
+    monkeypatch.setattr(Config, "BROWSER_POOL_SIZE", size)
+    monkeypatch.setattr(Config, "BROWSER_POOL_ENABLED", enabled)
+    drivers, launched = playwright
+
+    async def run():
+        pool = BrowserPool()
+        await pool.start()  # nothing to pool
+        async with pool.page():
+            during = [b.connected for b in launched]
+        return pool, during
+
+    pool, during = asyncio.run(run())
+    assert not pool.started
+    assert during == [True] and len(drivers) == 1
+    assert not launched[0].connected and drivers[0].stopped  # closed with its context
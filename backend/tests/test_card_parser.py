@@ -0,0 +1,54 @@
+import sys
+import os
+
+# Add project root to path so we can import src
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import pytest
+
+from src.tools.airlines import AIRLINE_NAMES
+from src.tools.card_parser import AirlineMatcher, normalize_text, parse_card
+from card_fixtures import saved_card_texts
+
+CARDS = saved_card_texts()
+
+@pytest.mark.parametrize("text, expected", CARDS)
+def test_parses_saved_cards(text, expected):
+    record = parse_card(text)
+    assert record["airline"] == expected["Airline"]
+    assert record["price"] == float((expected.get("Est. Price") or expected["Total Price"]).lstrip("$"))
+    assert normalize_text(record["dep_time"]) == normalize_text(expected["Depart"])
+    assert normalize_text(record["arr_time"]) == normalize_text(expected["Arrive"])
+    assert record["duration"] == expected["Duration"]
+    assert record["stops"] == expected["Stops"]
+
+def test_separators_become_plain_spaces():
+    record = parse_card("9:05\u202fAM \u2013 1:10\u202fPMDelta4\u00a0hr\u00a05\u00a0minNonstop$1,204")
+    assert record["dep_time"] == "9:05 AM"
+    assert record["arr_time"] == "1:10 PM"
+    assert record["duration"] == "4 hr 5 min"
+    assert record["price"] == 1204.0
+
+def test_non_flight_cards_are_skipped():
+    assert parse_card("") is None
+    assert parse_card("Sort by: Top flights") is None
+
+def test_unknown_airline_falls_back_to_first_line():
+    record = parse_card("\n  Tiny Air  \n10:00 AM – 11:00 AM1 hrNonstop$99")
+    assert record["airline"] == "Tiny Air"
+
+def test_matcher_keeps_table_priority():
+    # "Delta" comes before "KLM" in the table, whatever the order in the text
+    assert parse_card("KLM, Delta 8:00 AM – 9:00 PM$500")["airline"] == "Delta"
+
+def test_matcher_keeps_table_priority_past_the_usual_carriers():
+    tail = AIRLINE_NAMES[20], AIRLINE_NAMES[50]
+    assert AirlineMatcher(AIRLINE_NAMES).match(f"{tail[1]} / {tail[0]} 8:00 AM$500") == tail[0]
+    # A longer name hides a shorter one inside it from the regex; its rank still counts
+    assert AirlineMatcher(["Delta", "Air", "Air France"], head=1).match("Air France 8:00 AM$500") == "Air"
+
+@pytest.mark.parametrize("name", AIRLINE_NAMES)
+def test_matcher_agrees_with_linear_scan(name):
+    text = f"6:00 AM – 9:00 AM{name}3 hr$300"
+    linear = next(n for n in AIRLINE_NAMES if n in text)
+    assert AirlineMatcher(AIRLINE_NAMES).match(text) == linear
@@ -0,0 +1,62 @@
+import sys
+import os
+import timeit
+
+# Add project root to path so we can import src
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import pytest
+
+pytest.importorskip("pytest_benchmark")
+
+from src.tools.airlines import AIRLINE_NAMES
+from src.tools.card_parser import AIRLINE_MATCHER, parse_card
+from card_fixtures import saved_card_texts
+
+# Run with: python -m pytest tests/test_card_parser_benchmark.py --benchmark-only
+TEXTS = [text for text, _ in saved_card_texts()]
+
+def _page_of(n_cards):
+    return [TEXTS[i % len(TEXTS)] for i in range(n_cards)]
+
+@pytest.mark.parametrize("n_cards", [10, 100, 1000])
+def test_parse_page_throughput(benchmark, n_cards):
+    page = _page_of(n_cards)
+    records = benchmark(lambda: [parse_card(text) for text in page])
+    assert len(records) == n_cards and all(records)
+
+def _linear_scan(page):
+    # The old `for name in COMMON_AIRLINES: if name in text` loop, over the full table
+    return [next((n for n in AIRLINE_NAMES if n in text), None) for text in page]
+
+def _assert_matches_linear_scan(request, page):
+    """
+    The matcher must agree with the loop it replaced. Under --benchmark-only it
+    must also not be slower; wall-clock timing is too noisy for the normal suite.
+    """
+    assert [AIRLINE_MATCHER.match(text) for text in page] == _linear_scan(page)
+    if not request.config.getoption("benchmark_only"):
+        return
+    def best(run):
+        return min(timeit.repeat(run, number=20, repeat=5))
+    matcher = best(lambda: [AIRLINE_MATCHER.match(text) for text in page])
+    assert matcher <= best(lambda: _linear_scan(page))
+
+def test_airline_matcher(benchmark, request):
+    page = _page_of(100)
+    benchmark(lambda: [AIRLINE_MATCHER.match(text) for text in page])
+    _assert_matches_linear_scan(request, page)
+
+def test_airline_linear_scan_baseline(benchmark):
+    page = _page_of(100)
+    benchmark(lambda: _linear_scan(page))
+
+# Worst case: a regional carrier missing from the table, so every name is tried.
+UNKNOWN = [text.replace("JetBlue", "Tiny Air").replace("Delta", "Tiny Air").replace("American", "Tiny Air") for text in _page_of(100)]
+
+def test_unknown_airline_matcher(benchmark, request):
+    benchmark(lambda: [AIRLINE_MATCHER.match(text) for text in UNKNOWN])
+    _assert_matches_linear_scan(request, UNKNOWN)
+
+def test_unknown_airline_linear_scan_baseline(benchmark):
+    benchmark(lambda: _linear_scan(UNKNOWN))
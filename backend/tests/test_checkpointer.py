@@ -0,0 +1,152 @@
+import asyncio
+import sys
+import os
+
+import pytest
+
+# Add project root to path so we can import src
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
+from langgraph.checkpoint.memory import MemorySaver
+from langgraph.graph import StateGraph
+
+from src.checkpointer import EvictingCheckpointer, EvictingMemorySaver, EvictingSqliteSaver, create_checkpointer
+from src.config import Config
+from src.state import AgentState, FlightOption
+
+FLIGHT = FlightOption(
+    airline="Delta", flight_number="N/A", departure_city="JFK", arrival_city="SRQ",
+    departure_time="8:00 AM", arrival_time="11:00 AM", price=250.0, duration="3 hr", stops="Nonstop",
+)
+
+def _graph(checkpointer):
+    """Two nodes, so every run writes several checkpoints, like the real agent."""
+    async def search(state: AgentState):
+        return {"messages": [ToolMessage(content="O1|Delta", tool_call_id="c1", name="search_outbound_flights", artifact=[FLIGHT])]}
+
+    async def answer(state: AgentState):
+        return {"messages": [AIMessage(content="done")], "selected_outbound_flight": FLIGHT}
+
+    workflow = StateGraph(AgentState)
+    workflow.add_node("search", search)
+    workflow.add_node("answer", answer)
+    workflow.set_entry_point("search")
+    workflow.add_edge("search", "answer")
+    workflow.set_finish_point("answer")
+    return workflow.compile(checkpointer=checkpointer)
+
+async def _chat(graph, thread_id: str, turns: int = 1):
+    config = {"configurable": {"thread_id": thread_id}}
+    for turn in range(turns):
+        await graph.ainvoke({"messages": [HumanMessage(content=f"turn {turn}")]}, config)
+    return await graph.aget_state(config)
+
+@pytest.fixture(params=["memory", "sqlite"])
+def backend(request, tmp_path, monkeypatch):
+    monkeypatch.setattr(Config, "CHECKPOINT_SQLITE_PATH", str(tmp_path / "checkpoints.sqlite"))
+    return request.param
+
+def test_state_round_trips(backend):
+    async def run():
+        checkpointer = create_checkpointer(backend)
+        state = await _chat(_graph(checkpointer), "t1", turns=2)
+        await checkpointer.stop()
+        return state
+
+    state = asyncio.run(run())
+    assert len(state.values["messages"]) == 6
+    assert state.values["selected_outbound_flight"] == FLIGHT
+    # Artifacts inside messages come back as plain dicts; the tools re-validate them
+    assert [FlightOption.model_validate(f) for f in state.values["messages"][1].artifact] == [FLIGHT]
+
+def test_lru_limit_and_ttl(backend, monkeypatch):
+    monkeypatch.setattr(Config, "CHECKPOINT_MAX_THREADS", 2)
+
+    async def run():
+        checkpointer = create_checkpointer(backend)
+        graph = _graph(checkpointer)
+        for thread_id in ("a", "b", "c"):
+            await _chat(graph, thread_id)
+        lru = list(checkpointer._last_used)
+        gone = await graph.aget_state({"configurable": {"thread_id": "a"}})
+
+        monkeypatch.setattr(Config, "CHECKPOINT_THREAD_TTL", -1)
+        await checkpointer.evict_expired()
+        stats = await checkpointer.stats()
+        await checkpointer.stop()
+        return lru, gone, stats
+
+    lru, gone, stats = asyncio.run(run())
+    assert lru == ["b", "c"]
+    assert gone.values == {}
+    assert stats["threads"] == 0 and stats["checkpoints"] == 0
+    assert stats["evictions"] == 3
+
+def test_compaction_keeps_latest_state(backend, monkeypatch):
+    monkeypatch.setattr(Config, "CHECKPOINT_KEEP_PER_THREAD", 2)
+
+    async def run():
+        checkpointer = create_checkpointer(backend)
+        graph = _graph(checkpointer)
+        await _chat(graph, "t1", turns=3)
+        before = await checkpointer.stats()
+        await checkpointer.sweep()
+        after = await checkpointer.stats()
+        state = await _chat(graph, "t1")  # the thread carries on from the compacted state
+        await checkpointer.stop()
+        return before, after, state
+
+    before, after, state = asyncio.run(run())
+    assert before["checkpoints"] > 2
+    assert after["checkpoints"] == 2
+    assert after["compacted_checkpoints"] == before["checkpoints"] - 2
+    assert len(state.values["messages"]) == 12
+    if backend == "memory":
+        assert after["bytes"] < before["bytes"]
+
+def test_sqlite_survives_restart(tmp_path):
+    path = str(tmp_path / "restart.sqlite")
+
+    async def first_process():
+        checkpointer = EvictingSqliteSaver(path)
+        await _chat(_graph(checkpointer), "t1")
+        await checkpointer.stop()
+
+    async def second_process():
+        checkpointer = EvictingSqliteSaver(path)
+        state = await _chat(_graph(checkpointer), "t1")
+        stats = await checkpointer.stats()
+        await checkpointer.stop()
+        return state, stats
+
+    asyncio.run(first_process())
+    state, stats = asyncio.run(second_process())
+    assert len(state.values["messages"]) == 6
+    assert stats["threads"] == 1
+
+def test_sqlite_serves_sync_calls_through_its_loop(tmp_path):
+    async def run():
+        checkpointer = EvictingSqliteSaver(str(tmp_path / "threads.sqlite"))  # like the agent's, in the serving loop
+        state = await _chat(_graph(checkpointer), "t1")
+        # Sync calls from another thread go through the loop it was built in
+        config = {"configurable": {"thread_id": "t1"}}
+        from_thread = await asyncio.to_thread(checkpointer.get_tuple, config)
+        await checkpointer.stop()
+        return state, from_thread
+
+    state, from_thread = asyncio.run(run())
+    assert len(state.values["messages"]) == 3
+    assert from_thread.checkpoint["id"] == state.config["configurable"]["checkpoint_id"]
+
+def test_backends_implement_compaction_and_sizes():
+    class Incomplete(EvictingCheckpointer, MemorySaver):
+        pass
+
+    with pytest.raises(TypeError):
+        Incomplete()
+
+def test_unknown_backend():
+    with pytest.raises(ValueError):
+        create_checkpointer("redis")
+    assert isinstance(create_checkpointer("memory"), EvictingMemorySaver)
@@ -0,0 +1,94 @@
+import asyncio
+import sys
+import os
+
+# Add project root to path so we can import src
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.config import Config
+from src.tools import flight_search
+from flight_fixtures import make_flight
+
+def test_date_matrix_builds_grid_and_ranks_cells(monkeypatch):
+    calls = []
+    running = 0
+    peak = 0
+
+    async def fake_pair(origin, destination, depart_date, return_date, thread_id):
+        nonlocal running, peak
+        calls.append((origin, depart_date, return_date, thread_id))
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.01)
+        running -= 1
+        if (depart_date, return_date) == ("2026-03-11", "2026-03-12"):
+            return []
+        # Cheaper the later you leave and the earlier you come back; EWR beats JFK
+        price = 500 - 10 * int(depart_date[-2:]) + int(return_date[-2:]) - (50 if origin == "EWR" else 0)
+        return [make_flight(price=price, departure_city=origin, booking_link=f"https://example.test/{origin}/{depart_date}")]
+
+    monkeypatch.setattr(flight_search, "_search_outbound_pair", fake_pair)
+    monkeypatch.setattr(Config, "DATE_MATRIX_CONCURRENCY", 3)
+
+    result = asyncio.run(flight_search.search_flexible_dates.ainvoke({
+        "type": "tool_call", "id": "call-1", "name": "search_flexible_dates",
+        "args": {"origin": "JFK, EWR", "destination": "SRQ", "depart_date": "2026-03-10", "return_date": "2026-03-11", "flex_days": 1},
+    })).artifact
+
+    assert result.depart_dates == ["2026-03-09", "2026-03-10", "2026-03-11"]
+    assert result.return_dates == ["2026-03-10", "2026-03-11", "2026-03-12"]
+    # Returns before departure are never searched
+    assert all(ret >= dep for _, dep, ret, _ in calls)
+    assert all(thread_id is None for *_, thread_id in calls)
+    assert len(calls) == 2 * 8
+    assert peak == 3
+
+    assert result.prices[2][0] is None      # 11th -> 10th: impossible
+    assert result.prices[2][2] is None      # searched, nothing found
+    assert result.prices[0][0] == 500 - 90 + 10 - 50
+
+    best = result.best_options[0]
+    assert (best.depart_date, best.return_date) == ("2026-03-11", "2026-03-11")
+    assert best.cheapest_flight.departure_city == "EWR"
+    assert [cell.cheapest_price for cell in result.best_options] == sorted(cell.cheapest_price for cell in result.best_options)
+
+def test_date_matrix_caps_flex_days(monkeypatch):
+    async def fake_pair(origin, destination, depart_date, return_date, thread_id):
+        return []
+
+    monkeypatch.setattr(flight_search, "_search_outbound_pair", fake_pair)
+    result = asyncio.run(flight_search.search_flexible_dates.ainvoke({
+        "type": "tool_call", "id": "call-1", "name": "search_flexible_dates",
+        "args": {"origin": "JFK", "destination": "SRQ", "depart_date": "2026-03-10", "return_date": "2026-03-20", "flex_days": 30},
+    })).artifact
+
+    assert len(result.depart_dates) == 2 * Config.DATE_MATRIX_MAX_FLEX_DAYS + 1
+    assert result.best_options == []
+
+def test_date_matrix_rejects_unreadable_dates(monkeypatch):
+    async def fake_pair(origin, destination, depart_date, return_date, thread_id):
+        raise AssertionError("nothing should be searched")
+
+    monkeypatch.setattr(flight_search, "_search_outbound_pair", fake_pair)
+    message = asyncio.run(flight_search.search_flexible_dates.ainvoke({
+        "type": "tool_call", "id": "call-1", "name": "search_flexible_dates",
+        "args": {"origin": "JFK", "destination": "SRQ", "depart_date": "March 10", "return_date": "2026-03-20"},
+    }))
+
+    assert message.content == "Error: dates must be YYYY-MM-DD."
+    assert message.artifact is None
+
+def test_date_matrix_keeps_the_cells_that_did_not_fail(monkeypatch):
+    async def fake_pair(origin, destination, depart_date, return_date, thread_id):
+        if depart_date == "2026-03-09":
+            raise RuntimeError("Scrape worker 0 died")
+        return [make_flight(departure_city=origin, booking_link=f"https://example.test/{origin}/{depart_date}")]
+
+    monkeypatch.setattr(flight_search, "_search_outbound_pair", fake_pair)
+    result = asyncio.run(flight_search.search_flexible_dates.ainvoke({
+        "type": "tool_call", "id": "call-1", "name": "search_flexible_dates",
+        "args": {"origin": "JFK", "destination": "SRQ", "depart_date": "2026-03-10", "return_date": "2026-03-20", "flex_days": 1},
+    })).artifact
+
+    assert result.prices[0] == [None, None, None]  # the failed departure date
+    assert all(price == 300.0 for row in result.prices[1:] for price in row)
@@ -0,0 +1,139 @@
+import asyncio
+import json
+import sys
+import os
+
+# Add project root to path so we can import src
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+os.environ.setdefault("GOOGLE_API_KEY", "test-key")  # the agent module builds its LLM client on import
+
+import pytest
+from langchain_core.language_models.fake_chat_models import GenericFakeChatModel
+from langchain_core.messages import AIMessage, ToolMessage
+from langchain_core.tools import tool
+from langgraph.graph import END, StateGraph
+from langgraph.prebuilt import ToolNode
+
+import main
+from src.agent import CANCELLED_TOOL_RESULT, should_continue
+from src.checkpointer import create_checkpointer
+from src.config import Config
+from src.state import AgentState
+from src.streaming import ClientDisconnected, until_disconnected
+from src.tools.sessions import session_registry
+
+def test_run_is_cancelled_once_the_client_is_gone(monkeypatch):
+    monkeypatch.setattr(Config, "DISCONNECT_POLL_INTERVAL", 0.02)
+    log = []
+    received = []
+
+    async def events():
+        yield "first"
+        try:
+            await asyncio.sleep(30)  # a long scrape
+        except asyncio.CancelledError:
+            log.append("cancelled")
+            raise
+
+    async def is_disconnected():
+        return bool(received)
+
+    async def on_abandoned():
+        log.append("cleaned up")
+
+    async def run():
+        with pytest.raises(ClientDisconnected):
+            async for event in until_disconnected(events(), is_disconnected, on_abandoned):
+                received.append(event)
+
+    asyncio.run(asyncio.wait_for(run(), 5))
+    assert received == ["first"]
+    assert log == ["cancelled", "cleaned up"]  # cleanup only once the run has stopped
+
+def test_finished_runs_are_not_cleaned_up():
+    async def events():
+        for n in range(3):
+            yield n
+
+    async def never():
+        return False
+
+    async def on_abandoned():
+        raise AssertionError("nothing was abandoned")
+
+    async def run():
+        return [event async for event in until_disconnected(events(), never, on_abandoned)]
+
+    assert asyncio.run(run()) == [0, 1, 2]
+
+CALL = AIMessage(content="", tool_calls=[{"name": "slow_search", "args": {"route": "JFK-SRQ"}, "id": "call-1", "type": "tool_call"}])
+
+def test_disconnect_mid_tool_cancels_and_repairs_the_checkpoint(monkeypatch):
+    monkeypatch.setattr(Config, "DISCONNECT_POLL_INTERVAL", 0.02)
+    log = []
+
+    @tool
+    async def slow_search(route: str) -> str:
+        """Searches flights for a route."""
+        try:
+            await asyncio.sleep(30)
+        except asyncio.CancelledError:
+            log.append("scrape cancelled")
+            raise
+        return "flights"
+
+    model = GenericFakeChatModel(messages=iter([CALL]))
+
+    async def agent(state: AgentState):
+        return {"messages": [await model.ainvoke(state["messages"])]}
+
+    workflow = StateGraph(AgentState)
+    workflow.add_node("agent", agent)
+    workflow.add_node("tools", ToolNode([slow_search]))
+    workflow.set_entry_point("agent")
+    workflow.add_conditional_edges("agent", should_continue)
+    workflow.add_edge("tools", END)
+    graph = workflow.compile(checkpointer=create_checkpointer("memory"))
+    monkeypatch.setattr(main, "compiled_graph", graph)
+
+    async def close_thread(thread_id):
+        log.append(f"closed {thread_id}")
+
+    monkeypatch.setattr(session_registry, "close_thread", close_thread)
+
+    async def run():
+        gone = asyncio.Event()
+        body = json.dumps({"message": "JFK to SRQ", "thread_id": "leaver"}).encode()
+        requests = [{"type": "http.request", "body": body, "more_body": False}]
+        sent = []
+
+        async def receive():
+            if requests:
+                return requests.pop()
+            await gone.wait()
+            return {"type": "http.disconnect"}
+
+        async def send(message):
+            sent.append(message)
+            if b'"type": "tool"' in message.get("body", b""):
+                gone.set()  # the user closes the tab while the search runs
+
+        # ASGI 2.4: Starlette leaves disconnect detection to the endpoint, which is what is tested here
+        scope = {
+            "type": "http", "asgi": {"version": "3.0", "spec_version": "2.4"}, "http_version": "1.1",
+            "method": "POST", "scheme": "http", "path": "/chat", "raw_path": b"/chat", "root_path": "",
+            "query_string": b"", "headers": [(b"content-type", b"application/json")],
+            "client": ("test", 1), "server": ("test", 80),
+        }
+        await asyncio.wait_for(main.app(scope, receive, send), 5)
+        snapshot = await graph.aget_state({"configurable": {"thread_id": "leaver"}})
+        return sent, snapshot.values["messages"]
+
+    sent, messages = asyncio.run(run())
+    assert sent[0]["status"] == 200
+    assert log == ["scrape cancelled", "closed leaver"]
+
+    # Every tool call has its result again, so the next turn can go to the LLM
+    last = messages[-1]
+    assert isinstance(last, ToolMessage) and last.tool_call_id == "call-1"
+    assert last.content == CANCELLED_TOOL_RESULT and last.status == "error"
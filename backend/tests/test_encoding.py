@@ -0,0 +1,114 @@
+import asyncio
+import json
+import re
+import sys
+import os
+
+# Add project root to path so we can import src
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from langchain_core.messages import AIMessage, ToolMessage
+from langchain_core.messages.utils import count_tokens_approximately
+from langgraph.graph import StateGraph
+from langgraph.prebuilt import ToolNode
+
+from card_fixtures import TESTS_DIR, load_saved_flights
+from src.state import AgentState, FlightOption
+from src.tools import flight_search
+from src.tools.encoding import OUTBOUND_PREFIX, RETURN_PREFIX, encode_flights, parse_option_id
+
+def _saved_url(filename: str) -> str:
+    with open(os.path.join(TESTS_DIR, filename), encoding="utf-8") as f:
+        return re.search(r"URL:\s+(\S+)", f.read()).group(1)
+
+def _options(filename: str, departure_city: str, arrival_city: str, count: int = 25):
+    """The saved results, padded (prices bumped) to a realistic list length."""
+    saved = load_saved_flights(filename)
+    url = _saved_url(filename)
+    options = []
+    for i in range(count):
+        flight = saved[i % len(saved)]
+        price = float((flight.get("Est. Price") or flight.get("Total Price")).lstrip("$")) + 10 * (i // len(saved))
+        options.append(FlightOption(
+            airline=flight["Airline"], flight_number="N/A", departure_city=departure_city, arrival_city=arrival_city,
+            departure_time=flight["Depart"], arrival_time=flight["Arrive"], price=price,
+            duration=flight["Duration"], stops=flight["Stops"], booking_link=url,
+        ))
+    return options
+
+OUTBOUND = _options("outbound_search_test.txt", "JFK", "SRQ")
+RETURNS = _options("return_search_test.txt", "Dest", "Origin")
+
+def _tokens(content: str) -> int:
+    return count_tokens_approximately([ToolMessage(content=content, tool_call_id="x")])
+
+def test_compact_encoding_cuts_tool_message_tokens():
+    for name, flights, prefix in (("outbound", OUTBOUND, OUTBOUND_PREFIX), ("return", RETURNS, RETURN_PREFIX)):
+        # Before: every option serialized in full
+        verbose = _tokens(json.dumps([f.model_dump() for f in flights]))
+        compact = _tokens(encode_flights(flights, prefix, "next_tool"))
+        print(f"\n{name}: {len(flights)} options, {verbose} -> {compact} tokens ({compact / verbose:.0%})")
+        assert compact < verbose * 0.4
+
+def test_encoding_shares_header_and_numbers_rows():
+    text = encode_flights(OUTBOUND[:3], OUTBOUND_PREFIX, "search_return_flights")
+    lines = text.splitlines()
+    assert lines[1] == f"# JFK->SRQ {OUTBOUND[0].booking_link}"
+    assert lines[2].startswith("O1|") and lines[4].startswith("O3|")
+    assert text.count(OUTBOUND[0].booking_link) == 1
+    assert "N/A" not in text
+
+    returns = encode_flights(RETURNS[:2], RETURN_PREFIX, "generate_booking_link")
+    assert "Dest" not in returns and "Origin" not in returns
+    assert encode_flights([], RETURN_PREFIX, "generate_booking_link") == "0 return options."
+
+def test_parse_option_id():
+    assert parse_option_id("O3") == ("O", 2)
+    assert parse_option_id(" r12 ") == ("R", 11)
+    assert parse_option_id("JetBlue") is None
+
+def test_return_search_accepts_option_id(monkeypatch):
+    seen = []
+
+    async def fake_returns(search_url, thread_id, airline, departure_time, arrival_time, price, stops):
+        seen.append((search_url, airline, departure_time, arrival_time, price, stops))
+        return RETURNS[:2]
+
+    monkeypatch.setattr(flight_search, "_search_returns", fake_returns)
+
+    workflow = StateGraph(AgentState)
+    workflow.add_node("tools", ToolNode([flight_search.search_return_flights]))
+    workflow.set_entry_point("tools")
+    workflow.set_finish_point("tools")
+    graph = workflow.compile()
+
+    search = AIMessage(content="", tool_calls=[{"name": "search_outbound_flights", "args": {}, "id": "call-1"}])
+    results = ToolMessage(content="...", tool_call_id="call-1", name="search_outbound_flights", artifact=OUTBOUND)
+
+    def pick(option_id: str) -> ToolMessage:
+        call = AIMessage(content="", tool_calls=[{"name": "search_return_flights", "args": {"option_id": option_id}, "id": "call-2"}])
+        return asyncio.run(graph.ainvoke({"messages": [search, results, call]}))["messages"][-1]
+
+    message = pick("O2")
+    chosen = OUTBOUND[1]
+    assert seen == [(chosen.booking_link, chosen.airline, chosen.departure_time, chosen.arrival_time, chosen.price, chosen.stops)]
+    assert message.artifact == RETURNS[:2]
+    assert message.content.splitlines()[2].startswith("R1|")
+
+    assert pick("O99").content.startswith("Error: unknown outbound option_id")
+
+def test_results_are_sent_cheapest_first(monkeypatch):
+    page_order = [OUTBOUND[1].model_copy(update={"price": 900.0}), OUTBOUND[0]]  # a single search keeps page order
+
+    async def fake_outbound(origin, destination, depart_date, return_date, thread_id):
+        return page_order
+
+    monkeypatch.setattr(flight_search, "_search_outbound", fake_outbound)
+    call = {"type": "tool_call", "id": "call-1", "name": "search_outbound_flights",
+            "args": {"origin": "JFK", "destination": "SRQ", "depart_date": "2026-02-12", "return_date": "2026-02-16"}}
+    message = asyncio.run(flight_search.search_outbound_flights.ainvoke(call, config={"configurable": {"thread_id": "t"}}))
+
+    assert message.artifact == [page_order[1], page_order[0]]
+    rows = message.content.splitlines()
+    assert "cheapest first" in rows[0]
+    assert rows[2].startswith("O1|") and rows[2].endswith(f"|{int(page_order[1].price)}")
@@ -0,0 +1,49 @@
+import asyncio
+import sys
+import os
+
+# Add project root to path so we can import src
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import pytest
+
+aiohttp = pytest.importorskip("aiohttp")
+
+from fake_flights_server import FakeFlightsServer
+
+def test_serves_outbound_return_and_booking_pages():
+    async def run():
+        server = FakeFlightsServer(cards=20)
+        base_url = await server.start()
+        try:
+            async with aiohttp.ClientSession() as http:
+                async with http.get(f"{base_url}?q=Flights+from+JFK+to+SRQ") as response:
+                    outbound = await response.text()
+                async with http.get(f"{base_url}/search?tfs=out3") as response:
+                    returns = await response.text()
+                async with http.get(f"{base_url}/booking?tfs=out3-ret1") as response:
+                    booking = await response.text()
+        finally:
+            await server.stop()
+
+        assert 'role="main"' in outbound and "/travel/flights/search?tfs=out" in outbound
+        assert outbound.count("round trip") == 20
+        assert "/travel/flights/booking?tfs=out3-ret" in returns
+        assert "out3-ret1" in booking
+        assert server.requests == 3
+    asyncio.run(run())
+
+def test_latency_is_applied():
+    async def run():
+        server = FakeFlightsServer(latency_ms=150)
+        base_url = await server.start()
+        try:
+            async with aiohttp.ClientSession() as http:
+                start = asyncio.get_running_loop().time()
+                async with http.get(base_url) as response:
+                    await response.text()
+                elapsed = asyncio.get_running_loop().time() - start
+        finally:
+            await server.stop()
+        assert elapsed >= 0.15
+    asyncio.run(run())
@@ -0,0 +1,46 @@
+import asyncio
+import sys
+import os
+
+# Add project root to path so we can import src
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.config import Config
+from src.tools import flight_search
+from src.tools.airports import expand_airports
+from flight_fixtures import make_flight
+
+def test_expand_airports():
+    assert expand_airports("NYC") == ["JFK", "LGA", "EWR"]
+    assert expand_airports("jfk, ewr") == ["JFK", "EWR"]
+    assert expand_airports("JFK/NYC") == ["JFK", "LGA", "EWR"]
+    assert expand_airports("SRQ") == ["SRQ"]
+    assert expand_airports("New York") == ["New York"]  # a city name goes to the query as written
+    assert expand_airports("New York, LON") == ["New York", "LHR", "LGW", "STN", "LTN", "LCY", "SEN"]
+
+def test_metro_search_runs_pairs_concurrently_and_merges(monkeypatch):
+    running = 0
+    peak = 0
+
+    async def fake_pair(origin, destination, depart_date, return_date, thread_id):
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.05)
+        running -= 1
+        # Same flight twice per pair: must be deduplicated, but kept across pairs
+        price = {"JFK": 300.0, "LGA": 200.0, "EWR": 100.0}[origin]
+        link = f"https://example.test/{origin}-{destination}"
+        return [make_flight(price=price, departure_city=origin, arrival_city=destination, booking_link=link)] * 2
+
+    monkeypatch.setattr(flight_search, "_search_outbound_pair", fake_pair)
+    monkeypatch.setattr(Config, "FANOUT_CONCURRENCY", 2)
+
+    message = asyncio.run(flight_search.search_outbound_flights.ainvoke({
+        "type": "tool_call", "id": "call-1", "name": "search_outbound_flights",
+        "args": {"origin": "NYC", "destination": "SRQ", "depart_date": "2026-03-10", "return_date": "2026-03-16"},
+    }))
+    results = message.artifact
+
+    assert [f.departure_city for f in results] == ["EWR", "LGA", "JFK"]
+    assert peak == 2
@@ -0,0 +1,47 @@
+import asyncio
+import sys
+import os
+
+# Add project root to path so we can import src
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+os.environ.setdefault("GOOGLE_API_KEY", "test-key")  # the agent module builds its LLM client on first use
+
+import main
+from src import agent
+from src.admission import chat_limiter
+from load_chat import ITINERARY, chat_turn, run_load, stubbed_agent
+
+def test_a_turn_runs_the_real_graph_on_the_stand_ins():
+    async def run():
+        async with stubbed_agent(llm_latency=0, tool_latency=0):
+            plain = await chat_turn("one", "JFK to SRQ")
+            streamed = await chat_turn("two", "JFK to SRQ", stream_tokens=True)
+            again = await chat_turn("one", "Same again")  # a second turn on the same thread
+        return plain, streamed, again
+
+    tools_before, graph_before = agent.tools, main.compiled_graph
+    plain, streamed, again = asyncio.run(run())
+    assert [(e["type"], e["content"]) for e in plain.events] == [
+        ("tool", "search_outbound_flights"), ("tool", "search_return_flights"),
+        ("tool", "generate_booking_link"), ("message", ITINERARY),
+    ]
+    assert plain.completed and again.completed and again.events == plain.events
+    assert 0 < plain.first_event <= plain.seconds
+
+    partials = [e["field"] for e in streamed.events if e["type"] == "partial"]
+    assert streamed.completed and partials == list(ITINERARY)
+    assert agent.tools is tools_before and main.compiled_graph is graph_before  # all put back
+
+def test_concurrent_sessions_queue_and_are_reported(monkeypatch):
+    monkeypatch.setattr(chat_limiter, "capacity", 2)
+    monkeypatch.setattr(chat_limiter, "max_queue", 32)
+
+    report = asyncio.run(run_load(sessions=6, turns=2, llm_latency=0.005, tool_latency=0.01))
+    assert report["turns"] == 12 and report["completed"] == 12
+    assert report["rejected"] == report["failed"] == 0
+    assert report["turns_per_second"] > 0 and report["events_per_second"] > 0
+    first, done = report["first_event_seconds"], report["completion_seconds"]
+    assert first["p50"] <= first["p95"] <= first["p99"] and done["p50"] <= done["p95"] <= done["p99"]
+    assert first["p99"] <= done["p99"]
+    assert report["rss_mb"]["peak"] >= report["rss_mb"]["start"] > 0
+    assert report["admission"]["chat"]["avg_wait_seconds"] > 0  # only 2 of the 6 sessions ran at once
@@ -0,0 +1,91 @@
+import asyncio
+import sys
+import os
+
+# Add project root to path so we can import src
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+os.environ.setdefault("GOOGLE_API_KEY", "test-key")  # the agent module builds its LLM client on import
+
+from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
+from langchain_core.messages.utils import count_tokens_approximately
+from langgraph.graph.message import add_messages
+
+from src import agent
+from src.config import Config
+from src.memory import collapse_consumed_tool_results, memory_context, split_history
+from src.state import FlightOption, TripPreferences
+
+TABLE = "25 outbound options, cheapest first (id|airline|depart|arrive|duration|stops|price).\n" + "\n".join(
+    f"O{i}|JetBlue|8:00 AM|11:00 AM|3 hr|Nonstop|{300 + i}" for i in range(1, 26)
+)
+
+def _turn(n: int) -> list:
+    """One user turn with a search: user -> tool call -> big tool result -> answer."""
+    return [
+        HumanMessage(content=f"Search trip number {n} please, from JFK to SRQ.", id=f"h{n}"),
+        AIMessage(content="", tool_calls=[{"name": "search_outbound_flights", "args": {"origin": "JFK"}, "id": f"c{n}"}], id=f"a{n}"),
+        ToolMessage(content=TABLE, tool_call_id=f"c{n}", name="search_outbound_flights", artifact=[n], id=f"t{n}"),
+        AIMessage(content=f"Here is trip {n}.", id=f"r{n}"),
+    ]
+
+def test_collapse_only_touches_earlier_turns():
+    messages = _turn(1) + _turn(2)[:1]
+    collapsed = collapse_consumed_tool_results(messages)
+    assert [m.id for m in collapsed] == ["t1"]
+    assert collapsed[0].content.startswith("25 outbound options")
+    assert collapsed[0].artifact == [1]
+    assert len(collapsed[0].content) < 200
+
+    # The result of the turn in progress is still needed in full
+    assert collapse_consumed_tool_results(_turn(1)) == []
+
+def test_split_history_cuts_at_turn_boundaries():
+    messages = _turn(1) + _turn(2) + _turn(3)
+    assert split_history(messages, budget=10_000, keep_tokens=100) == ([], messages)
+
+    older, kept = split_history(messages, budget=10, keep_tokens=1)
+    assert isinstance(kept[0], HumanMessage) and kept[0].id == "h3"
+    assert [m.id for m in older][-1] == "r2"
+
+def test_memory_context_pins_selections():
+    flight = FlightOption(
+        airline="Delta", flight_number="N/A", departure_city="JFK", arrival_city="SRQ",
+        departure_time="8:00 AM", arrival_time="11:00 AM", price=250.0, duration="3 hr", stops="Nonstop",
+    )
+    context = memory_context({
+        "summary": "User wants JFK to SRQ in March.",
+        "preferences": TripPreferences(budget_mode="cheapest"),
+        "selected_outbound_flight": flight,
+    })
+    assert "User wants JFK to SRQ in March." in context
+    assert "Selected outbound: Delta 8:00 AM" in context
+    assert "'budget_mode': 'cheapest'" in context
+    assert memory_context({}) == ""
+
+def test_prompt_stays_bounded_over_a_long_chat(monkeypatch):
+    summaries = []
+
+    async def fake_summarize(older, previous):
+        summaries.append(len(older))
+        return f"notes covering {len(older)} more messages"
+
+    monkeypatch.setattr(agent, "_summarize", fake_summarize)
+    monkeypatch.setattr(Config, "MEMORY_TOKEN_BUDGET", 1500)
+    monkeypatch.setattr(Config, "MEMORY_RECENT_TOKENS", 600)
+
+    state = {"messages": [], "summary": None}
+    sizes = []
+    for n in range(1, 41):
+        state["messages"] = add_messages(state["messages"], _turn(n))
+        # The next user turn starts with the memory stage
+        state["messages"] = add_messages(state["messages"], [HumanMessage(content="and another?", id=f"next{n}")])
+        update = asyncio.run(agent.memory_node(state))
+        state["messages"] = add_messages(state["messages"], update.get("messages", []))
+        state["summary"] = update.get("summary", state["summary"])
+        sizes.append(count_tokens_approximately(state["messages"]))
+
+    assert summaries, "history was never summarized"
+    assert max(sizes) <= Config.MEMORY_TOKEN_BUDGET + count_tokens_approximately(_turn(1))
+    assert state["summary"].startswith("notes covering")
+    # Whatever is left starts on a user message
+    assert isinstance(state["messages"][0], HumanMessage)
@@ -0,0 +1,90 @@
+import asyncio
+import json
+import sys
+import os
+
+# Add project root to path so we can import src
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+os.environ.setdefault("GOOGLE_API_KEY", "test-key")  # the agent module builds its LLM client on import
+
+from fastapi.testclient import TestClient
+from langchain_core.language_models.fake_chat_models import GenericFakeChatModel
+from langchain_core.messages import AIMessage
+from langchain_core.tools import tool
+from langgraph.graph import StateGraph
+from langgraph.prebuilt import ToolNode
+
+import main
+from src.metrics import GRAPH_STEP_SECONDS, LLM_SECONDS, STAGE_SECONDS, TOOL_SECONDS, GraphTimer, Histogram
+from src.state import AgentState
+from src.tools import flight_search
+
+@tool
+async def lookup(code: str) -> str:
+    """Looks up an airport code."""
+    return f"{code} is an airport"
+
+def _graph():
+    """agent -> tools -> agent, like the real graph, with a scripted model."""
+    model = GenericFakeChatModel(messages=iter([
+        AIMessage(content="", tool_calls=[{"name": "lookup", "args": {"code": "SRQ"}, "id": "c1"}]),
+        AIMessage(content="SRQ is Sarasota."),
+    ]))
+
+    async def agent(state: AgentState):
+        return {"messages": [await model.ainvoke(state["messages"])]}
+
+    def route(state: AgentState):
+        return "tools" if state["messages"][-1].tool_calls else "__end__"
+
+    workflow = StateGraph(AgentState)
+    workflow.add_node("agent", agent)
+    workflow.add_node("tools", ToolNode([lookup]))
+    workflow.set_entry_point("agent")
+    workflow.add_conditional_edges("agent", route)
+    workflow.add_edge("tools", "agent")
+    return workflow.compile().with_config(callbacks=[GraphTimer()])
+
+def test_histogram_renders_prometheus_text():
+    histogram = Histogram("travel_agent_demo_seconds", "Demo.", "stage", buckets=(0.1, 1.0))
+    for seconds in (0.05, 0.5, 0.7, 3.0):
+        histogram.observe("page_goto", seconds)
+    lines = histogram.render()
+    assert lines[:2] == ["# HELP travel_agent_demo_seconds Demo.", "# TYPE travel_agent_demo_seconds histogram"]
+    assert 'travel_agent_demo_seconds_bucket{stage="page_goto",le="0.1"} 1' in lines
+    assert 'travel_agent_demo_seconds_bucket{stage="page_goto",le="1.0"} 3' in lines
+    assert 'travel_agent_demo_seconds_bucket{stage="page_goto",le="+Inf"} 4' in lines
+    assert 'travel_agent_demo_seconds_sum{stage="page_goto"} 4.25' in lines
+    assert 'travel_agent_demo_seconds_count{stage="page_goto"} 4' in lines
+
+def test_graph_steps_llm_and_tool_calls_are_timed():
+    before = (GRAPH_STEP_SECONDS.count("agent"), GRAPH_STEP_SECONDS.count("tools"), LLM_SECONDS.count("agent"), TOOL_SECONDS.count("lookup"))
+    asyncio.run(_graph().ainvoke({"messages": [("user", "Where is SRQ?")]}))
+    after = (GRAPH_STEP_SECONDS.count("agent"), GRAPH_STEP_SECONDS.count("tools"), LLM_SECONDS.count("agent"), TOOL_SECONDS.count("lookup"))
+    assert [a - b for a, b in zip(after, before)] == [2, 1, 2, 1]
+
+def test_page_load_stages_are_timed():
+    class FakePage:
+        async def goto(self, url, timeout=None):
+            await asyncio.sleep(0.01)
+
+        async def wait_for_selector(self, selector, state=None, timeout=None):
+            pass
+
+    before = STAGE_SECONDS.count("page_goto"), STAGE_SECONDS.count("wait_for_selector")
+    asyncio.run(flight_search._load_results(FakePage(), "http://example.test"))
+    assert (STAGE_SECONDS.count("page_goto"), STAGE_SECONDS.count("wait_for_selector")) == (before[0] + 1, before[1] + 1)
+
+def test_metrics_endpoint_and_timing_events(monkeypatch):
+    monkeypatch.setattr(main, "compiled_graph", _graph())
+    client = TestClient(main.app)
+
+    response = client.post("/chat", json={"message": "Where is SRQ?", "thread_id": "m1", "timings": True})
+    events = [json.loads(line[6:]) for line in response.text.splitlines() if line.startswith("data: ")]
+    timings = [(e["metric"], e["name"]) for e in events if e["type"] == "timing"]
+    assert ("llm", "agent") in timings and ("tool", "lookup") in timings and ("graph_step", "tools") in timings
+    assert {"type": "message", "content": "SRQ is Sarasota."} in events
+
+    text = client.get("/metrics").text
+    assert "# TYPE travel_agent_graph_step_seconds histogram" in text
+    assert 'travel_agent_llm_seconds_count{node="agent"}' in text
@@ -0,0 +1,29 @@
+import sys
+import os
+
+# Add project root to path so we can import src
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.config import Config
+from src.tools.network import NetworkStats, should_block
+
+def test_blocks_heavy_resource_types():
+    assert should_block("image", "https://www.gstatic.com/flights/airline_logos/B6.png")
+    assert should_block("font", "https://fonts.gstatic.com/s/googlesans.woff2")
+    assert not should_block("document", "https://www.google.com/travel/flights?q=JFK")
+    assert not should_block("xhr", "https://www.google.com/_/FlightsFrontendUi/data/batchexecute")
+
+def test_blocks_denied_url_patterns():
+    assert should_block("script", "https://www.googletagmanager.com/gtag/js")
+    assert should_block("xhr", "https://www.google.com/travel/flights/gen_204?x=1")
+
+def test_allowlist_wins(monkeypatch):
+    monkeypatch.setattr(Config, "ALLOWED_URL_PATTERNS", ["/airline_logos/"])
+    assert not should_block("image", "https://www.gstatic.com/flights/airline_logos/B6.png")
+
+def test_stats_estimate_bytes_saved():
+    stats = NetworkStats()
+    stats.record_blocked("image")
+    stats.record_blocked("unknown-type")
+    assert stats.requests_blocked == 2
+    assert stats.est_bytes_saved == Config.BLOCKED_BYTES_ESTIMATE["image"] + Config.BLOCKED_BYTES_ESTIMATE["other"]
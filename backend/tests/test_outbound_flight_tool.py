@@ -14,13 +14,14 @@ Config.HEADLESS = False
 async def run_test():
     print("🧪 Starting OUTBOUND Flight Search Test (Fast Scrape)...")
     
-    # Run Tool 1 with BOTH dates
-    results = await search_outbound_flights.ainvoke({
+    # Run Tool 1 with BOTH dates (as a tool call, so we get the structured artifact back)
+    message = await search_outbound_flights.ainvoke({"type": "tool_call", "id": "test", "name": "search_outbound_flights", "args": {
         "origin": "JFK", 
         "destination": "SRQ", 
         "depart_date": "2026-02-12",
         "return_date": "2026-02-16"
-    })
+    }})
+    results = message.artifact
     
     print(f"\n✅ Test Complete! Scraper returned {len(results)} outbound options.")
     
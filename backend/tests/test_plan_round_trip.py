@@ -0,0 +1,102 @@
+import asyncio
+import sys
+import os
+
+# Add project root to path so we can import src
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from langchain_core.messages import AIMessage
+from langgraph.graph import StateGraph
+from langgraph.prebuilt import ToolNode
+
+from src.state import AgentState, FlightOption, TripPreferences
+from src.tools import flight_search
+from flight_fixtures import make_flight
+
+ARGS = {
+    "origin": "JFK", "destination": "SRQ", "depart_date": "2026-03-10", "return_date": "2026-03-16",
+    "preferences": {"budget_mode": "cheapest"},
+}
+
+def _fake_pipeline(monkeypatch, returns=None, link="https://example.test/booking?tfs=1"):
+    calls = []
+
+    async def fake_outbound(origin, destination, depart_date, return_date, thread_id):
+        calls.append(("outbound", thread_id))
+        return [make_flight("Spirit", 90.0, booking_link="out-url", stops="1 stop"), make_flight("JetBlue", 150.0, booking_link="out-url")]
+
+    async def fake_returns(search_url, thread_id, airline, departure_time, arrival_time, price, stops):
+        calls.append(("returns", thread_id, search_url, airline, price))
+        return [make_flight("Delta", 330.0, booking_link="ret-url")] if returns is None else returns
+
+    async def fake_link(search_url, thread_id, airline, departure_time, arrival_time, price, stops):
+        calls.append(("link", thread_id, search_url, airline))
+        return link
+
+    monkeypatch.setattr(flight_search, "_search_outbound", fake_outbound)
+    monkeypatch.setattr(flight_search, "_search_returns", fake_returns)
+    monkeypatch.setattr(flight_search, "_booking_link", fake_link)
+    return calls
+
+def _run(args):
+    call = {"type": "tool_call", "id": "call-1", "name": "plan_round_trip", "args": args}
+    return asyncio.run(flight_search.plan_round_trip.ainvoke(call, config={"configurable": {"thread_id": "t-1"}}))
+
+def test_plan_round_trip_chains_all_three_steps_in_one_thread(monkeypatch):
+    calls = _fake_pipeline(monkeypatch)
+    plan = _run(ARGS).artifact
+
+    assert plan.status == "booked"
+    assert plan.outbound.airline == "JetBlue"          # cheapest non-stop beats the cheaper 1-stop
+    assert plan.return_flight.airline == "Delta"
+    assert plan.total_price == 330.0
+    assert plan.booking_link == "https://example.test/booking?tfs=1"
+    assert calls == [
+        ("outbound", "t-1"),
+        ("returns", "t-1", "out-url", "JetBlue", 150.0),
+        ("link", "t-1", "ret-url", "Delta"),
+    ]
+
+def test_plan_round_trip_reports_where_it_stopped(monkeypatch):
+    _fake_pipeline(monkeypatch, returns=[])
+    plan = _run(ARGS).artifact
+    assert plan.status == "no_return" and plan.outbound.airline == "JetBlue"
+
+    _fake_pipeline(monkeypatch, link=flight_search.LINK_ERROR)
+    plan = _run(ARGS).artifact
+    assert plan.status == "link_failed" and plan.booking_link is None
+
+    _fake_pipeline(monkeypatch)
+    plan = _run({**ARGS, "preferences": {"budget_mode": "max_price", "max_price": 50.0}}).artifact
+    assert plan.status == "no_outbound"
+
+def test_plan_round_trip_streams_progress(monkeypatch):
+    _fake_pipeline(monkeypatch)
+    workflow = StateGraph(AgentState)
+    workflow.add_node("tools", ToolNode([flight_search.plan_round_trip]))
+    workflow.set_entry_point("tools")
+    workflow.set_finish_point("tools")
+    graph = workflow.compile()
+
+    request = AIMessage(content="", tool_calls=[{"name": "plan_round_trip", "args": ARGS, "id": "call-1", "type": "tool_call"}])
+
+    async def collect():
+        return [event async for event in graph.astream({"messages": [request]}, stream_mode="custom")]
+
+    stages = [event["stage"] for event in asyncio.run(collect())]
+    assert stages == ["search_outbound_flights", "search_return_flights", "generate_booking_link"]
+
+def test_plan_round_trip_defaults_to_the_saved_preferences(monkeypatch):
+    _fake_pipeline(monkeypatch)
+    workflow = StateGraph(AgentState)
+    workflow.add_node("tools", ToolNode([flight_search.plan_round_trip]))
+    workflow.set_entry_point("tools")
+    workflow.set_finish_point("tools")
+    graph = workflow.compile()
+
+    args = {key: value for key, value in ARGS.items() if key != "preferences"}
+    request = AIMessage(content="", tool_calls=[{"name": "plan_round_trip", "args": args, "id": "call-1", "type": "tool_call"}])
+    saved = TripPreferences(budget_mode="max_price", max_price=50.0)  # from set_trip_preferences
+
+    result = asyncio.run(graph.ainvoke({"messages": [request], "preferences": saved}))
+    assert result["messages"][-1].artifact.status == "no_outbound"  # the saved budget was applied
@@ -0,0 +1,95 @@
+import asyncio
+import sys
+import os
+
+# Add project root to path so we can import src
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import pytest
+
+from src.config import Config
+from src.state import FlightOption
+from src.tools import flight_search
+from src.tools.prefetch import ReturnPrefetcher
+from src.tools.sessions import session_registry
+from flight_fixtures import make_flight
+
+OUTBOUND_URL = "http://flights.test/outbound"
+CHEAP_NONSTOP = make_flight("JetBlue", 300.0, booking_link=OUTBOUND_URL)
+CHEAPER_ONE_STOP = make_flight("Spirit", 150.0, stops="1 Stop(s)", booking_link=OUTBOUND_URL)
+PRICEY_NONSTOP = make_flight("Delta", 450.0, booking_link=OUTBOUND_URL)
+OUTBOUND = [CHEAPER_ONE_STOP, CHEAP_NONSTOP, PRICEY_NONSTOP]
+
+@pytest.fixture
+def prefetch(monkeypatch):
+    """Prefetching on, no cache; scraping is faked and logged."""
+    monkeypatch.setattr(Config, "PREFETCH_ENABLED", True)
+    monkeypatch.setattr(Config, "PREFETCH_TOP_K", 2)
+    monkeypatch.setattr(Config, "SEARCH_CACHE_ENABLED", False)
+    prefetcher = ReturnPrefetcher()
+    monkeypatch.setattr(flight_search, "prefetcher", prefetcher)
+    scraped, discarded = [], []
+
+    async def fake_outbound(origin, destination, depart_date, return_date, thread_id):
+        return OUTBOUND
+
+    async def fake_scrape(search_url, thread_id, airline, departure_time, arrival_time, price, stops, reuse_page=True):
+        scraped.append((airline, reuse_page))
+        await asyncio.sleep(0.05)
+        return [make_flight(f"{airline} return", 200.0, booking_link=f"http://flights.test/{airline}")]
+
+    async def fake_discard(thread_id, url):
+        discarded.append(url)
+
+    monkeypatch.setattr(flight_search, "_search_outbound", fake_outbound)
+    monkeypatch.setattr(flight_search, "_scrape_returns", fake_scrape)
+    monkeypatch.setattr(session_registry, "discard", fake_discard)
+    return prefetcher, scraped, discarded
+
+async def _search_outbound(thread_id: str):
+    call = {"type": "tool_call", "id": "c1", "name": "search_outbound_flights", "args": {
+        "origin": "JFK", "destination": "SRQ", "depart_date": "2026-03-10", "return_date": "2026-03-16",
+    }}
+    await flight_search.search_outbound_flights.ainvoke(call, config={"configurable": {"thread_id": thread_id}})
+
+async def _returns_for(flight: FlightOption, thread_id: str):
+    return await flight_search._search_returns(
+        flight.booking_link, thread_id, flight.airline, flight.departure_time, flight.arrival_time, flight.price, flight.stops,
+    )
+
+def test_matching_pick_is_answered_by_the_prefetch(prefetch):
+    prefetcher, scraped, discarded = prefetch
+
+    async def run():
+        await _search_outbound("t1")
+        await asyncio.sleep(0.1)  # the LLM "thinks"; both guesses finish
+        return await _returns_for(CHEAP_NONSTOP, "t1")
+
+    results = asyncio.run(run())
+    # Non-stop first, then price; only the top guess takes the parked outbound page
+    assert scraped == [("JetBlue", True), ("Delta", False)]
+    assert results[0].airline == "JetBlue return"
+    assert discarded == ["http://flights.test/Delta"]
+    stats = prefetcher.stats()
+    assert (stats["launched"], stats["used"], stats["wasted"], stats["cancelled"]) == (2, 1, 1, 0)
+    assert stats["wasted_seconds"] > 0 and stats["pending_threads"] == 0
+
+def test_other_pick_cancels_running_guesses(prefetch):
+    prefetcher, scraped, discarded = prefetch
+
+    async def run():
+        await _search_outbound("t1")
+        return await _returns_for(CHEAPER_ONE_STOP, "t1")  # picked at once, guesses still running
+
+    results = asyncio.run(run())
+    assert results[0].airline == "Spirit return"
+    assert scraped[-1] == ("Spirit", True)
+    stats = prefetcher.stats()
+    assert (stats["launched"], stats["used"], stats["cancelled"]) == (2, 0, 2)
+    assert discarded == []
+
+def test_prefetch_is_off_by_default(prefetch, monkeypatch):
+    prefetcher, scraped, _ = prefetch
+    monkeypatch.setattr(Config, "PREFETCH_ENABLED", False)
+    asyncio.run(_search_outbound("t1"))
+    assert scraped == [] and prefetcher.stats()["launched"] == 0
@@ -0,0 +1,173 @@
+import asyncio
+import sqlite3
+import sys
+import os
+
+# Add project root to path so we can import src
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.config import Config
+from src.tools import price_watch
+from src.tools.encoding import encode_watch
+from src.tools.price_watch import PriceWatcher, apply_changes, diff_flights
+from flight_fixtures import make_flight
+
+LEG = {"arrival_time": "4:14 PM", "duration": "3 hr 15 min"}
+JETBLUE = make_flight("JetBlue", 300.0, departure_time="12:59 PM", **LEG)
+DELTA = make_flight("Delta", 350.0, departure_time="8:00 AM", **LEG)
+UNITED = make_flight("United", 410.0, departure_time="6:00 PM", **LEG)
+
+def test_only_changes_are_diffed_and_they_replay():
+    first, changes = diff_flights({}, [JETBLUE, DELTA, DELTA.model_copy(update={"price": 500.0})], at=1.0)
+    assert [c.kind for c in changes] == ["added", "added"]  # the dearer fare of the same Delta flight is ignored
+
+    second, changes = diff_flights(first, [JETBLUE.model_copy(update={"price": 280.0}), UNITED], at=2.0)
+    assert sorted((c.kind, c.price, c.previous_price) for c in changes) == [
+        ("added", 410.0, None), ("price", 280.0, 300.0), ("removed", None, 350.0),
+    ]
+    assert diff_flights(second, list(second.values()), at=3.0)[1] == []
+
+    replayed = {}
+    apply_changes(replayed, diff_flights({}, [JETBLUE, DELTA], 1.0)[1] + changes)
+    assert replayed == second
+
+def _rows(path) -> list:
+    with sqlite3.connect(path) as db:
+        return db.execute("SELECT kind FROM watch_changes ORDER BY rowid").fetchall()
+
+def test_polls_store_changes_and_snapshots_survive_a_restart(monkeypatch, tmp_path):
+    monkeypatch.setattr(Config, "SEARCH_CACHE_ENABLED", False)
+    path = str(tmp_path / "watch.sqlite")
+    polls = iter([
+        [JETBLUE, DELTA],
+        [JETBLUE, DELTA],                                      # nothing moved
+        [],                                                    # a failed scrape
+        [JETBLUE.model_copy(update={"price": 280.0}), UNITED],
+    ])
+    searched = []
+
+    async def fake_search(origin, destination, depart_date, return_date, thread_id):
+        searched.append((origin, destination, depart_date, return_date, thread_id))
+        return next(polls)
+
+    monkeypatch.setattr(price_watch, "_search_outbound", fake_search)
+
+    async def poll_now(watcher, watch_id):
+        watcher._watches[watch_id].next_poll = 0
+        watcher.poll_due()
+        await asyncio.gather(*watcher._tasks)
+
+    async def run():
+        watcher = PriceWatcher(sqlite_path=path)
+        watch = await watcher.watch("jfk", "SRQ", "2099-03-10", "2099-03-16")
+        assert await watcher.watch("JFK", "srq ", "2099-03-10", "2099-03-16") is watch  # same query, same watch
+        await asyncio.gather(*watcher._tasks)  # the first poll
+        rows_after_first = len(_rows(path))
+        for _ in range(3):
+            await poll_now(watcher, watch.watch_id)
+        snapshot = await watcher.snapshot(watch.watch_id)
+        await watcher.stop()
+
+        restarted = PriceWatcher(sqlite_path=path)
+        again = await restarted.snapshot(watch.watch_id)
+        await restarted.stop()
+        return watch, rows_after_first, snapshot, again, watcher.stats()
+
+    watch, rows_after_first, snapshot, again, stats = asyncio.run(run())
+    assert searched[0] == ("JFK", "SRQ", "2099-03-10", "2099-03-16", None)
+    assert rows_after_first == 2
+    assert len(_rows(path)) == 5  # 2 added, then nothing, nothing, and 3 changes
+    assert [(f.airline, f.price) for f in snapshot.flights] == [("JetBlue", 280.0), ("United", 410.0)]
+    assert snapshot.watch.polls == 3 and snapshot.watch.failures == 1
+    assert stats == {"watches": 1, "polling": 0, "polls": 3, "failures": 1, "changes": 5}
+    assert again.flights == snapshot.flights and again.changes == snapshot.changes
+
+    text = encode_watch(snapshot)
+    assert "2 options" in text and "JetBlue|12:59 PM|4:14 PM|3 hr 15 min|Nonstop|280" in text
+    assert "price: JetBlue 12:59 PM JFK->SRQ $300 -> $280" in text
+    assert "gone: Delta 8:00 AM JFK->SRQ (was $350)" in text
+    assert "new: United 6:00 PM JFK->SRQ $410" in text
+    assert "new: JetBlue" not in text  # the first poll is the baseline, not news
+
+def test_polls_are_bounded_and_departed_watches_dropped(monkeypatch, tmp_path):
+    monkeypatch.setattr(Config, "SEARCH_CACHE_ENABLED", False)
+    monkeypatch.setattr(Config, "PRICE_WATCH_CONCURRENCY", 2)
+    running, peak = [0], [0]
+
+    async def fake_search(origin, destination, depart_date, return_date, thread_id):
+        running[0] += 1
+        peak[0] = max(peak[0], running[0])
+        await asyncio.sleep(0.02)
+        running[0] -= 1
+        return [JETBLUE]
+
+    monkeypatch.setattr(price_watch, "_search_outbound", fake_search)
+
+    async def run():
+        watcher = PriceWatcher(sqlite_path=str(tmp_path / "watch.sqlite"))
+        for destination in ("SRQ", "MIA", "TPA", "LAX", "SFO"):
+            await watcher.watch("JFK", destination, "2099-03-10", "2099-03-16")
+        await watcher.watch("JFK", "BOS", "2000-01-01", "2000-01-05")
+        await asyncio.gather(*watcher._tasks)
+        watcher.poll_due()
+        await asyncio.gather(*watcher._tasks)
+        # Each watch is next due an interval later, give or take the jitter
+        delays = [watch.next_poll - watch.last_polled for watch in watcher.watches()]
+        await watcher.stop()
+        return watcher.watches(), delays
+
+    watches, delays = asyncio.run(run())
+    assert peak[0] == 2
+    assert sorted(w.destination for w in watches) == ["LAX", "MIA", "SFO", "SRQ", "TPA"]
+    low, high = Config.PRICE_WATCH_INTERVAL * (1 - Config.PRICE_WATCH_JITTER), Config.PRICE_WATCH_INTERVAL * (1 + Config.PRICE_WATCH_JITTER)
+    assert all(low <= delay <= high for delay in delays) and len(set(delays)) > 1
+
+def test_an_unwatch_while_a_result_is_pending_sticks(monkeypatch, tmp_path):
+    monkeypatch.setattr(Config, "SEARCH_CACHE_ENABLED", True)
+    path = str(tmp_path / "watch.sqlite")
+    pending = []
+
+    async def slow_lookup(key):
+        release = asyncio.Event()
+        pending.append(release)
+        await release.wait()  # the seed from the search cache is still on its way
+        return [JETBLUE]
+
+    monkeypatch.setattr(price_watch.outbound_cache, "get", slow_lookup)
+
+    async def run():
+        watcher = PriceWatcher(sqlite_path=path)
+        watching = asyncio.create_task(watcher.watch("JFK", "SRQ", "2099-03-10", "2099-03-16"))
+        while not pending:
+            await asyncio.sleep(0)
+        assert await watcher.unwatch(price_watch.watch_id("JFK", "SRQ", "2099-03-10", "2099-03-16"))
+        pending[0].set()
+        await watching
+        latest = dict(watcher._latest)
+        await watcher.stop()
+
+        restarted = PriceWatcher(sqlite_path=path)
+        await restarted._open()
+        left = restarted.watches()
+        await restarted.stop()
+        return latest, left
+
+    latest, left = asyncio.run(run())
+    assert latest == {} and left == []  # not kept in memory, and not back after a restart
+    assert _rows(path) == []
+
+WATCH = price_watch.PriceWatch(
+    watch_id="w", origin="JFK", destination="SRQ", depart_date="2099-03-10", return_date="2099-03-16", created_at=0, next_poll=0,
+)
+
+def test_dates_must_be_iso(tmp_path):
+    async def run():
+        watcher = PriceWatcher(sqlite_path=str(tmp_path / "watch.sqlite"))
+        try:
+            await watcher.watch("JFK", "SRQ", "March 10", "2099-03-16")
+        except ValueError as e:
+            return str(e), watcher.watches()
+
+    error, watches = asyncio.run(run())
+    assert "YYYY-MM-DD" in error and watches == []
+    assert price_watch._departed(WATCH.model_copy(update={"depart_date": "10/03/2099"}), price_watch.date.today())
@@ -0,0 +1,40 @@
+import asyncio
+import sys
+import os
+
+# Add project root to path so we can import src
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.tools.readiness import first_signal
+
+async def _fires_after(delay: float) -> None:
+    await asyncio.sleep(delay)
+
+async def _fails_after(delay: float) -> None:
+    await asyncio.sleep(delay)
+    raise TimeoutError("signal timed out")
+
+def test_first_successful_signal_wins_and_losers_are_cancelled():
+    async def run():
+        slow = asyncio.Event()
+
+        async def never():
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                slow.set()
+                raise
+
+        fired = await first_signal({
+            "broken": lambda: _fails_after(0.0),
+            "quick": lambda: _fires_after(0.01),
+            "slow": never,
+        })
+        assert fired == "quick"
+        assert slow.is_set()
+    asyncio.run(run())
+
+def test_all_signals_timing_out_returns_none():
+    async def run():
+        assert await first_signal({"a": lambda: _fails_after(0.0), "b": lambda: _fails_after(0.01)}) is None
+    asyncio.run(run())
@@ -32,15 +32,16 @@ async def run_return_test():
     print(f"      - Price:   ${mock_price}")
     print(f"      - Stops:   {mock_stops}")
     
-    # Run Tool 2
-    results = await search_return_flights.ainvoke({
+    # Run Tool 2 (as a tool call, so we get the structured artifact back)
+    message = await search_return_flights.ainvoke({"type": "tool_call", "id": "test", "name": "search_return_flights", "args": {
         "search_url": mock_search_url,
         "outbound_airline": mock_airline,
         "outbound_departure_time": mock_dep_time,
         "outbound_arrival_time": mock_arr_time,
         "outbound_price": mock_price,
         "outbound_stops": mock_stops  # <--- NEW PARAMETER
-    })
+    }})
+    results = message.artifact
     
     print(f"\n✅ Test Complete! Scraper returned {len(results)} return options.")
     
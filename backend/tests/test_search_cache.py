@@ -0,0 +1,70 @@
+import asyncio
+import json
+import sys
+import os
+
+# Add project root to path so we can import src
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.tools.search_cache import SearchCache, outbound_key, return_key
+from flight_fixtures import make_flight
+
+def test_keys_are_normalized():
+    assert outbound_key(" jfk", "srq ", "2026-02-12", "2026-02-16") == outbound_key("JFK", "SRQ", "2026-02-12", "2026-02-16")
+    assert return_key("u", "JetBlue", "12:59 PM", "4:14 PM", 813.4, "Nonstop") == return_key("u", "jetblue", "12:59 PM", "4:14 PM", 813.0, "nonstop")
+
+def test_hit_miss_and_ttl():
+    async def run():
+        cache = SearchCache("t", ttl=60, max_bytes=10_000, sqlite_path="")
+        assert await cache.get("k") is None
+        await cache.set("k", [make_flight(price=813.0)])
+        hit = await cache.get("k")
+        assert hit[0].price == 813.0
+        assert cache.stats()["hits"] == 1 and cache.stats()["misses"] == 1
+
+        expired = SearchCache("t", ttl=-1, max_bytes=10_000, sqlite_path="")
+        await expired.set("k", [make_flight(price=813.0)])
+        assert await expired.get("k") is None
+    asyncio.run(run())
+
+def test_lru_eviction_is_bounded_by_bytes():
+    async def run():
+        one_entry = len(json.dumps([make_flight(price=1.0).model_dump()]))
+        cache = SearchCache("t", ttl=60, max_bytes=one_entry * 2, sqlite_path="")
+        for key in ("a", "b", "c"):
+            await cache.set(key, [make_flight(price=1.0)])
+        assert await cache.get("a") is None
+        assert await cache.get("c") is not None
+        assert cache.stats()["bytes"] <= one_entry * 2
+    asyncio.run(run())
+
+def test_empty_results_are_not_cached():
+    async def run():
+        cache = SearchCache("t", ttl=60, max_bytes=10_000, sqlite_path="")
+        await cache.set("k", [])
+        assert await cache.get("k") is None
+    asyncio.run(run())
+
+def test_sqlite_tier_survives_restart(tmp_path):
+    async def run():
+        path = str(tmp_path / "cache.db")
+        await SearchCache("t", ttl=60, max_bytes=10_000, sqlite_path=path).set("k", [make_flight(price=99.0)])
+        fresh = SearchCache("t", ttl=60, max_bytes=10_000, sqlite_path=path)
+        assert (await fresh.get("k"))[0].price == 99.0
+        assert fresh.stats()["disk_hits"] == 1
+    asyncio.run(run())
+
+def test_disk_hits_keep_their_expiry(tmp_path, monkeypatch):
+    clock = [1000.0]
+    monkeypatch.setattr("src.tools.search_cache.time.time", lambda: clock[0])
+
+    async def run():
+        path = str(tmp_path / "cache.db")
+        await SearchCache("t", ttl=60, max_bytes=10_000, sqlite_path=path).set("k", [make_flight(price=99.0)])
+        clock[0] += 50  # a restart, 50 s into the 60 s TTL
+        fresh = SearchCache("t", ttl=60, max_bytes=10_000, sqlite_path=path)
+        assert await fresh.get("k") is not None
+        clock[0] += 20  # expired, even though it was promoted to memory only 20 s ago
+        return await fresh.get("k")
+
+    assert asyncio.run(run()) is None
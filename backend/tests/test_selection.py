@@ -0,0 +1,88 @@
+import asyncio
+import sys
+import os
+
+# Add project root to path so we can import src
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+os.environ.setdefault("GOOGLE_API_KEY", "test-key")  # the agent module builds its LLM client on import
+
+from langchain_core.messages import AIMessage, ToolMessage
+
+from src.agent import after_selection, select_node
+from src.selection import in_window, rank_flights, select_best
+from src.state import FlightOption, RoundTripPlan, TripPreferences
+from flight_fixtures import make_flight
+
+FLIGHTS = [
+    make_flight("Spirit", 120.0, stops="1 stop"),
+    make_flight("Delta", 310.0, departure_time="6:15 PM"),
+    make_flight("JetBlue", 280.0),
+    make_flight("United", 250.0, stops="1 stop", departure_time="7:00 AM"),
+]
+
+def test_cheapest_prefers_cheapest_nonstop():
+    best = select_best(FLIGHTS, TripPreferences(budget_mode="cheapest"))
+    assert best.airline == "JetBlue"
+
+def test_cheapest_falls_back_to_cheapest_overall_without_nonstops():
+    connecting = [f for f in FLIGHTS if f.stops != "Nonstop"]
+    assert select_best(connecting, TripPreferences(budget_mode="cheapest")).airline == "Spirit"
+
+def test_no_limit_orders_nonstop_then_airline_then_price():
+    preferences = TripPreferences(budget_mode="no_limit", preferred_airlines=["delta"])
+    assert [f.airline for f in rank_flights(FLIGHTS, preferences)] == ["Delta", "JetBlue", "Spirit", "United"]
+
+def test_max_price_discards_over_budget():
+    preferences = TripPreferences(budget_mode="max_price", max_price=260.0)
+    assert [f.airline for f in rank_flights(FLIGHTS, preferences)] == ["Spirit", "United"]
+    assert select_best(FLIGHTS, TripPreferences(budget_mode="max_price", max_price=100.0)) is None
+
+def test_nonstop_only_and_timing():
+    preferences = TripPreferences(nonstop_only=True, outbound_time="evening", return_time="morning")
+    assert [f.airline for f in rank_flights(FLIGHTS, preferences, "outbound")] == ["Delta", "JetBlue"]
+    assert [f.airline for f in rank_flights(FLIGHTS, preferences, "return")] == ["JetBlue", "Delta"]
+
+def test_time_windows():
+    assert in_window("12:29 PM", "afternoon")
+    assert in_window("11:30 PM", "night") and in_window("1:05 AM", "night")
+    assert not in_window("12:05 AM", "morning")
+    assert in_window("garbage", "anytime")
+
+def _state_after(tool_name: str, flights, preferences=TripPreferences(budget_mode="cheapest")):
+    call = AIMessage(content="", tool_calls=[{"name": tool_name, "args": {}, "id": "call-1", "type": "tool_call"}])
+    result = ToolMessage(content="[]", tool_call_id="call-1", name=tool_name, artifact=flights)
+    return {"messages": [call, result], "preferences": preferences}
+
+def test_select_node_chains_outbound_pick_into_return_search():
+    update = asyncio.run(select_node(_state_after("search_outbound_flights", FLIGHTS)))
+
+    assert update["selected_outbound_flight"].airline == "JetBlue"
+    next_call = update["messages"][0]
+    assert after_selection({"messages": [next_call]}) == "tools"
+    assert next_call.tool_calls[0]["name"] == "search_return_flights"
+    # JetBlue is FLIGHTS[2], so it goes out by its option id
+    assert next_call.tool_calls[0]["args"] == {"option_id": "O3"}
+
+def test_select_node_chains_return_pick_into_booking_link():
+    update = asyncio.run(select_node(_state_after("search_return_flights", [f.model_dump() for f in FLIGHTS])))
+
+    assert update["selected_return_flight"].airline == "JetBlue"
+    assert update["messages"][0].tool_calls[0]["name"] == "generate_booking_link"
+    assert update["messages"][0].tool_calls[0]["args"] == {"option_id": "R3"}
+
+def test_select_node_hands_back_to_llm():
+    over_budget = TripPreferences(budget_mode="max_price", max_price=50.0)
+    state = _state_after("search_outbound_flights", FLIGHTS, over_budget)
+    assert asyncio.run(select_node(state)) == {}
+    assert after_selection(state) == "agent"
+
+    assert asyncio.run(select_node(_state_after("search_outbound_flights", FLIGHTS, None))) == {}
+    assert asyncio.run(select_node(_state_after("generate_booking_link", "https://example.test/booking"))) == {}
+
+def test_select_node_pins_only_the_legs_a_round_trip_plan_reached():
+    plan = RoundTripPlan(status="no_return", outbound=FLIGHTS[2])
+    state = _state_after("plan_round_trip", plan)
+    state["selected_return_flight"] = FLIGHTS[1]  # picked earlier in the conversation
+
+    assert asyncio.run(select_node(state)) == {"selected_outbound_flight": FLIGHTS[2]}
+    assert asyncio.run(select_node(_state_after("plan_round_trip", RoundTripPlan(status="no_outbound")))) == {}
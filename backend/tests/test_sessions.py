@@ -0,0 +1,150 @@
+import asyncio
+import sys
+import os
+
+# Add project root to path so we can import src
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import pytest
+
+from src.config import Config
+from src.tools import sessions
+from src.tools.sessions import SessionRegistry
+
+# A stand-in for the browser pool: contexts whose pages record their closing
+class FakePage:
+    def __init__(self):
+        self.closed = False
+
+    def is_closed(self) -> bool:
+        return self.closed
+
+    async def close(self):
+        self.closed = True
+
+class FakeContext:
+    def __init__(self):
+        self.pages = []
+
+    async def new_page(self):
+        self.pages.append(FakePage())
+        return self.pages[-1]
+
+class StubPool:
+    def __init__(self):
+        self.contexts = []
+        self.released = []
+        self.gate = None  # set to an Event to hold the next new_context() until it is set
+
+    async def new_context(self):
+        gate, self.gate = self.gate, None
+        if gate:
+            await gate.wait()  # a cold browser launch
+        await asyncio.sleep(0)
+        self.contexts.append(FakeContext())
+        return self.contexts[-1]
+
+    async def release_context(self, context):
+        self.released.append(context)
+
+@pytest.fixture
+def pool(monkeypatch):
+    monkeypatch.setattr(Config, "SESSIONS_ENABLED", True)
+    monkeypatch.setattr(Config, "BLOCK_RESOURCES_ENABLED", False)
+    stub = StubPool()
+    monkeypatch.setattr(sessions, "browser_pool", stub)
+    return stub
+
+async def _use(registry, thread_id, url=None, keep_as=None):
+    async with registry.page(thread_id, url) as live:
+        live.keep_as = keep_as
+        live.was_reused = live.reused  # reset once parked again
+        return live
+
+def test_pages_are_parked_and_reused(pool):
+    async def run():
+        registry = SessionRegistry()
+        first = await _use(registry, "t1", keep_as="https://flights/o")
+        again = await _use(registry, "t1", "https://flights/o", keep_as="https://flights/o")  # the next tool, same URL
+        reused = again.was_reused
+        other = await _use(registry, "t1", "https://flights/elsewhere")  # not kept: closed on exit
+        await registry.stop()
+        return first, again, reused, other
+
+    first, again, reused, other = asyncio.run(run())
+    assert again is first and reused
+    assert other.page.closed
+    assert len(pool.contexts) == 1 and pool.released == pool.contexts  # one context per thread, closed on stop
+
+def test_parked_pages_per_session_are_capped(pool, monkeypatch):
+    monkeypatch.setattr(Config, "MAX_PAGES_PER_SESSION", 2)
+
+    async def run():
+        registry = SessionRegistry()
+        parked = [await _use(registry, "t1", keep_as=f"https://flights/{n}") for n in range(3)]
+        open_urls = sorted(registry._sessions["t1"].pages)
+        await registry.stop()
+        return parked, open_urls
+
+    parked, open_urls = asyncio.run(run())
+    assert open_urls == ["https://flights/1", "https://flights/2"]
+    assert parked[0].page.closed  # least recently used goes first
+
+def test_idle_sessions_expire(pool, monkeypatch):
+    async def run():
+        registry = SessionRegistry()
+        live = await _use(registry, "t1", keep_as="https://flights/o")
+        await registry.evict_expired()
+        kept = registry.open_sessions
+        monkeypatch.setattr(Config, "SESSION_IDLE_TTL", -1)
+        await registry.evict_expired()
+        await registry.stop()
+        return live, kept, registry.open_sessions
+
+    live, kept, left = asyncio.run(run())
+    assert kept == 1 and left == 0
+    assert live.page.closed and pool.released == pool.contexts
+
+def test_a_slow_context_does_not_hold_up_other_threads(pool):
+    async def run():
+        registry = SessionRegistry()
+        pool.gate = gate = asyncio.Event()
+        slow = asyncio.create_task(_use(registry, "slow"))
+        await asyncio.sleep(0.01)
+        fast = await asyncio.wait_for(_use(registry, "fast"), 1)  # not stuck behind "slow"
+        slow_done_first = slow.done()
+        gate.set()
+        await slow
+
+        # Two first calls of one thread at once: one context is kept, the other handed back
+        both = await asyncio.gather(_use(registry, "twin", keep_as="a"), _use(registry, "twin", keep_as="b"))
+        twin = registry._sessions["twin"].context
+        await registry.stop()
+        return fast, slow_done_first, both, twin
+
+    fast, slow_done_first, both, twin = asyncio.run(run())
+    assert fast.page.closed and not slow_done_first
+    assert len(pool.contexts) == 4 and sorted(map(id, pool.released)) == sorted(map(id, pool.contexts))
+    assert all(live.page in twin.pages for live in both)
+
+def test_parked_pages_count_against_the_browser_limit(pool, monkeypatch):
+    from src.admission import browser_limiter
+    monkeypatch.setattr(browser_limiter, "capacity", 3)
+
+    async def run():
+        registry = SessionRegistry()
+        # Three threads each park a page: the limit is reached, but nothing is in use
+        parked = [await _use(registry, f"t{n}", keep_as="https://flights/o") for n in range(3)]
+        full = registry.parked_pages
+        # A fourth thread's page (a prefetch tab, say) makes room by closing the oldest
+        async with registry.page("t3") as live:
+            during = registry.parked_pages + browser_limiter.active
+        reused = await _use(registry, "t2", "https://flights/o")
+        closed = [live.page.closed for live in parked]
+        await registry.stop()
+        return parked, full, during, reused, closed
+
+    parked, full, during, reused, closed = asyncio.run(run())
+    assert full == 3 and during == 3
+    assert closed == [True, False, True]  # the oldest made room; the reused one closed after use
+    assert reused is parked[2]  # the newer parked pages are still reused
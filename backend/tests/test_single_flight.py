@@ -0,0 +1,114 @@
+import asyncio
+import sys
+import os
+
+# Add project root to path so we can import src
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import pytest
+
+from src.config import Config
+from src.state import FlightOption
+from src.tools import flight_search
+from src.tools.single_flight import SingleFlight, outbound_flights
+
+FLIGHT = FlightOption(
+    airline="JetBlue", flight_number="N/A", departure_city="JFK", arrival_city="SRQ",
+    departure_time="8:00 AM", arrival_time="11:00 AM", price=300.0, duration="3 hr", stops="Nonstop",
+)
+
+def test_concurrent_identical_searches_share_one_scrape(monkeypatch):
+    monkeypatch.setattr(Config, "SEARCH_CACHE_ENABLED", False)
+    scraped = []
+
+    async def fake_scrape(origin, destination, url, thread_id):
+        scraped.append((origin, destination, thread_id))
+        await asyncio.sleep(0.05)
+        return [FLIGHT]
+
+    monkeypatch.setattr(flight_search, "_scrape_outbound", fake_scrape)
+
+    async def run():
+        searches = [
+            flight_search._search_outbound_pair(origin, "SRQ", "2026-03-10", "2026-03-16", f"user-{n}")
+            for n, origin in enumerate(["JFK", "jfk ", "JFK", "LGA"])
+        ]
+        return await asyncio.gather(*searches)
+
+    shared_before = outbound_flights.shared
+    results = asyncio.run(run())
+    # Three spellings of the same search, one scrape; LGA is a different search
+    assert [s[:2] for s in scraped] == [("JFK", "SRQ"), ("LGA", "SRQ")]
+    assert results == [[FLIGHT]] * 4
+    assert outbound_flights.shared - shared_before == 2
+    assert outbound_flights.in_flight == 0
+
+def test_failures_reach_every_waiter_and_are_not_kept():
+    async def run():
+        flight = SingleFlight("test")
+        attempts = []
+
+        async def broken():
+            attempts.append(1)
+            await asyncio.sleep(0.01)
+            raise RuntimeError("page crashed")
+
+        outcomes = await asyncio.gather(*(flight.do("k", broken) for _ in range(3)), return_exceptions=True)
+        retry = await flight.do("k", lambda: asyncio.sleep(0, result="ok"))
+        return outcomes, retry, len(attempts), flight.stats()
+
+    outcomes, retry, attempts, stats = asyncio.run(run())
+    assert attempts == 1
+    assert all(isinstance(o, RuntimeError) and str(o) == "page crashed" for o in outcomes)
+    assert retry == "ok"
+    assert stats == {"in_flight": 0, "runs": 2, "shared": 2, "failures": 1}
+
+def test_work_stops_only_when_every_waiter_left():
+    async def run():
+        flight = SingleFlight("test")
+        finished = []
+
+        async def slow():
+            await asyncio.sleep(0.05)
+            finished.append(1)
+            return "done"
+
+        first = asyncio.create_task(flight.do("k", slow))
+        second = asyncio.create_task(flight.do("k", slow))
+        await asyncio.sleep(0.01)
+        first.cancel()
+        kept = await second  # one waiter left: the scrape carries on
+
+        third = asyncio.create_task(flight.do("k2", slow))
+        await asyncio.sleep(0.01)
+        third.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await third
+        await asyncio.sleep(0.06)  # long enough for an orphaned scrape to have finished
+        return kept, len(finished), flight.in_flight
+
+    kept, finished, in_flight = asyncio.run(run())
+    assert kept == "done"
+    assert finished == 1  # the second scrape was cancelled with its only waiter
+    assert in_flight == 0
+
+def test_a_caller_right_after_a_cancelled_run_starts_a_new_one():
+    async def run():
+        flight = SingleFlight("test")
+
+        async def slow():
+            await asyncio.sleep(0.05)
+            return "done"
+
+        first = asyncio.create_task(flight.do("k", slow))
+        await asyncio.sleep(0.01)
+        first.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await first
+        # The cancelled run's entry may not be cleared yet; this caller was never cancelled
+        retry = await flight.do("k", slow)
+        return retry, flight.stats()
+
+    retry, stats = asyncio.run(run())
+    assert retry == "done"
+    assert stats["runs"] == 2 and stats["shared"] == 0 and stats["in_flight"] == 0
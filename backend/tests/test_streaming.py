@@ -0,0 +1,81 @@
+import json
+import sys
+import os
+
+# Add project root to path so we can import src
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+os.environ.setdefault("GOOGLE_API_KEY", "test-key")  # the agent module builds its LLM client on import
+
+from fastapi.testclient import TestClient
+from langchain_core.language_models.fake_chat_models import GenericFakeChatModel
+from langchain_core.messages import AIMessage
+from langgraph.graph import StateGraph
+
+import main
+from src.state import AgentState
+from src.streaming import ItineraryStream, final_message, message_text
+
+ITINERARY = {
+    "intro": "I found a great nonstop round-trip option, with a \"}\" in it!",
+    "outbound": {"airline": "JetBlue", "date": "March 10, 2026", "departure": "12:29 PM (JFK)", "arrival": "3:43 PM (SRQ)", "duration": "3 hr 14 min", "stops": "Nonstop"},
+    "return": {"airline": "Delta", "date": "March 16, 2026", "departure": "5:35 PM (SRQ)", "arrival": "8:29 PM (JFK)", "duration": "2 hr 54 min", "stops": "Nonstop"},
+    "total_price": "$348.00",
+    "booking_link": "https://www.google.com/travel/flights/booking?tfs=abc",
+}
+REPLY = "```json\n" + json.dumps(ITINERARY, indent=2) + "\n```"
+
+def _feed(text: str, size: int):
+    stream = ItineraryStream()
+    events = []
+    for start in range(0, len(text), size):
+        events.append((start + size, stream.feed(text[start:start + size])))
+    return events
+
+def test_fields_are_sent_once_closed():
+    for size in (1, 7, len(REPLY)):
+        events = [(end, e) for end, batch in _feed(REPLY, size) for e in batch]
+        assert [e["field"] for _, e in events] == list(ITINERARY)
+        assert all(e["type"] == "partial" and e["content"] == ITINERARY[e["field"]] for _, e in events)
+
+    # `outbound` arrives before the model has started on `return`
+    sent_at = {e["field"]: end for end, batch in _feed(REPLY, 1) for e in batch}
+    assert sent_at["outbound"] < REPLY.index('"return"')
+
+def test_plain_text_streams_as_tokens():
+    text = "Where would you like to fly from?"
+    events = [e for _, batch in _feed(text, 4) for e in batch]
+    assert all(e["type"] == "token" for e in events)
+    assert "".join(e["content"] for e in events) == text
+
+def test_final_message_strips_fence():
+    assert final_message(REPLY) == {"type": "message", "content": ITINERARY}
+    assert final_message("Which dates?") == {"type": "message", "content": "Which dates?"}
+
+def test_message_text_joins_gemini_blocks():
+    assert message_text([{"type": "text", "text": "Which "}, "dates", {"type": "thinking"}, {"text": "?"}]) == "Which dates?"
+    assert message_text("Which dates?") == "Which dates?" and message_text(None) == ""
+
+def _events(response) -> list:
+    return [json.loads(line[6:]) for line in response.text.splitlines() if line.startswith("data: ")]
+
+def test_chat_streams_partials_before_the_final_object(monkeypatch):
+    model = GenericFakeChatModel(messages=iter([AIMessage(content=REPLY)] * 2))
+
+    async def agent(state: AgentState):
+        return {"messages": [await model.ainvoke(state["messages"])]}
+
+    workflow = StateGraph(AgentState)
+    workflow.add_node("agent", agent)
+    workflow.set_entry_point("agent")
+    workflow.set_finish_point("agent")
+    monkeypatch.setattr(main, "compiled_graph", workflow.compile())
+
+    client = TestClient(main.app)
+    events = _events(client.post("/chat", json={"message": "JFK to SRQ", "thread_id": "s1", "stream_tokens": True}))
+    assert [e["type"] for e in events] == ["partial"] * len(ITINERARY) + ["message"]
+    assert events[1] == {"type": "partial", "field": "outbound", "content": ITINERARY["outbound"]}
+    assert events[-1] == {"type": "message", "content": ITINERARY}
+
+    # Without the flag the stream is unchanged
+    events = _events(client.post("/chat", json={"message": "JFK to SRQ", "thread_id": "s2"}))
+    assert events == [{"type": "message", "content": ITINERARY}]
@@ -0,0 +1,73 @@
+import asyncio
+import json
+import subprocess
+import sys
+import os
+import threading
+import time
+
+# Add project root to path so we can import src
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+os.environ.setdefault("GOOGLE_API_KEY", "test-key")  # the agent module builds its LLM client on first use
+
+from fastapi.testclient import TestClient
+
+import main
+from src import warmup as warmup_module
+from src.config import Config
+from src.warmup import Warmup
+
+BACKEND = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+HEAVY = ["src.agent", "langchain_google_genai", "langgraph.graph", "playwright"]
+
+def test_server_module_imports_without_the_agent():
+    code = f"import json, sys, main; print(json.dumps([m for m in {HEAVY!r} if m in sys.modules]))"
+    result = subprocess.run([sys.executable, "-c", code], cwd=BACKEND, capture_output=True, text=True, timeout=60)
+    assert result.returncode == 0, result.stderr
+    assert json.loads(result.stdout.strip().splitlines()[-1]) == []
+
+def test_ready_only_once_warmed_up(monkeypatch):
+    monkeypatch.setattr(Config, "BROWSER_POOL_ENABLED", False)
+    monkeypatch.setattr(Config, "SCRAPE_WORKERS", 0)
+    monkeypatch.setattr(Config, "PRICE_WATCH_ENABLED", False)
+    monkeypatch.setattr(main, "warmup", Warmup())
+    release = threading.Event()
+
+    def slow_build():
+        release.wait(10)  # imports taking their time
+        from src import agent
+        return agent
+
+    monkeypatch.setattr(warmup_module, "_build_agent", slow_build)
+
+    with TestClient(main.app) as client:
+        assert client.get("/health").status_code == 200  # live at once
+        warming = client.get("/ready")
+        assert warming.status_code == 503 and warming.json()["status"] == "warming"
+
+        release.set()
+        deadline = time.monotonic() + 10
+        while (ready := client.get("/ready")).status_code != 200 and time.monotonic() < deadline:
+            time.sleep(0.02)
+
+    stats = ready.json()
+    assert stats["status"] == "ready" and stats["errors"] == {}
+    assert set(stats["steps"]) == {"agent", "browsers"}
+    assert stats["import_to_ready_seconds"] >= stats["steps"]["agent"]
+
+def test_failed_warm_up_is_reported(monkeypatch):
+    async def no_chromium():
+        raise RuntimeError("Executable doesn't exist")
+
+    monkeypatch.setattr(warmup_module, "_start_browsers", no_chromium)
+
+    async def run():
+        warmup = Warmup()
+        warmup.start(time.perf_counter())
+        await warmup.stop()
+        return warmup
+
+    warmup = asyncio.run(run())
+    assert not warmup.ready
+    assert warmup.stats()["status"] == "failed"
+    assert warmup.stats()["errors"] == {"browsers": "RuntimeError: Executable doesn't exist"}
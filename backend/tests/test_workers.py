@@ -0,0 +1,96 @@
+import asyncio
+import sys
+import os
+
+# Add project root to path so we can import src
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import pytest
+
+from src.tools import workers
+from src.tools.workers import ScrapeWorkerPool, run_job
+
+def test_jobs_run_in_worker_processes(monkeypatch):
+    # The workers are spawned, so they read their settings from the environment
+    monkeypatch.setenv("BROWSER_POOL_ENABLED", "false")
+
+    async def run():
+        pool = ScrapeWorkerPool(size=2)
+        monkeypatch.setattr(workers, "scrape_workers", pool)
+        pool.start()
+        try:
+            # Session jobs need no browser: nothing is parked for these threads
+            results = await asyncio.gather(*(
+                run_job("discard_page", f"thread-{n}", "http://flights.test/", route=f"thread-{n}") for n in range(6)
+            ))
+            with pytest.raises(RuntimeError, match="TypeError"):
+                await run_job("close_thread", route="thread-0")  # missing argument, raised in the worker
+            stats = pool.stats()
+        finally:
+            await pool.stop()
+        return results, stats, pool.stats()
+
+    results, stats, stopped = asyncio.run(run())
+    assert results == [None] * 6
+    assert stats["alive"] == 2 and stats["completed"] == 6 and stats["failed"] == 1 and stats["pending"] == 0
+    assert stopped["workers"] == 0 and stopped["alive"] == 0
+
+def test_a_thread_always_goes_to_the_same_worker():
+    pool = ScrapeWorkerPool(size=4)
+    pool.size = 4
+    assert len({pool.worker_for("thread-42") for _ in range(10)}) == 1
+    assert {pool.worker_for(f"thread-{n}") for n in range(40)} == {0, 1, 2, 3}
+
+def test_without_workers_jobs_run_in_process(monkeypatch):
+    calls = []
+
+    async def fake_discard(thread_id, url):
+        calls.append((thread_id, url))
+        return "here"
+
+    from src.tools.sessions import session_registry
+    monkeypatch.setattr(session_registry, "discard", fake_discard)
+    assert asyncio.run(run_job("discard_page", "t1", "u1", route="t1")) == "here"
+    assert calls == [("t1", "u1")]
+
+class StubWorkers:
+    """A started pool whose jobs fail, or record what the API process held while they ran."""
+    def __init__(self, error=None):
+        self.started = True
+        self.error = error
+        self.calls = []
+
+    async def submit(self, name, args, route=None):
+        from src.admission import browser_limiter
+        self.calls.append((name, browser_limiter.active))
+        if self.error:
+            raise self.error
+        return []
+
+def test_failed_worker_jobs_give_the_in_process_results(monkeypatch):
+    from src.config import Config
+    from src.tools import flight_search
+    monkeypatch.setattr(Config, "SEARCH_CACHE_ENABLED", False)
+    monkeypatch.setattr(Config, "PREFETCH_ENABLED", False)
+    monkeypatch.setattr(workers, "scrape_workers", StubWorkers(workers.ScrapeJobError("Scrape worker 0 died")))
+
+    async def run():
+        outbound = await flight_search._search_outbound_pair("JFK", "SRQ", "2026-03-10", "2026-03-16", "t1")
+        returns = await flight_search._search_returns("url", "t1", "JetBlue", "8:00 AM", "11:00 AM", 300.0, "Nonstop")
+        link = await flight_search._booking_link("url", "t1", "Delta", "1:00 PM", "4:00 PM", 300.0, "Nonstop")
+        return outbound, returns, link
+
+    assert asyncio.run(run()) == ([], [], flight_search.LINK_ERROR)
+
+def test_worker_page_jobs_hold_a_browser_slot_here(monkeypatch):
+    from src.admission import browser_limiter
+    pool = StubWorkers()
+    monkeypatch.setattr(workers, "scrape_workers", pool)
+
+    async def run():
+        await run_job("scrape_outbound", "JFK", "SRQ", "url", "t1", route="t1")
+        await run_job("close_thread", "t1", route="t1")
+
+    asyncio.run(run())
+    assert pool.calls == [("scrape_outbound", 1), ("close_thread", 0)]  # only page jobs count
+    assert browser_limiter.active == 0
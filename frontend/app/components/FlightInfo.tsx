@@ -1,68 +1,71 @@
 import React from 'react';
 
+type Leg = {
+  airline: string;
+  date: string;
+  departure: string;
+  arrival: string;
+  duration: string;
+  stops: string;
+};
+
+// While the reply streams in, fields arrive one by one and may still be missing
 type FlightInfoProps = {
   data: {
-    intro: string;
-    outbound: {
-      airline: string;
-      date: string;
-      departure: string;
-      arrival: string;
-      duration: string;
-      stops: string;
-    };
-    return: {
-      airline: string;
-      date: string;
-      departure: string;
-      arrival: string;
-      duration: string;
-      stops: string;
-    };
-    total_price: string;
-    booking_link: string;
+    intro?: string;
+    outbound?: Leg;
+    return?: Leg;
+    total_price?: string;
+    booking_link?: string;
   };
 };
 
+const LegDetails = ({ leg }: { leg: Leg }) => (
+  <ul className="list-disc pl-5">
+    <li>Airline: {leg.airline}</li>
+    <li>Date: {leg.date}</li>
+    <li>Departure: {leg.departure}</li>
+    <li>Arrival: {leg.arrival}</li>
+    <li>Duration: {leg.duration}</li>
+    <li>Stops: {leg.stops}</li>
+  </ul>
+);
+
 const FlightInfo: React.FC<FlightInfoProps> = ({ data }) => {
   return (
     <div>
-      <p>{data.intro}</p>
+      {data.intro && <p>{data.intro}</p>}
       <ul className="list-disc pl-5 mt-2">
-        <li>
-          <strong>Outbound:</strong>
-          <ul className="list-disc pl-5">
-            <li>Airline: {data.outbound.airline}</li>
-            <li>Date: {data.outbound.date}</li>
-            <li>Departure: {data.outbound.departure}</li>
-            <li>Arrival: {data.outbound.arrival}</li>
-            <li>Duration: {data.outbound.duration}</li>
-            <li>Stops: {data.outbound.stops}</li>
-          </ul>
-        </li>
-        <li className="mt-2">
-          <strong>Return:</strong>
-          <ul className="list-disc pl-5">
-            <li>Airline: {data.return.airline}</li>
-            <li>Date: {data.return.date}</li>
-            <li>Departure: {data.return.departure}</li>
-            <li>Arrival: {data.return.arrival}</li>
-            <li>Duration: {data.return.duration}</li>
-            <li>Stops: {data.return.stops}</li>
-          </ul>
-        </li>
+        {data.outbound && (
+          <li>
+            <strong>Outbound:</strong>
+            <LegDetails leg={data.outbound} />
+          </li>
+        )}
+        {data.return && (
+          <li className="mt-2">
+            <strong>Return:</strong>
+            <LegDetails leg={data.return} />
+          </li>
+        )}
       </ul>
-      <p className="mt-2">
-        <strong>Total Price:</strong> {data.total_price}
-      </p>
-      <a
-        href={data.booking_link}
-        target="_blank"
-        rel="noopener noreferrer"
-        className="text-blue-400 hover:underline mt-2 inline-block"
-      >
-        Click here to book your flight
-      </a>
+      {data.total_price && (
+        <p className="mt-2">
+          <strong>Total Price:</strong> {data.total_price}
+        </p>
+      )}
+      {data.booking_link ? (
+        <a
+          href={data.booking_link}
+          target="_blank"
+          rel="noopener noreferrer"
+          className="text-blue-400 hover:underline mt-2 inline-block"
+        >
+          Click here to book your flight
+        </a>
+      ) : (
+        <p className="mt-2 text-gray-400 italic">Generating booking link...</p>
+      )}
     </div>
   );
 };
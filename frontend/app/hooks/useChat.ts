@@ -4,7 +4,9 @@ import { useState, useEffect } from "react";
 
 type Message = {
   type: "user" | "agent" | "tool";
-  content: string;
+  content: any;
+  // Set while the reply is still arriving as `token` / `partial` events
+  streaming?: boolean;
 };
 
 type Chat = {
@@ -85,7 +87,7 @@ export const useChat = () => {
       const response = await fetch('http://localhost:8000/chat', {
         method: 'POST',
         headers: { 'Content-Type': 'application/json' },
-        body: JSON.stringify({ message: message, thread_id: activeChatId }),
+        body: JSON.stringify({ message: message, thread_id: activeChatId, stream_tokens: true }),
       });
 
       if (!response.body) return;
@@ -93,28 +95,47 @@ export const useChat = () => {
       const reader = response.body.getReader();
       const decoder = new TextDecoder();
       let done = false;
+      let buffer = '';
 
       while (!done) {
         const { value, done: readerDone } = await reader.read();
         done = readerDone;
-        const chunk = decoder.decode(value, { stream: true });
-        
-        const events = chunk.split('\n\n').filter(Boolean);
-        for (const event of events) {
+        buffer += decoder.decode(value, { stream: true });
+
+        // An event can be split across reads; keep the unfinished tail
+        const events = buffer.split('\n\n');
+        buffer = events.pop() ?? '';
+        for (const event of events.filter(Boolean)) {
           if (event.startsWith('data:')) {
             const data = JSON.parse(event.substring(5));
-            const messageType = data.type === 'tool' ? 'tool' : 'agent';
-            const content = data.content;
 
             setChats((prev) =>
               prev.map((chat) => {
                 if (chat.id === activeChatId) {
                   const newMessages = [...chat.messages];
                   const lastMessage = newMessages[newMessages.length - 1];
-                  if (lastMessage && (lastMessage.content === 'Thinking...' || lastMessage.type === 'tool')) {
-                    newMessages[newMessages.length - 1] = { type: messageType, content };
+                  const replaceable = lastMessage && (lastMessage.content === 'Thinking...' || lastMessage.type === 'tool' || lastMessage.streaming);
+
+                  let next: Message;
+                  if (data.type === 'token') {
+                    // Append to the reply being streamed
+                    const text = lastMessage?.streaming && typeof lastMessage.content === 'string' ? lastMessage.content : '';
+                    next = { type: 'agent', content: text + data.content, streaming: true };
+                  } else if (data.type === 'partial') {
+                    // One more field of the itinerary JSON
+                    const fields = lastMessage?.streaming && typeof lastMessage.content === 'object' ? lastMessage.content : {};
+                    next = { type: 'agent', content: { ...fields, [data.field]: data.content }, streaming: true };
+                  } else if (data.type === 'queued') {
+                    // Waiting for a free slot on the server
+                    next = { type: 'tool', content: `queued:${data.position}` };
+                  } else {
+                    next = { type: data.type === 'tool' ? 'tool' : 'agent', content: data.content };
+                  }
+
+                  if (replaceable) {
+                    newMessages[newMessages.length - 1] = next;
                   } else {
-                    newMessages.push({ type: messageType, content });
+                    newMessages.push(next);
                   }
                   return { ...chat, messages: newMessages };
                 }
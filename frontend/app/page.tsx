@@ -60,8 +60,13 @@ export default function Home() {
         case 'generate_booking_link':
           text = 'Generating booking link...';
           break;
+        case 'plan_round_trip':
+          text = 'Planning your round trip...';
+          break;
         default:
-          text = `Thinking...`;
+          text = msg.content.startsWith('queued:')
+            ? `Busy right now. You are #${msg.content.slice('queued:'.length)} in line...`
+            : `Thinking...`;
       }
       return (
         <div className="flex items-center">
@@ -82,7 +87,8 @@ export default function Home() {
         ));
       }
     }
-    if (typeof content === 'object' && content !== null && content.booking_link) {
+    // A streamed itinerary (`partial` fields) renders as it fills in
+    if (typeof content === 'object' && content !== null && (content.booking_link || content.intro || content.outbound)) {
       return <FlightInfo data={content} />;
     }
     return <>{content}</>